@@ -9,6 +9,7 @@ class ForumPostAdmin(admin.ModelAdmin):
     search_fields = ('title', 'content', 'guest_name')
     readonly_fields = ('created_at', 'updated_at', 'likes_count', 'comments_count')
     list_editable = ('pinned',)
+    list_select_related = ('author',)
     
     fieldsets = (
         ('Post Information', {
@@ -42,14 +43,6 @@ class ForumPostAdmin(admin.ModelAdmin):
             )
     author_info.short_description = 'Author'
     
-    def likes_count(self, obj):
-        return obj.get_likes_count()
-    likes_count.short_description = 'Likes'
-    
-    def comments_count(self, obj):
-        return obj.comments.count()
-    comments_count.short_description = 'Comments'
-
     def get_created_at(self, obj):
         return obj.created_at
     get_created_at.short_description = 'Created At'
@@ -76,6 +69,7 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('content', 'guest_name', 'post__title')
     list_filter = ('created_at', 'author')
     readonly_fields = ('likes_count',)
+    list_select_related = ('post', 'author')
     
     def author_info(self, obj):
         if obj.author:
@@ -93,10 +87,6 @@ class CommentAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.content[:100] + "..." if len(obj.content) > 100 else obj.content
     content_preview.short_description = 'Content'
-    
-    def likes_count(self, obj):
-        return obj.get_likes_count()
-    likes_count.short_description = 'Likes'
 
 @admin.register(Like)
 class LikeAdmin(admin.ModelAdmin):
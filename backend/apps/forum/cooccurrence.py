@@ -0,0 +1,118 @@
+"""
+Tag co-occurrence matrix.
+
+``ForumTagPair`` holds, for every two tags used on the same post, the number
+of posts carrying both, once per direction so the related tags of a tag are a
+single range of the ``(tag, -count)`` index. The matrix is kept current from
+post tag changes: ``set_post_tags`` and the ``ForumPost.tags`` signals pass the
+old and new tag sets of each changed post to ``update_cooccurrence``, which
+applies the pair deltas with one upsert. ``rebuild_cooccurrence`` recomputes
+it from ``ForumPostTag`` (``reconcile_counters`` runs it).
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import ForumPostTag, ForumTagPair
+
+_UPSERT_SQL = """
+    INSERT INTO {pairs} (tag_id, related_id, count)
+    SELECT * FROM unnest(%s::bigint[], %s::bigint[], %s::integer[])
+    ON CONFLICT (tag_id, related_id) DO UPDATE SET count = {pairs}.count + EXCLUDED.count
+"""
+
+_REBUILD_SQL = """
+    INSERT INTO {pairs} (tag_id, related_id, count)
+    SELECT a.tag_id, b.tag_id, COUNT(*)
+    FROM {links} a
+    JOIN {links} b ON b.post_id = a.post_id AND b.tag_id <> a.tag_id
+    GROUP BY a.tag_id, b.tag_id
+"""
+
+
+def pair_deltas(changes):
+    """Ordered (tag, related) pair deltas of an iterable of (old tag ids, new tag ids)"""
+    deltas = Counter()
+    for old, new in changes:
+        old, new = set(old), set(new)
+        for a in new:
+            for b in new:
+                if a != b and not (a in old and b in old):
+                    deltas[a, b] += 1
+        for a in old:
+            for b in old:
+                if a != b and not (a in new and b in new):
+                    deltas[a, b] -= 1
+    return {pair: delta for pair, delta in deltas.items() if delta}
+
+
+def update_cooccurrence(changes):
+    """Apply the tag set changes of posts, given as (old tag ids, new tag ids), to the matrix"""
+    deltas = pair_deltas(changes)
+    if not deltas:
+        return
+    # Sorted, so concurrent upserts lock rows in the same order
+    rows = sorted(deltas.items())
+    table = ForumTagPair._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL.format(pairs=table), [
+            [tag for (tag, _), _ in rows], [related for (_, related), _ in rows], [delta for _, delta in rows],
+        ])
+        cursor.execute(
+            f'DELETE FROM {table} WHERE tag_id = ANY(%s::bigint[]) AND count <= 0',
+            [sorted({tag for (tag, _), _ in rows})],
+        )
+
+
+def rebuild_cooccurrence():
+    """Recompute the whole matrix from the post/tag links; returns the number of pairs"""
+    table = ForumTagPair._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(_REBUILD_SQL.format(pairs=table, links=ForumPostTag._meta.db_table))
+        return cursor.rowcount
+
+
+def posts_with_all_tags(names):
+    """
+    ``post_id`` subquery of the posts carrying every tag in ``names``: one
+    GROUP BY ... HAVING instead of a join per tag, so no DISTINCT is needed
+    """
+    names = list(names)
+    return (
+        ForumPostTag.objects.filter(tag__name__in=names)
+        .values('post_id')
+        .annotate(matched=Count('tag_id'))
+        .filter(matched=len(names))
+        .values('post_id')
+    )
+
+
+def related_tags(names, limit):
+    """
+    Tags used together with every tag in ``names``, most shared first, as
+    dicts with ``id``, ``name`` and ``count`` (posts carrying all of them).
+    One query: a single tag reads its range of the (tag, -count) index; pair
+    counts cannot give the posts shared by several tags, so those are counted
+    from the links of the posts ``posts_with_all_tags`` matches.
+    """
+    names = list(names)
+    if not names:
+        return []
+    if len(names) == 1:
+        pairs = (
+            ForumTagPair.objects.filter(tag__name=names[0], count__gt=0)
+            .order_by('-count', 'related__name')
+            .values_list('related_id', 'related__name', 'count')[:limit]
+        )
+    else:
+        pairs = (
+            ForumPostTag.objects.filter(post_id__in=posts_with_all_tags(names))
+            .exclude(tag__name__in=names)
+            .values('tag_id', 'tag__name')
+            .annotate(shared=Count('post_id'))
+            .order_by('-shared', 'tag__name')
+            .values_list('tag_id', 'tag__name', 'shared')[:limit]
+        )
+    return [{'id': tag_id, 'name': name, 'count': count} for tag_id, name, count in pairs]
@@ -0,0 +1,133 @@
+"""
+Race-free like toggling.
+
+``toggle_like`` deletes the user's like or inserts it in one statement: the
+delete and the ``INSERT ... ON CONFLICT DO NOTHING`` are data-modifying CTEs,
+so a concurrent double click can no longer trip the partial unique
+constraints. If two requests insert the same like, the loser sees the
+conflict, changes nothing and reports the like as present.
+
+``likes_count`` is a write-behind counter when settings.COUNTER_WRITE_BEHIND
+is on: the toggle buffers its delta with ``apps.utils.counter_buffer`` instead
+of updating the hot post or comment row, and every read adds the buffered delta
+to the stored value. Otherwise a further CTE updates the counter in the same
+statement.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import CharField, Q, Value
+from django.utils import timezone
+
+from apps.utils.counter_buffer import buffer_increment, pending_deltas
+
+from .models import Comment, ForumPost, Like
+
+LikeState = namedtuple('LikeState', ['is_liked', 'likes_count'])
+
+# Most post and comment ids a single like-status request may ask about
+LIKE_STATUS_MAX_IDS = 200
+
+_TOGGLE_SQL = """
+    WITH target AS (
+        SELECT id, likes_count FROM {target} WHERE id = %(target_id)s
+    ),
+    removed AS (
+        DELETE FROM {likes} WHERE {column} = %(target_id)s AND user_id = %(user_id)s
+        RETURNING id
+    ),
+    added AS (
+        INSERT INTO {likes} ({column}, user_id, created_at)
+        SELECT id, %(user_id)s, %(now)s FROM target
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT ({column}, user_id) WHERE {column} IS NOT NULL AND user_id IS NOT NULL DO NOTHING
+        RETURNING id
+    )"""
+
+# Write-behind: report the delta for the buffer
+_BUFFERED_TAIL = """
+    SELECT NOT EXISTS (SELECT 1 FROM removed),
+           (SELECT COUNT(*) FROM added) - (SELECT COUNT(*) FROM removed),
+           likes_count
+    FROM target"""
+
+# Direct: move the counter in the same statement; the UPDATE locks the target
+# row, which serialises toggles on the same post or comment
+_COUNTED_TAIL = """,
+    counted AS (
+        UPDATE {target}
+        SET likes_count = likes_count + (SELECT COUNT(*) FROM added) - (SELECT COUNT(*) FROM removed)
+        WHERE id = %(target_id)s
+        RETURNING likes_count
+    )
+    SELECT NOT EXISTS (SELECT 1 FROM removed), 0, likes_count FROM counted"""
+
+
+def toggle_like(user, post_id=None, comment_id=None):
+    """
+    Like or unlike a post or comment for an authenticated ``user``.
+
+    Returns the new ``LikeState``, or None if the post or comment does not exist.
+    """
+    if (post_id is None) == (comment_id is None):
+        raise ValueError('Pass exactly one of post_id and comment_id')
+    model, column = (ForumPost, 'post_id') if post_id is not None else (Comment, 'comment_id')
+    target_id = post_id if post_id is not None else comment_id
+    tail = _BUFFERED_TAIL if settings.COUNTER_WRITE_BEHIND else _COUNTED_TAIL
+    sql = (_TOGGLE_SQL + tail).format(target=model._meta.db_table, likes=Like._meta.db_table, column=column)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'target_id': target_id, 'user_id': user.pk, 'now': timezone.now()})
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    is_liked, delta, likes_count = row
+    if delta:
+        buffer_increment(model, 'likes_count', target_id, delta)
+    return LikeState(is_liked, likes_count + pending_deltas(model, 'likes_count', [target_id]).get(target_id, 0))
+
+
+def liked_ids(user, post_ids=(), comment_ids=()):
+    """(post ids, comment ids) among the given ones that ``user`` has liked, in one IN query"""
+    liked_post_ids, liked_comment_ids = set(), set()
+    if not (user and user.is_authenticated and (post_ids or comment_ids)):
+        return liked_post_ids, liked_comment_ids
+    likes = Like.objects.filter(user=user).filter(
+        Q(post_id__in=list(post_ids)) | Q(comment_id__in=list(comment_ids))
+    )
+    for post_id, comment_id in likes.values_list('post_id', 'comment_id'):
+        if post_id is not None:
+            liked_post_ids.add(post_id)
+        if comment_id is not None:
+            liked_comment_ids.add(comment_id)
+    return liked_post_ids, liked_comment_ids
+
+
+def like_statuses(user, post_ids=(), comment_ids=()):
+    """
+    ``{'posts': {id: {is_liked, likes_count}}, 'comments': {...}}`` for the
+    given ids that exist: one UNION query over the stored counters and, for an
+    authenticated user, one for their likes, plus the buffered deltas.
+    """
+    counters = [
+        model.objects.filter(pk__in=list(ids)).order_by().values_list(
+            Value(kind, output_field=CharField()), 'pk', 'likes_count'
+        )
+        for kind, model, ids in (('posts', ForumPost, post_ids), ('comments', Comment, comment_ids))
+        if ids
+    ]
+    statuses = {'posts': {}, 'comments': {}}
+    if not counters:
+        return statuses
+    rows = counters[0].union(*counters[1:], all=True) if len(counters) > 1 else counters[0]
+    liked = dict(zip(('posts', 'comments'), liked_ids(user, post_ids, comment_ids)))
+    pending = {
+        'posts': pending_deltas(ForumPost, 'likes_count', post_ids),
+        'comments': pending_deltas(Comment, 'likes_count', comment_ids),
+    }
+    for kind, pk, likes_count in rows:
+        statuses[kind][pk] = {
+            'is_liked': pk in liked[kind],
+            'likes_count': likes_count + pending[kind].get(pk, 0),
+        }
+    return statuses
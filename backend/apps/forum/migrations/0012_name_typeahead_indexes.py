@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:06
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0011_forumpost_pinned"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="forumtag",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="forum_tag_name_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="forumtag",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="forum_tag_name_trgm",
+            ),
+        ),
+    ]
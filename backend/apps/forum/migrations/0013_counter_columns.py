@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Populate the counter columns from the existing comments and likes"""
+    ForumPost = apps.get_model("forum", "ForumPost")
+    Comment = apps.get_model("forum", "Comment")
+    Like = apps.get_model("forum", "Like")
+
+    def counted(queryset, field):
+        return Coalesce(
+            Subquery(
+                queryset.filter(**{field: OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")[:1]
+            ),
+            0,
+        )
+
+    authenticated_likes = Like.objects.filter(user__isnull=False)
+    ForumPost.objects.update(
+        comments_count=counted(Comment.objects.all(), "post"),
+        likes_count=counted(authenticated_likes, "post"),
+    )
+    Comment.objects.update(likes_count=counted(authenticated_likes, "comment"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0012_name_typeahead_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="likes_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="forumpost",
+            name="comments_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0013_counter_columns"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "-created_at", "-id"], name="forum_comment_post_keyset"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="forumpost",
+            index=models.Index(
+                fields=["-pinned", "-created_at", "id"], name="forum_post_keyset"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_usage_counts(apps, schema_editor):
+    """usage_count was never maintained; recount it from the post/tag links"""
+    ForumTag = apps.get_model("forum", "ForumTag")
+    ForumPostTag = apps.get_model("forum", "ForumPostTag")
+    ForumTag.objects.update(
+        usage_count=Coalesce(
+            Subquery(
+                ForumPostTag.objects.filter(tag=OuterRef("pk"))
+                .order_by()
+                .values("tag")
+                .annotate(total=Count("pk"))
+                .values("total")[:1]
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0014_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="forumtag",
+            index=models.Index(
+                fields=["-usage_count", "name"], name="forum_tag_popular"
+            ),
+        ),
+        migrations.RunPython(backfill_usage_counts, migrations.RunPython.noop),
+    ]
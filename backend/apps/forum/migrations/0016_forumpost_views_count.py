@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0015_popularity_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forumpost",
+            name="views_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
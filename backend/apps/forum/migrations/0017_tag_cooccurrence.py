@@ -0,0 +1,67 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0016_forumpost_views_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ForumTagPair",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="forum.forumtag",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="forum.forumtag",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "forum_tag_pair",
+                "indexes": [
+                    models.Index(fields=["tag", "-count"], name="forum_tag_pair_top")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tag", "related"), name="forum_tag_pair_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO forum_tag_pair (tag_id, related_id, count)
+            SELECT a.tag_id, b.tag_id, COUNT(*)
+            FROM forum_post_tag a
+            JOIN forum_post_tag b ON b.post_id = a.post_id AND b.tag_id <> a.tag_id
+            GROUP BY a.tag_id, b.tag_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
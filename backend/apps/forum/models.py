@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.db.models import Q
 from apps.users.models import User
 from django.conf import settings
+from apps.utils.typeahead import typeahead_indexes
 from .validators import validate_post_content, validate_title
 
 class SafeQueryMixin:
@@ -28,21 +29,14 @@ class ForumTag(models.Model):
     class Meta:
         db_table = 'forum_tag'
         ordering = ['-usage_count', 'name']
+        indexes = [
+            *typeahead_indexes('name', 'forum_tag_name'),
+            models.Index(fields=['-usage_count', 'name'], name='forum_tag_popular'),
+        ]
     
     def __str__(self):
         return f"#{self.name}"
     
-    def increment_usage(self):
-        """Increment usage count"""
-        self.usage_count += 1
-        self.save(update_fields=['usage_count'])
-    
-    def decrement_usage(self):
-        """Decrement usage count (when tag is removed from a post)"""
-        if self.usage_count > 0:
-            self.usage_count -= 1
-            self.save(update_fields=['usage_count'])
-
 class ForumPost(SafeQueryMixin, models.Model):
     title = models.CharField(
         max_length=200, 
@@ -62,6 +56,8 @@ class ForumPost(SafeQueryMixin, models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     pinned = models.BooleanField(default=False)  # New pinned field
     likes_count = models.IntegerField(default=0)  # Add this line
+    comments_count = models.IntegerField(default=0)  # Maintained by signals
+    views_count = models.IntegerField(default=0)  # Buffered, see apps.utils.counter_buffer
     
     # Guest user fields
     guest_name = models.CharField(max_length=100, null=True, blank=True)
@@ -101,6 +97,10 @@ class ForumPost(SafeQueryMixin, models.Model):
     class Meta:
         db_table = 'forum_post'
         ordering = ['-created_at']
+        indexes = [
+            # Post list order, used by keyset pagination
+            models.Index(fields=['-pinned', '-created_at', 'id'], name='forum_post_keyset'),
+        ]
 
 class Comment(SafeQueryMixin, models.Model):
     post = models.ForeignKey(
@@ -125,6 +125,8 @@ class Comment(SafeQueryMixin, models.Model):
     guest_name = models.CharField(max_length=100, null=True, blank=True)
     guest_affiliation = models.CharField(max_length=100, null=True, blank=True)
     guest_email = models.EmailField(null=True, blank=True)
+
+    likes_count = models.IntegerField(default=0)  # Maintained by signals
     
     def get_likes_count(self):
         """Get the count of likes from authenticated users only"""
@@ -147,6 +149,10 @@ class Comment(SafeQueryMixin, models.Model):
     class Meta:
         db_table = 'forum_comment'
         ordering = ['-created_at']
+        indexes = [
+            # Per-post comment pages, newest first
+            models.Index(fields=['post', '-created_at', '-id'], name='forum_comment_post_keyset'),
+        ]
 
 class Like(models.Model):
     """Model to track likes on posts and comments"""
@@ -234,3 +240,19 @@ class ForumPostTag(models.Model):
         db_table = 'forum_post_tag'
         unique_together = ('post', 'tag')
         unique_together = ('post', 'tag')
+
+
+class ForumTagPair(models.Model):
+    """Number of posts carrying both tags, stored in both directions (see apps.forum.cooccurrence)"""
+    tag = models.ForeignKey(ForumTag, on_delete=models.CASCADE, related_name='+', db_index=False)
+    related = models.ForeignKey(ForumTag, on_delete=models.CASCADE, related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'forum_tag_pair'
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'related'], name='forum_tag_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', '-count'], name='forum_tag_pair_top'),
+        ]
@@ -0,0 +1,14 @@
+from apps.utils.pagination import KeysetPagination
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """Newest comments first, matching Comment.Meta.ordering"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+
+
+class PostKeysetPagination(KeysetPagination):
+    """Opt-in cursor pages for the post list: pinned first, then newest"""
+    ordering = ('-pinned', '-created_at', 'id')
+    page_size = 10
+    max_page_size = 50
@@ -1,11 +1,27 @@
 # apps/forum/serializers.py
 from rest_framework import serializers
+from .likes import liked_ids
+from .tags import set_post_tags
 from .models import ForumPost, Comment, Like, ForumTag
 from .validators import validate_post_content, validate_title
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def liked_ids_context(request, posts=(), comments=()):
+    """
+    Serializer context with the ids of ``posts`` and ``comments`` the requesting
+    user has liked, fetched in a single IN query instead of one per object
+    """
+    liked_post_ids, liked_comment_ids = liked_ids(
+        getattr(request, 'user', None),
+        [post.id for post in posts],
+        [comment.id for comment in comments],
+    )
+    return {'liked_post_ids': liked_post_ids, 'liked_comment_ids': liked_comment_ids}
+
+
 class LikeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Like
@@ -16,7 +32,7 @@ class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
     author_name = serializers.SerializerMethodField()
     author_details = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
     
     def get_author(self, obj):
@@ -104,15 +120,16 @@ class CommentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid post ID")
         return value
     
-    def get_likes_count(self, obj):
-        """Get total likes count for this comment"""
-        return obj.get_likes_count()
-    
     def get_is_liked(self, obj):
         """Check if current user/guest has liked this comment"""
         request = self.context.get('request')
         if not request:
             return False
+
+        # Precomputed for the whole page by liked_ids_context()
+        liked_comment_ids = self.context.get('liked_comment_ids')
+        if liked_comment_ids is not None:
+            return obj.id in liked_comment_ids
             
         if request.user and request.user.is_authenticated:
             return obj.is_liked_by_user(request.user)
@@ -148,8 +165,9 @@ class ForumPostSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
     author_name = serializers.SerializerMethodField()
     author_details = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    views_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
     guest_name = serializers.CharField(read_only=True, required=False, allow_null=True)
     guest_affiliation = serializers.CharField(read_only=True, required=False, allow_null=True)
@@ -172,9 +190,6 @@ class ForumPostSerializer(serializers.ModelSerializer):
                 )
         return data
     
-    def get_comments_count(self, obj):
-        return obj.comments.count()
-    
     def get_author(self, obj):
         try:
             # If obj is a dict (e.g., during serialization of validated_data)
@@ -243,15 +258,16 @@ class ForumPostSerializer(serializers.ModelSerializer):
                 'guest_affiliation': ''
             }
     
-    def get_likes_count(self, obj):
-        """Get total likes count for this post"""
-        return obj.get_likes_count()
-    
     def get_is_liked(self, obj):
         """Check if current user/guest has liked this post"""
         request = self.context.get('request')
         if not request:
             return False
+
+        # Precomputed for the whole page by liked_ids_context()
+        liked_post_ids = self.context.get('liked_post_ids')
+        if liked_post_ids is not None:
+            return obj.id in liked_post_ids
             
         if request.user and request.user.is_authenticated:
             return obj.is_liked_by_user(request.user)
@@ -270,13 +286,7 @@ class ForumPostSerializer(serializers.ModelSerializer):
             if not isinstance(tag_names, list):
                 raise serializers.ValidationError("tag_names must be a list of strings")
             post = ForumPost.objects.create(**validated_data)
-            tags = []
-            for name in tag_names:
-                if not isinstance(name, str):
-                    raise serializers.ValidationError("Each tag name must be a string")
-                tag, _ = ForumTag.objects.get_or_create(name=name)
-                tags.append(tag)
-            post.tags.set(tags)
+            set_post_tags(post, tag_names)
             return post
         except Exception as e:
             logger.error(f"Error creating ForumPost: {str(e)}")
@@ -291,10 +301,7 @@ class ForumPostSerializer(serializers.ModelSerializer):
         
         # Handle tag updates if provided
         if tag_names is not None:
-            # Remove old tags
-            instance.tags.clear()
-            # Add new tags
-            instance.tags.set(tag_names)
+            set_post_tags(post, tag_names)
         
         return post
 
@@ -302,13 +309,30 @@ class ForumPostSerializer(serializers.ModelSerializer):
         model = ForumPost
         fields = ('id', 'title', 'content', 'author', 'author_name', 'author_details',
                  'created_at', 'updated_at', 'comments', 'comments_count', 
-                 'likes_count', 'is_liked', 'guest_name', 'guest_affiliation',
+                 'likes_count', 'views_count', 'is_liked', 'guest_name', 'guest_affiliation',
                  'tags', 'tag_names', 'pinned')
         extra_kwargs = {
             'title': {'validators': [validate_title]},
             'content': {'validators': [validate_post_content]},
         }
 
+class ForumPostListSerializer(ForumPostSerializer):
+    """Compact post representation for lists: no comment tree, content cut to an excerpt"""
+    EXCERPT_LENGTH = 250
+
+    excerpt = serializers.SerializerMethodField()
+
+    def get_excerpt(self, obj):
+        if len(obj.content) > self.EXCERPT_LENGTH:
+            return obj.content[:self.EXCERPT_LENGTH] + "..."
+        return obj.content
+
+    class Meta(ForumPostSerializer.Meta):
+        fields = ('id', 'title', 'excerpt', 'author', 'author_name', 'author_details',
+                 'created_at', 'updated_at', 'comments_count', 'likes_count', 'views_count', 'is_liked',
+                 'guest_name', 'guest_affiliation', 'tags', 'pinned')
+        read_only_fields = fields
+
 # New serializers for guest users
 class GuestPostSerializer(serializers.ModelSerializer):
     guest_name = serializers.CharField(max_length=100, required=True)
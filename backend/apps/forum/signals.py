@@ -0,0 +1,115 @@
+"""
+Signal handlers maintaining forum counters and invalidating cached forum responses.
+"""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.utils.counters import adjust_counters
+from apps.utils.response_cache import invalidate_responses
+
+from .cooccurrence import update_cooccurrence
+from .models import Comment, ForumPost, ForumPostTag, ForumTag, Like
+
+# Response cache namespace of the public tag endpoints
+TAG_RESPONSES = 'forum_tags'
+
+
+def _adjust_like_counter(like, delta):
+    # Only likes from authenticated users are counted, matching get_likes_count()
+    if like.user_id is None:
+        return
+    if like.post_id is not None:
+        ForumPost.objects.filter(pk=like.post_id).update(likes_count=F('likes_count') + delta)
+    if like.comment_id is not None:
+        Comment.objects.filter(pk=like.comment_id).update(likes_count=F('likes_count') + delta)
+
+
+@receiver(post_save, sender=Like)
+def count_new_like(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        _adjust_like_counter(instance, 1)
+
+
+@receiver(post_delete, sender=Like)
+def count_deleted_like(sender, instance, **kwargs):
+    _adjust_like_counter(instance, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        ForumPost.objects.filter(pk=instance.post_id).update(comments_count=F('comments_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    ForumPost.objects.filter(pk=instance.post_id).update(comments_count=F('comments_count') - 1)
+
+
+@receiver(m2m_changed, sender=ForumPost.tags.through)
+def count_added_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """add()/set() bulk insert ForumPostTag rows without post_save, so count them here"""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        adjust_counters(ForumTag, 'usage_count', {instance.pk: len(pk_set)})
+    else:
+        adjust_counters(ForumTag, 'usage_count', dict.fromkeys(pk_set, 1))
+
+
+@receiver(post_save, sender=ForumPostTag)
+def count_new_post_tag(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        adjust_counters(ForumTag, 'usage_count', {instance.tag_id: 1})
+
+
+@receiver(post_delete, sender=ForumPostTag)
+def count_deleted_post_tag(sender, instance, **kwargs):
+    # remove(), clear() and post deletion all delete ForumPostTag rows one by one
+    adjust_counters(ForumTag, 'usage_count', {instance.tag_id: -1})
+
+
+def _post_tag_sets(post_ids):
+    sets = {post_id: set() for post_id in post_ids}
+    for post_id, tag_id in ForumPostTag.objects.filter(post_id__in=list(sets)).values_list('post_id', 'tag_id'):
+        sets[post_id].add(tag_id)
+    return sets
+
+
+@receiver(m2m_changed, sender=ForumPost.tags.through)
+def track_tag_pairs(sender, instance, action, reverse, pk_set, **kwargs):
+    """Feed ORM tag changes (admin, shell) into the co-occurrence matrix"""
+    if action.startswith('pre_'):
+        if not reverse:
+            post_ids = [instance.pk]
+        elif pk_set is None:
+            post_ids = ForumPostTag.objects.filter(tag=instance).values_list('post_id', flat=True)
+        else:
+            post_ids = pk_set
+        instance._tag_sets_before = _post_tag_sets(post_ids)
+        return
+    before = instance.__dict__.pop('_tag_sets_before', {})
+    after = _post_tag_sets(before)
+    update_cooccurrence((before[post_id], after[post_id]) for post_id in before)
+
+
+@receiver(pre_delete, sender=ForumPost)
+def untrack_deleted_post_tags(sender, instance, **kwargs):
+    update_cooccurrence([(_post_tag_sets([instance.pk])[instance.pk], ())])
+
+
+def invalidate_tag_responses(action=None, **kwargs):
+    if action and action.startswith('pre_'):
+        return
+    invalidate_responses(TAG_RESPONSES)
+
+
+# Tag listings depend on the tags themselves and on which posts use them
+for _model in (ForumTag, ForumPostTag):
+    post_save.connect(invalidate_tag_responses, sender=_model,
+                      dispatch_uid=f'tag_responses_saved_{_model.__name__}')
+    post_delete.connect(invalidate_tag_responses, sender=_model,
+                        dispatch_uid=f'tag_responses_deleted_{_model.__name__}')
+m2m_changed.connect(invalidate_tag_responses, sender=ForumPost.tags.through,
+                    dispatch_uid='tag_responses_m2m')
@@ -0,0 +1,83 @@
+"""
+Tag resolution for forum posts.
+
+``resolve_tags`` turns user supplied names into ``ForumTag`` rows in two
+queries however many tags a post has: one ``bulk_create(ignore_conflicts=True)``
+for names that may be new and one ``SELECT`` for all of them.
+
+``set_post_tags`` replaces the tags of a post by diffing the stored links
+against the new ones. It writes the links with ``INSERT ... ON CONFLICT`` and
+``DELETE ... RETURNING`` so the rows that really changed are known even under
+concurrent edits, moves ``usage_count`` of every added and removed tag in a
+single ``UPDATE`` and applies the change to the tag co-occurrence matrix. Raw
+SQL bypasses the ``ForumPostTag`` signals, which keep counting links changed
+through the ORM (admin, shell).
+"""
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.utils.counters import adjust_counters
+from apps.utils.response_cache import invalidate_responses
+
+from .cooccurrence import update_cooccurrence
+from .models import ForumPostTag, ForumTag
+from .signals import TAG_RESPONSES
+
+_TAG_MAX_LENGTH = ForumTag._meta.get_field('name').max_length
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_tag_name(name):
+    """'#Soil Health ' -> 'soil-health'"""
+    return _WHITESPACE.sub('-', str(name).strip().lstrip('#').strip().lower())[:_TAG_MAX_LENGTH]
+
+
+def normalize_tag_names(names):
+    """Normalized, de-duplicated names in their original order, without blanks"""
+    return list(dict.fromkeys(filter(None, (normalize_tag_name(name) for name in names or []))))
+
+
+def resolve_tags(names):
+    """``ForumTag`` rows for ``names``, creating the missing ones, in the order given"""
+    names = normalize_tag_names(names)
+    if not names:
+        return []
+    ForumTag.objects.bulk_create([ForumTag(name=name) for name in names], ignore_conflicts=True)
+    tags = {tag.name: tag for tag in ForumTag.objects.filter(name__in=names)}
+    return [tags[name] for name in names]
+
+
+def set_post_tags(post, names):
+    """Make ``names`` the tags of ``post`` and keep usage counts in step; returns the tags"""
+    tags = resolve_tags(names)
+    wanted = {tag.id for tag in tags}
+    table = ForumPostTag._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE post_id = %s AND NOT (tag_id = ANY(%s::bigint[])) RETURNING tag_id',
+            [post.pk, list(wanted)],
+        )
+        removed = [tag_id for tag_id, in cursor.fetchall()]
+        added = []
+        if wanted:
+            cursor.execute(
+                f'INSERT INTO {table} (post_id, tag_id, created_at) '
+                f'SELECT %s, tag_id, %s FROM unnest(%s::bigint[]) AS tag_id '
+                f'ON CONFLICT (post_id, tag_id) DO NOTHING RETURNING tag_id',
+                [post.pk, timezone.now(), list(wanted)],
+            )
+            added = [tag_id for tag_id, in cursor.fetchall()]
+        adjust_counters(ForumTag, 'usage_count', {
+            **dict.fromkeys(added, 1), **dict.fromkeys(removed, -1),
+        })
+        if added or removed:
+            update_cooccurrence([((wanted - set(added)) | set(removed), wanted)])
+
+    if added or removed:
+        invalidate_responses(TAG_RESPONSES)
+    # Drop a stale prefetch so post.tags.all() shows the new set
+    getattr(post, '_prefetched_objects_cache', {}).pop('tags', None)
+    return tags
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.forum.models import Comment, ForumPost, Like
+
+
+class PostCommentsEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='reader', email='reader@example.com', password='long-enough-pw'
+        )
+        self.post = ForumPost.objects.create(title="Cover crops", content="Discussion thread.")
+        other = ForumPost.objects.create(title="Other post", content="Not this one.")
+        Comment.objects.create(post=other, content="Elsewhere comment.")
+
+        # Several comments share a timestamp so the id tie-breaker is exercised
+        created = timezone.now()
+        self.comments = []
+        for i in range(7):
+            comment = Comment.objects.create(post=self.post, content=f"Comment number {i}")
+            Comment.objects.filter(pk=comment.pk).update(created_at=created - timedelta(minutes=i // 3))
+            self.comments.append(comment)
+        Like.objects.create(comment=self.comments[0], user=self.user)
+
+    def url(self):
+        return f'/api/forum/posts/{self.post.id}/comments/'
+
+    def test_walks_all_comments_newest_first(self):
+        seen = []
+        response = self.client.get(self.url(), {'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen += [comment['id'] for comment in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = Comment.objects.filter(post=self.post).order_by('-created_at', '-id')
+        self.assertEqual(seen, [comment.id for comment in expected])
+
+    def test_page_queries_and_like_flags(self):
+        self.client.force_authenticate(self.user)
+        # post, comments page, viewer likes
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url(), {'page_size': 50})
+        liked = {comment['id']: comment['is_liked'] for comment in response.data['results']}
+        self.assertTrue(liked[self.comments[0].id])
+        self.assertFalse(liked[self.comments[1].id])
+
+    def test_bad_cursor_is_404(self):
+        response = self.client.get(self.url(), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(9):
+            ForumPost.objects.create(title=f"Post number {i}", content="Some post content.", pinned=(i % 4 == 0))
+
+    def test_pinned_first_then_newest(self):
+        ids = []
+        response = self.client.get('/api/forum/posts/', {'pagination': 'cursor', 'page_size': 2, 'count': 'exact'})
+        self.assertEqual(response.data['count'], 9)
+        while True:
+            ids += [post['id'] for post in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = ForumPost.objects.order_by('-pinned', '-created_at', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
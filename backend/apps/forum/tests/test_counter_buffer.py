@@ -0,0 +1,98 @@
+import io
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.forum.models import ForumPost
+from apps.utils.counter_buffer import buffer_increment, flush_counters, pending_deltas
+
+
+@override_settings(COUNTER_WRITE_BEHIND=True)
+class CounterBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", guest_name="Guest")
+
+    def stored(self, field):
+        return ForumPost.objects.values_list(field, flat=True).get(pk=self.post.pk)
+
+    def test_views_are_buffered_and_read_back(self):
+        for expected in (1, 2):
+            response = self.client.get(f'/api/forum/posts/{self.post.pk}/')
+            self.assertEqual(response.data['views_count'], expected)
+        self.assertEqual(self.stored('views_count'), 0)
+
+        self.assertEqual(flush_counters(include_recent=True), 1)
+        self.assertEqual(self.stored('views_count'), 2)
+        self.assertEqual(pending_deltas(ForumPost, 'views_count', [self.post.pk]), {})
+        self.assertEqual(self.client.get(f'/api/forum/posts/{self.post.pk}/').data['views_count'], 3)
+
+    def test_likes_are_buffered(self):
+        User = get_user_model()
+        user = User.objects.create_user(username='liker', email='liker@example.com', password='long-enough-pw')
+        self.client.force_authenticate(user)
+        self.client.post(f'/api/forum/posts/{self.post.pk}/like/')
+        self.assertEqual(self.stored('likes_count'), 0)
+        self.assertEqual(self.client.get('/api/forum/posts/').data['results'][0]['likes_count'], 1)
+
+        flush_counters(include_recent=True)
+        self.assertEqual(self.stored('likes_count'), 1)
+
+    def test_recent_slots_wait_for_the_next_flush(self):
+        buffer_increment(ForumPost, 'views_count', self.post.pk, 5)
+        self.assertEqual(flush_counters(), 0)
+        later = time.time() + 3 * settings.COUNTER_FLUSH_INTERVAL
+        with mock.patch("apps.utils.counter_buffer.time.time", return_value=later):
+            self.assertEqual(flush_counters(), 1)
+        self.assertEqual(self.stored('views_count'), 5)
+
+    def test_failed_flush_keeps_the_deltas(self):
+        buffer_increment(ForumPost, 'views_count', self.post.pk, 3)
+        with mock.patch("apps.utils.counter_buffer.adjust_counters", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                flush_counters(include_recent=True)
+        self.assertEqual(pending_deltas(ForumPost, 'views_count', [self.post.pk]), {self.post.pk: 3})
+
+        out = io.StringIO()
+        call_command("flush_counters", "--all", stdout=out)
+        self.assertIn("1 counters flushed", out.getvalue())
+        self.assertEqual(self.stored('views_count'), 3)
+
+
+class DirectCounterTests(TestCase):
+    """Without write-behind (any cache but Redis) counters go straight to the row"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", guest_name="Guest")
+
+    def stored(self, field):
+        return ForumPost.objects.values_list(field, flat=True).get(pk=self.post.pk)
+
+    @override_settings(COUNTER_WRITE_BEHIND=False)
+    def test_counters_are_written_directly(self):
+        for expected in (1, 2):
+            response = self.client.get(f'/api/forum/posts/{self.post.pk}/')
+            self.assertEqual(response.data['views_count'], expected)
+            self.assertEqual(self.stored('views_count'), expected)
+        self.assertFalse(buffer_increment(ForumPost, 'views_count', self.post.pk, 3))
+        self.assertEqual(self.stored('views_count'), 5)
+        self.assertEqual(pending_deltas(ForumPost, 'views_count', [self.post.pk]), {})
+
+        User = get_user_model()
+        user = User.objects.create_user(username='liker', email='liker@example.com', password='long-enough-pw')
+        self.client.force_authenticate(user)
+        response = self.client.post(f'/api/forum/posts/{self.post.pk}/like/')
+        self.assertEqual(response.data['likes_count'], 1)
+        self.assertEqual(self.stored('likes_count'), 1)
+        self.assertEqual(flush_counters(include_recent=True), 0)
+
+    def test_only_redis_buffers_by_default(self):
+        self.assertEqual(settings.COUNTER_WRITE_BEHIND, settings.CACHE_BACKEND == 'redis')
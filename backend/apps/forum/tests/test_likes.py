@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from apps.forum.likes import toggle_like
+from apps.forum.models import Comment, ForumPost, Like
+from apps.utils.counter_buffer import flush_counters
+
+
+class LikeToggleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='liker', email='liker@example.com', password='long-enough-pw')
+        self.post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", guest_name="Guest")
+        self.comment = Comment.objects.create(post=self.post, content="A comment body.", guest_name="Guest")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_post_like_toggles_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(f'/api/forum/posts/{self.post.pk}/like/')
+        self.assertEqual(response.data, {'action': 'liked', 'likes_count': 1, 'is_liked': True})
+
+        response = self.client.post(f'/api/forum/posts/{self.post.pk}/like/')
+        self.assertEqual(response.data, {'action': 'unliked', 'likes_count': 0, 'is_liked': False})
+        self.assertFalse(Like.objects.exists())
+
+    def test_comment_like_keeps_counter(self):
+        response = self.client.post(f'/api/forum/comments/{self.comment.pk}/like/')
+        self.assertEqual(response.data['likes_count'], 1)
+        flush_counters(include_recent=True)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, self.comment.get_likes_count())
+
+    def test_missing_target_and_anonymous(self):
+        self.assertEqual(self.client.post('/api/forum/posts/999999/like/').status_code, 404)
+        self.assertEqual(APIClient().post(f'/api/forum/posts/{self.post.pk}/like/').status_code, 401)
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f'liker{i}', email=f'liker{i}@example.com', password='long-enough-pw')
+            for i in range(4)
+        ]
+        self.post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", guest_name="Guest")
+
+    def hammer(self, users):
+        def toggle(user):
+            try:
+                return toggle_like(user, post_id=self.post.pk)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            return list(pool.map(toggle, users))
+
+    def test_double_clicks_never_fail_or_drift(self):
+        states = self.hammer([user for user in self.users for _ in range(7)])
+        self.assertEqual(len(states), 28)
+
+        flush_counters(include_recent=True)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, self.post.get_likes_count())
+        self.assertLessEqual(self.post.likes_count, len(self.users))
+        # Every reported count is one the counter could actually have held
+        self.assertTrue(all(0 <= state.likes_count <= len(self.users) for state in states))
+
+
+@override_settings(COUNTER_WRITE_BEHIND=True)
+class BufferedConcurrentLikeTests(ConcurrentLikeTests):
+    """The same toggles with the counter in the write-behind buffer"""
+
+
+class BatchLikeStatusTests(TestCase):
+    url = '/api/forum/like-status/'
+
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='liker', email='liker@example.com', password='long-enough-pw')
+        self.posts = [
+            ForumPost.objects.create(title=f"Post {i}", content="Some post content.", guest_name="Guest")
+            for i in range(3)
+        ]
+        self.comment = Comment.objects.create(post=self.posts[0], content="A comment body.", guest_name="Guest")
+        Like.objects.create(post=self.posts[1], user=self.user)
+        Like.objects.create(comment=self.comment, user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.params = {
+            'posts': ",".join(str(post.pk) for post in self.posts),
+            'comments': str(self.comment.pk),
+        }
+
+    def test_states_in_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['posts'][self.posts[1].pk], {'is_liked': True, 'likes_count': 1})
+        self.assertEqual(response.data['posts'][self.posts[2].pk], {'is_liked': False, 'likes_count': 0})
+        self.assertEqual(response.data['comments'][self.comment.pk], {'is_liked': True, 'likes_count': 1})
+
+    def test_unchanged_result_is_not_modified(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        self.assertEqual(self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post(f'/api/forum/posts/{self.posts[2].pk}/like/')
+        self.assertEqual(self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_anonymous_and_invalid_ids(self):
+        with self.assertNumQueries(1):
+            response = APIClient().get(self.url, self.params)
+        self.assertFalse(response.data['posts'][self.posts[1].pk]['is_liked'])
+        self.assertEqual(self.client.get(self.url, {'posts': "1,x"}).status_code, 400)
+
+    def test_single_post_status(self):
+        response = self.client.get(f'/api/forum/posts/{self.posts[1].pk}/like-status/')
+        self.assertEqual(response.data, {'is_liked': True, 'likes_count': 1})
+        self.assertEqual(self.client.get('/api/forum/posts/999999/like-status/').status_code, 404)
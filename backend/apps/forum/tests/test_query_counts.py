@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.forum.models import Comment, ForumPost, ForumTag, Like
+
+
+class ForumListQueryCountTests(TestCase):
+    """Counts and like flags must not cost queries per post or comment"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='long-enough-pw')
+        self.writer = User.objects.create_user(username='writer', email='writer@example.com', password='long-enough-pw')
+        self.tag = ForumTag.objects.create(name="soil")
+        self.client = APIClient()
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = ForumPost.objects.create(title=f"Post {i}", content="Some post content.", author=self.writer)
+            post.tags.add(self.tag)
+            for j in range(3):
+                comment = Comment.objects.create(post=post, content="A comment body.", author=self.writer)
+                Like.objects.create(comment=comment, user=self.viewer)
+            Like.objects.create(post=post, user=self.viewer)
+            Like.objects.create(post=post, user=self.writer)
+
+    def list_queries(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/forum/posts/', {'page_size': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+
+    def test_constant_queries_with_viewer_likes(self):
+        self.client.force_authenticate(self.viewer)
+        self.create_posts(2)
+        _, few = self.list_queries(view='full')
+        self.create_posts(8)
+        response, many = self.list_queries(view='full')
+        # count, posts, tags, comments, viewer likes
+        self.assertEqual((few, many), (5, 5))
+
+        post = response.data['results'][0]
+        self.assertEqual((post['likes_count'], post['comments_count'], post['is_liked']), (2, 3, True))
+        self.assertTrue(all(comment['is_liked'] for comment in post['comments']))
+        self.assertEqual(post['comments'][0]['likes_count'], 1)
+
+    def test_anonymous_list_skips_like_lookup(self):
+        self.create_posts(3)
+        response, queries = self.list_queries(view='full')
+        self.assertEqual(queries, 4)
+        self.assertFalse(response.data['results'][0]['is_liked'])
+
+    def test_compact_list_skips_comments(self):
+        self.client.force_authenticate(self.viewer)
+        self.create_posts(4)
+        response, queries = self.list_queries()
+        # count, posts, tags, viewer likes
+        self.assertEqual(queries, 4)
+        post = response.data['results'][0]
+        self.assertNotIn('comments', post)
+        self.assertEqual((post['excerpt'], post['comments_count'], post['is_liked']), ("Some post content.", 3, True))
+
+    def test_counters_follow_deletes(self):
+        self.create_posts(1)
+        post = ForumPost.objects.get()
+        Like.objects.filter(post=post, user=self.writer).delete()
+        post.comments.first().delete()
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.comments_count), (1, 2))
@@ -0,0 +1,200 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.forum.cooccurrence import rebuild_cooccurrence, related_tags
+from apps.forum.models import ForumPost, ForumPostTag, ForumTag, ForumTagPair
+from apps.forum.tags import normalize_tag_names, resolve_tags, set_post_tags
+
+
+class ForumTagTypeaheadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for name in ["irrigation", "irrigation-policy", "water"]:
+            ForumTag.objects.create(name=name)
+
+    def test_typeahead_strips_hash_and_ranks_prefix_first(self):
+        response = self.client.get('/api/forum/tags/typeahead/', {'q': '#Irrig'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag['name'] for tag in response.data], ["irrigation", "irrigation-policy"])
+
+
+class ForumTagResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tag = ForumTag.objects.create(name="soil")
+
+    def test_anonymous_list_is_cached_until_tags_change(self):
+        self.client.get('/api/forum/tags/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/forum/tags/')
+
+        post = ForumPost.objects.create(title="Soil health", content="Notes on soil health.", guest_name="Guest")
+        post.tags.add(self.tag)
+        # Re-rendered: count + page
+        with self.assertNumQueries(2):
+            self.client.get('/api/forum/tags/')
+
+
+class ForumTagUsageCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.soil, self.water, self.seeds = (
+            ForumTag.objects.create(name=name) for name in ["soil", "water", "seeds"]
+        )
+        self.post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", guest_name="Guest")
+
+    def counts(self):
+        return dict(ForumTag.objects.values_list("name", "usage_count"))
+
+    def test_counts_follow_link_changes(self):
+        self.post.tags.set([self.soil, self.water])
+        self.post.tags.set([self.soil, self.water])
+        self.assertEqual(self.counts(), {"soil": 1, "water": 1, "seeds": 0})
+
+        self.seeds.posts.add(self.post)
+        ForumPostTag.objects.filter(tag=self.water).delete()
+        self.assertEqual(self.counts(), {"soil": 1, "water": 0, "seeds": 1})
+
+        self.post.tags.clear()
+        self.assertEqual(self.counts(), {"soil": 0, "water": 0, "seeds": 0})
+
+    def test_post_deletion_decrements(self):
+        other = ForumPost.objects.create(title="Water", content="Notes on water.", guest_name="Guest")
+        ForumPostTag.objects.create(post=other, tag=self.water)
+        self.post.tags.add(self.water)
+        self.post.delete()
+        self.assertEqual(self.counts()["water"], 1)
+
+    def test_popular_tags_orders_by_usage(self):
+        other = ForumPost.objects.create(title="Water", content="Notes on water.", guest_name="Guest")
+        self.post.tags.add(self.water, self.soil)
+        other.tags.add(self.water)
+
+        response = self.client.get('/api/forum/tags/popular/', {'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(tag['name'], tag['usage_count']) for tag in response.data], [("water", 2), ("soil", 1)])
+
+    def test_reconcile_fixes_drift(self):
+        self.post.tags.add(self.soil)
+        ForumTag.objects.filter(pk=self.soil.pk).update(usage_count=7)
+        ForumTag.objects.filter(pk=self.seeds.pk).update(usage_count=-1)
+
+        out = io.StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("2 rows fixed", out.getvalue())
+        self.assertEqual(self.counts(), {"soil": 1, "water": 0, "seeds": 0})
+
+
+class TagResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='writer', email='writer@example.com', password='long-enough-pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        ForumTag.objects.create(name="soil")
+
+    def counts(self):
+        return dict(ForumTag.objects.values_list("name", "usage_count"))
+
+    def test_normalizes_and_resolves_in_two_queries(self):
+        self.assertEqual(normalize_tag_names(["#Soil", " soil ", "Cover  Crops", "", "#"]), ["soil", "cover-crops"])
+        with self.assertNumQueries(2):
+            tags = resolve_tags(["Water", "#soil", "seeds", "water"])
+        self.assertEqual([tag.name for tag in tags], ["water", "soil", "seeds"])
+
+    def test_set_post_tags_diffs_and_counts(self):
+        post = ForumPost.objects.create(title="Soil health", content="Notes on soil.", author=self.user)
+        set_post_tags(post, ["soil", "water"])
+        set_post_tags(post, ["water", "seeds"])
+        self.assertEqual(self.counts(), {"soil": 0, "water": 1, "seeds": 1})
+        self.assertEqual(sorted(post.tags.values_list("name", flat=True)), ["seeds", "water"])
+
+        set_post_tags(post, [])
+        self.assertEqual(self.counts(), {"soil": 0, "water": 0, "seeds": 0})
+
+    def test_create_and_update_through_the_api(self):
+        response = self.client.post('/api/forum/posts/', {
+            "title": "Rotation", "content": "Which cover crops work best?", "tag_names": ["#Soil", "rye"],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        post_id = response.data["id"]
+
+        response = self.client.patch(f'/api/forum/posts/{post_id}/', {"tag_names": ["rye", "Water"]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(tag["name"] for tag in response.data["tags"]), ["rye", "water"])
+        self.assertEqual(self.counts(), {"soil": 0, "rye": 1, "water": 1})
+
+    def test_guest_post_tags(self):
+        response = APIClient().post('/api/forum/guest/posts/', {
+            "title": "Irrigation", "content": "Drip or sprinkler irrigation?", "guest_name": "Guest",
+            "guest_affiliation": "Farm", "tag_names": ["#Irrigation", "soil"],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counts(), {"soil": 1, "irrigation": 1})
+
+
+class TagCooccurrenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.posts = [
+            ForumPost.objects.create(title=f"Post {i}", content="Some post content.", guest_name="Guest")
+            for i in range(3)
+        ]
+        set_post_tags(self.posts[0], ["soil", "water", "seeds"])
+        set_post_tags(self.posts[1], ["soil", "water"])
+        set_post_tags(self.posts[2], ["soil", "compost"])
+
+    def pairs(self):
+        return {
+            (tag, related): count
+            for tag, related, count in ForumTagPair.objects.values_list("tag__name", "related__name", "count")
+        }
+
+    def related(self, tags):
+        response = self.client.get('/api/forum/tags/related/', {'tags': tags})
+        self.assertEqual(response.status_code, 200)
+        return [(tag['name'], tag['count']) for tag in response.data]
+
+    def test_related_tags(self):
+        self.assertEqual(self.related("soil"), [("water", 2), ("compost", 1), ("seeds", 1)])
+        self.assertEqual(self.related("#soil, water"), [("seeds", 1)])
+        with self.assertNumQueries(1):
+            related_tags(["soil"], 10)
+        with self.assertNumQueries(1):
+            related_tags(["soil", "water"], 10)
+
+    def test_related_tags_count_posts_with_the_whole_set(self):
+        # rye appears with soil and with water, never with both
+        for names in (["soil", "rye"], ["water", "rye"], ["soil", "water", "compost"]):
+            post = ForumPost.objects.create(title="Extra", content="Some post content.", guest_name="Guest")
+            set_post_tags(post, names)
+        self.assertEqual(self.related("soil water"), [("compost", 1), ("seeds", 1)])
+        self.assertEqual(self.related("soil"), [("water", 3), ("compost", 2), ("rye", 1), ("seeds", 1)])
+
+    def test_matrix_follows_every_change_path(self):
+        set_post_tags(self.posts[1], ["water", "compost"])
+        self.posts[2].tags.remove(ForumTag.objects.get(name="soil"))
+        ForumTag.objects.get(name="seeds").posts.add(self.posts[2])
+        self.posts[0].delete()
+
+        expected = self.pairs()
+        rebuild_cooccurrence()
+        self.assertEqual(self.pairs(), expected)
+        self.assertEqual(expected, {
+            ("water", "compost"): 1, ("compost", "water"): 1,
+            ("compost", "seeds"): 1, ("seeds", "compost"): 1,
+        })
+
+    def test_and_filter(self):
+        response = self.client.get('/api/forum/posts/', {'tags': "#soil water"})
+        self.assertEqual(sorted(post["title"] for post in response.data["results"]), ["Post 0", "Post 1"])
+        response = self.client.get('/api/forum/posts/', {'tags': "soil water missing"})
+        self.assertEqual(response.data["results"], [])
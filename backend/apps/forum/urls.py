@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ForumPostViewSet, CommentViewSet, ForumTagViewSet, create_guest_post, get_popular_tags
+from .views import (
+    ForumPostViewSet, CommentViewSet, ForumTagViewSet, create_guest_post, get_popular_tags, batch_like_status,
+)
 
 router = DefaultRouter()
 router.register(r'posts', ForumPostViewSet)
@@ -8,9 +10,11 @@ router.register(r'comments', CommentViewSet)
 router.register(r'tags', ForumTagViewSet)
 
 urlpatterns = [
+    # Before the router, whose tags/<pk>/ route would otherwise match "popular"
+    path('tags/popular/', get_popular_tags, name='popular-tags'),
     path('', include(router.urls)),
     path('guest/posts/', create_guest_post, name='guest-post'),
-    path('tags/popular/', get_popular_tags, name='popular-tags'),
+    path('like-status/', batch_like_status, name='batch-like-status'),
     # Like endpoints are automatically included via the router:
     # /api/forum/posts/{id}/like_post/
     # /api/forum/comments/{id}/like_comment/
@@ -1,17 +1,33 @@
 # apps/forum/views.py
+import hashlib
+import json
+import re
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.db.models import Prefetch, Q
 from django.utils.dateparse import parse_date
-from .models import ForumPost, Comment, Like, ForumTag
+from .models import ForumPost, Comment, ForumTag
+from .cooccurrence import posts_with_all_tags, related_tags
+from .likes import LIKE_STATUS_MAX_IDS, like_statuses, toggle_like
+from .tags import normalize_tag_names, set_post_tags
+from apps.utils.typeahead import typeahead_search, parse_limit
+from apps.utils.response_cache import AnonymousResponseCacheMixin
+from apps.utils.counter_buffer import apply_pending, buffer_increment
+from .signals import TAG_RESPONSES
 from .serializers import (
     ForumPostSerializer, CommentSerializer, 
     GuestPostSerializer, GuestCommentSerializer,
-    ForumTagSerializer
+    ForumTagSerializer, ForumPostListSerializer, liked_ids_context
 )
+from .pagination import CommentKeysetPagination, PostKeysetPagination
+from apps.utils.pagination import wants_keyset
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAuthenticatedOrReadOnly, IsAdminUser, BasePermission
 import logging
 from rest_framework.throttling import ScopedRateThrottle
@@ -20,6 +36,27 @@ from rest_framework import serializers  # Add this import
 
 logger = logging.getLogger(__name__)
 
+def like_response(request, noun, **target):
+    """Toggle the user's like on a post or comment; the state comes back from the same statement"""
+    # Only allow authenticated users to store likes in backend
+    if not (request.user and request.user.is_authenticated):
+        return Response(
+            {'error': f'Authentication required to like {noun}'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    try:
+        target = {key: int(value) for key, value in target.items()}
+    except (TypeError, ValueError):
+        raise Http404
+    state = toggle_like(request.user, **target)
+    if state is None:
+        raise Http404
+    return Response({
+        'action': 'liked' if state.is_liked else 'unliked',
+        'likes_count': state.likes_count,
+        'is_liked': state.is_liked,
+    }, status=status.HTTP_200_OK)
+
 class IsSuperUser(BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_superuser)
@@ -41,11 +78,22 @@ class ForumPostViewSet(viewsets.ModelViewSet):
         """
         Allow anyone to view posts, but require authentication for creating/editing
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'comments']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    def embeds_comments(self):
+        """Only the detail view and the opt-in ?view=full list nest comment trees"""
+        if self.action == 'retrieve':
+            return True
+        return self.action == 'list' and self.request.query_params.get('view') == 'full'
+
+    def get_serializer_class(self):
+        if self.action == 'list' and not self.embeds_comments():
+            return ForumPostListSerializer
+        return super().get_serializer_class()
     
     def perform_create(self, serializer):
         try:
@@ -68,82 +116,50 @@ class ForumPostViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny], url_path='comments')
+    def comments(self, request, pk=None):
+        """
+        Comments of a post, newest first, keyset-paginated with an opaque ?cursor=
+        """
+        post = get_object_or_404(ForumPost.objects.only('id'), pk=pk)
+        paginator = CommentKeysetPagination()
+        page = paginator.paginate_queryset(
+            Comment.objects.filter(post=post).select_related('author'), request, view=self
+        )
+        apply_pending(page, ['likes_count'])
+        context = self.get_serializer_context()
+        context.update(liked_ids_context(request, comments=page))
+        serializer = CommentSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['get'], permission_classes=[AllowAny], url_path='like-status')
     def like_status(self, request, pk=None):
         """
         Get the current like status for a post (only for authenticated users)
         """
         try:
-            post = self.get_object()
-            
-            if request.user and request.user.is_authenticated:
-                is_liked = post.is_liked_by_user(request.user)
-                likes_count = post.get_likes_count()
-            else:
-                # For non-authenticated users, return false and actual count
-                is_liked = False
-                likes_count = post.get_likes_count()
-            
-            return Response({
-                'is_liked': is_liked,
-                'likes_count': likes_count
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            logger.error(f"Error getting like status for post {pk}: {str(e)}")
-            return Response(
-                {'error': 'Failed to get like status'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            post_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        statuses = like_statuses(request.user, post_ids=[post_id])['posts']
+        if post_id not in statuses:
+            raise Http404
+        return Response(statuses[post_id], status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[AllowAny], url_path='like')
     def like(self, request, pk=None):
         """
         Like/unlike a forum post (only stores likes for authenticated users)
         """
-        try:
-            post = self.get_object()
-            
-            # Only allow authenticated users to store likes in backend
-            if not (request.user and request.user.is_authenticated):
-                return Response(
-                    {'error': 'Authentication required to like posts'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            
-            user = request.user
-            
-            # Check if already liked and toggle
-            like_obj = Like.objects.filter(post=post, user=user).first()
-            if like_obj:
-                # Unlike - delete the like
-                like_obj.delete()
-                action_taken = 'unliked'
-            else:
-                # Like - create new like
-                Like.objects.create(post=post, user=user)
-                action_taken = 'liked'
-            
-            # Get fresh counts (only authenticated user likes)
-            likes_count = post.get_likes_count()
-            is_liked = post.is_liked_by_user(user)
-            
-            return Response({
-                'action': action_taken,
-                'likes_count': likes_count,
-                'is_liked': is_liked
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            logger.error(f"Error liking post {pk}: {str(e)}")
-            return Response(
-                {'error': f'Failed to like post: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return like_response(request, 'posts', post_id=pk)
 
     def get_queryset(self):
         """Enhanced queryset with search, tag filtering, and date filtering"""
-        queryset = ForumPost.objects.all().prefetch_related('tags', 'comments')
+        queryset = ForumPost.objects.select_related('author').prefetch_related('tags')
+        if self.embeds_comments():
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=Comment.objects.select_related('author'))
+            )
         
         # Search functionality
         search = self.request.query_params.get('search', '').strip()
@@ -155,19 +171,10 @@ class ForumPostViewSet(viewsets.ModelViewSet):
             )
         
         # Tag filtering (exact match, all tags must be present)
-        tag_search = self.request.query_params.get('tags', '').strip()
-        if tag_search:
-            # Parse hashtags from search
-            tag_names = []
-            for tag in tag_search.split():
-                clean_tag = tag.strip().lower().lstrip('#')
-                if clean_tag:
-                    tag_names.append(clean_tag)
-            
-            if tag_names:
-                # Posts must have ALL specified tags
-                for tag_name in tag_names:
-                    queryset = queryset.filter(tags__name=tag_name)
+        tag_names = normalize_tag_names(self.request.query_params.get('tags', '').split())
+        if tag_names:
+            # Posts must have ALL specified tags
+            queryset = queryset.filter(id__in=posts_with_all_tags(tag_names))
         
         # Date filtering
         date_from = self.request.query_params.get('date_from')
@@ -189,11 +196,19 @@ class ForumPostViewSet(viewsets.ModelViewSet):
             except ValueError:
                 pass
         
-        return queryset.distinct().order_by('-pinned', '-created_at')
+        return queryset.order_by('-pinned', '-created_at')
     
     def list(self, request, *args, **kwargs):
         """Override list to add pagination"""
         queryset = self.filter_queryset(self.get_queryset())
+
+        # Opt-in keyset pagination: no COUNT(*) or OFFSET unless asked for
+        if wants_keyset(request):
+            paginator = PostKeysetPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.get_post_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         # Ensure ordering by pinned before paginating
         queryset = queryset.order_by('-pinned', '-created_at')
         
@@ -209,7 +224,7 @@ class ForumPostViewSet(viewsets.ModelViewSet):
         except Exception:
             page_obj = paginator.get_page(1)
         
-        serializer = self.get_serializer(page_obj, many=True)
+        serializer = self.get_post_serializer(page_obj.object_list, many=True)
         
         return Response({
             'results': serializer.data,
@@ -223,6 +238,27 @@ class ForumPostViewSet(viewsets.ModelViewSet):
             }
         })
     
+    def retrieve(self, request, *args, **kwargs):
+        post = self.get_object()
+        if not buffer_increment(ForumPost, 'views_count', post.pk):
+            # Written to the row after it was read
+            post.views_count += 1
+        serializer = self.get_post_serializer([post])
+        return Response(serializer.data)
+
+    def get_post_serializer(self, posts, many=False):
+        """Serialize posts with the viewer's likes on them and their comments looked up once"""
+        posts = list(posts)
+        comments = []
+        if self.embeds_comments():
+            comments = [comment for post in posts for comment in post.comments.all()]
+        # Counters with write-behind deltas still waiting in the buffer
+        apply_pending(posts, ['likes_count', 'views_count'])
+        apply_pending(comments, ['likes_count'])
+        context = self.get_serializer_context()
+        context.update(liked_ids_context(self.request, posts, comments))
+        return self.get_serializer(posts if many else posts[0], many=many, context=context)
+    
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
@@ -242,7 +278,7 @@ class ForumPostViewSet(viewsets.ModelViewSet):
         return Response({"pinned": post.pinned})
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
     # Use AllowAny for read operations, require auth for write operations
     permission_classes = [AllowAny]
@@ -261,6 +297,19 @@ class CommentViewSet(viewsets.ModelViewSet):
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    def list(self, request, *args, **kwargs):
+        """Paginated comments with the viewer's likes looked up in one query"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        comments = list(page) if page is not None else list(queryset)
+        apply_pending(comments, ['likes_count'])
+        context = self.get_serializer_context()
+        context.update(liked_ids_context(request, comments=comments))
+        serializer = self.get_serializer(comments, many=True, context=context)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
     
     def perform_create(self, serializer):
         try:
@@ -279,50 +328,14 @@ class CommentViewSet(viewsets.ModelViewSet):
         """
         Like/unlike a comment (only stores likes for authenticated users)
         """
-        try:
-            comment = self.get_object()
-            
-            # Only allow authenticated users to store likes in backend
-            if not (request.user and request.user.is_authenticated):
-                return Response(
-                    {'error': 'Authentication required to like comments'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            
-            user = request.user
-            
-            # Check if already liked and toggle
-            like_obj = Like.objects.filter(comment=comment, user=user).first()
-            if like_obj:
-                # Unlike - delete the like
-                like_obj.delete()
-                action_taken = 'unliked'
-            else:
-                # Like - create new like
-                Like.objects.create(comment=comment, user=user)
-                action_taken = 'liked'
-            
-            # Return updated comment data
-            serializer = self.get_serializer(comment)
-            return Response({
-                'action': action_taken,
-                'likes_count': comment.get_likes_count(),
-                'is_liked': comment.is_liked_by_user(user),
-                'comment': serializer.data
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            logger.error(f"Error liking comment {pk}: {str(e)}")
-            return Response(
-                {'error': f'Failed to like comment: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return like_response(request, 'comments', comment_id=pk)
 
-class ForumTagViewSet(viewsets.ReadOnlyModelViewSet):
+class ForumTagViewSet(AnonymousResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for forum tags - read-only for listing and searching"""
     queryset = ForumTag.objects.all()
     serializer_class = ForumTagSerializer
     permission_classes = [AllowAny]
+    response_cache_namespace = TAG_RESPONSES
     
     def get_queryset(self):
         """Filter tags by search term"""
@@ -339,6 +352,30 @@ class ForumTagViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset.order_by('-usage_count', 'name')
 
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """Prefix-first, similarity-ranked tag suggestions for autocomplete"""
+        term = request.query_params.get('q', '').strip().lower().lstrip('#')
+        tags = typeahead_search(
+            ForumTag.objects.all(),
+            term,
+            limit=parse_limit(request.query_params.get('limit')),
+        )
+        serializer = self.get_serializer(tags, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def related(self, request):
+        """
+        Tags most often used together with all of ?tags= (space or comma
+        separated), from the maintained co-occurrence matrix
+        """
+        names = normalize_tag_names(re.split(r'[\s,]+', request.query_params.get('tags', '')))
+        if not names:
+            return Response({'error': 'tags is required'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = parse_limit(request.query_params.get('limit'), default=10, maximum=50)
+        return Response(related_tags(names, limit))
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_guest_post(request):
@@ -363,11 +400,7 @@ def create_guest_post(request):
         )
         # Add tags if provided
         if tag_names:
-            tag_instances = []
-            for tag_name in tag_names:
-                tag_obj, _ = ForumTag.objects.get_or_create(name=tag_name.lower().lstrip('#'))
-                tag_instances.append(tag_obj)
-            post.tags.set(tag_instances)
+            set_post_tags(post, tag_names)
         # Return the created post data
         return Response(
             ForumPostSerializer(post).data,
@@ -379,7 +412,45 @@ def create_guest_post(request):
 @permission_classes([AllowAny])
 def get_popular_tags(request):
     """Get most popular forum tags"""
-    limit = int(request.query_params.get('limit', 20))
-    tags = ForumTag.objects.filter(usage_count__gt=0)[:limit]
+    limit = parse_limit(request.query_params.get('limit'), default=20, maximum=100)
+    # usage_count is maintained by apps.forum.signals; served from forum_tag_popular
+    tags = ForumTag.objects.filter(usage_count__gt=0).order_by('-usage_count', 'name')[:limit]
     serializer = ForumTagSerializer(tags, many=True)
     return Response(serializer.data)
+
+
+def _parse_ids(value):
+    """Comma separated ids as a list of ints; raises ValueError on anything else"""
+    return [int(part) for part in value.split(',') if part.strip()] if value else []
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def batch_like_status(request):
+    """
+    Like state of many posts and comments at once:
+    ?posts=1,2,3&comments=4,5 -> {"posts": {id: {is_liked, likes_count}}, "comments": {...}}
+
+    Answers 304 when If-None-Match carries the ETag of an unchanged result.
+    """
+    try:
+        post_ids = _parse_ids(request.query_params.get('posts'))
+        comment_ids = _parse_ids(request.query_params.get('comments'))
+    except ValueError:
+        return Response({'error': 'posts and comments must be comma separated ids'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if len(post_ids) + len(comment_ids) > LIKE_STATUS_MAX_IDS:
+        return Response({'error': f'At most {LIKE_STATUS_MAX_IDS} ids per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    data = like_statuses(request.user, post_ids, comment_ids)
+    user_id = request.user.pk if request.user.is_authenticated else None
+    digest = hashlib.sha1(json.dumps([user_id, data], sort_keys=True).encode()).hexdigest()
+    etag = f'"{digest}"'
+
+    response = get_conditional_response(request, etag=etag) or Response(data)
+    response['ETag'] = etag
+    # The like flags depend on who is asking
+    patch_cache_control(response, private=True)
+    patch_vary_headers(response, ['Authorization', 'Cookie'])
+    return response
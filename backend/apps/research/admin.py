@@ -247,18 +247,7 @@ class ResearchPaperAdmin(admin.ModelAdmin):
     actions = ['export_as_csv']
     
     def export_as_csv(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="papers.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Title', 'Authors', 'Year', 'Journal', 'DOI'])
-        
-        for paper in queryset:
-            authors = ', '.join([author.name for author in paper.authors.all()])
-            writer.writerow([paper.title, authors, paper.publication_year, paper.journal, paper.doi])
-        
-        return response
+        from .export import export_response
+
+        return export_response(queryset, 'csv')
     export_as_csv.short_description = "Export selected papers as CSV"
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class ResearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.research'
+
+    def ready(self):
+        from . import signals  # noqa: F401
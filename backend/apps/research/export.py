@@ -0,0 +1,60 @@
+"""
+Streaming export of research papers.
+
+Papers are read with a server-side cursor (``QuerySet.iterator``) and their
+authors and keywords are prefetched one chunk at a time, so an export of the
+whole catalogue costs three queries per ``EXPORT_CHUNK_SIZE`` papers and memory
+bounded by the chunk, not by the number of papers.
+"""
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+
+from .formats import WRITERS
+from .models import Author, Keyword
+
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_CONTENT_TYPES = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'bibtex': ('application/x-bibtex; charset=utf-8', 'bib'),
+}
+
+
+def paper_record(paper):
+    """Export/import representation of a paper with prefetched authors and keywords"""
+    return {
+        'title': paper.title,
+        'slug': paper.slug,
+        'abstract': paper.abstract,
+        'authors': [author.name for author in paper.authors.all()],
+        'keywords': [keyword.name for keyword in paper.keywords.all()],
+        'publication_year': paper.publication_year,
+        'journal': paper.journal,
+        'doi': paper.doi,
+        'download_url': paper.download_url,
+        'methodology_type': paper.methodology_type,
+        'citation_count': paper.citation_count,
+        'citation_trend': paper.citation_trend,
+        'volume': paper.volume,
+        'issue': paper.issue,
+        'pages': paper.pages,
+    }
+
+
+def export_papers(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Lazily yield paper records, prefetching names per chunk"""
+    queryset = queryset.prefetch_related(None).prefetch_related(
+        Prefetch('authors', queryset=Author.objects.only('id', 'name').order_by('name')),
+        Prefetch('keywords', queryset=Keyword.objects.only('id', 'name').order_by('name')),
+    )
+    for paper in queryset.iterator(chunk_size=chunk_size):
+        yield paper_record(paper)
+
+
+def export_response(queryset, output, filename='papers'):
+    """StreamingHttpResponse with the papers of ``queryset`` in format ``output``"""
+    content_type, extension = EXPORT_CONTENT_TYPES[output]
+    response = StreamingHttpResponse(WRITERS[output](export_papers(queryset)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
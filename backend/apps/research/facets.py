@@ -0,0 +1,138 @@
+"""
+Facet counts for the paper list.
+
+``paper_facets`` counts the papers of a filtered queryset per methodology,
+publication year bucket, keyword category and keyword in one statement: the
+matching papers are joined to their keywords once and aggregated with
+``GROUPING SETS``, one set per facet, so every count is a ``COUNT(DISTINCT)``
+of papers however many keywords they carry. Only the ``FACET_TOP_KEYWORDS``
+most used keywords are returned.
+
+``get_facets`` caches the result under a key built from the filter parameters
+alone (sorted, blanks dropped, paging and sorting ignored) and the generation
+of the research response cache, so every signal that invalidates the cached
+paper list also orphans the facets.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+
+from apps.utils.response_cache import RESPONSE_CACHE_TIMEOUT, get_generation
+
+from .models import Keyword, KeywordCategory, ResearchPaper
+from .signals import RESEARCH_RESPONSES
+
+FACET_TOP_KEYWORDS = 20
+FACET_YEAR_BUCKET = 10
+
+# Query parameters that change the page or its order, not the matching papers
+_NON_FILTER_PARAMS = {'facets', 'page', 'page_size', 'pagination', 'cursor', 'count', 'sort', 'ordering', 'format'}
+
+_FACETS_SQL = """
+    WITH matched AS ({matched}),
+    rows AS (
+        SELECT paper.id AS paper_id,
+               paper.methodology_type,
+               paper.publication_year_int / %s * %s AS year_bucket,
+               keyword.id AS keyword_id, keyword.name AS keyword_name,
+               -- 0 groups uncategorized keywords; NULL means the paper has none
+               CASE WHEN keyword.id IS NOT NULL THEN COALESCE(keyword.category_id, 0) END AS category_id,
+               category.name AS category_name
+        FROM {papers} paper
+        LEFT JOIN {links} link ON link.researchpaper_id = paper.id
+        LEFT JOIN {keywords} keyword ON keyword.id = link.keyword_id
+        LEFT JOIN {categories} category ON category.id = keyword.category_id
+        WHERE paper.id IN (SELECT id FROM matched)
+    ),
+    facets AS (
+        SELECT CASE WHEN GROUPING(methodology_type) = 0 THEN 'methodology'
+                    WHEN GROUPING(year_bucket) = 0 THEN 'year'
+                    WHEN GROUPING(category_id) = 0 THEN 'category'
+                    ELSE 'keyword' END AS facet,
+               methodology_type, year_bucket, category_id, category_name, keyword_id, keyword_name,
+               COUNT(DISTINCT paper_id) AS papers
+        FROM rows
+        GROUP BY GROUPING SETS (
+            (methodology_type), (year_bucket), (category_id, category_name), (keyword_id, keyword_name)
+        )
+    ),
+    ranked AS (
+        SELECT facets.*, ROW_NUMBER() OVER (PARTITION BY facet ORDER BY papers DESC, keyword_name) AS rank
+        FROM facets
+        WHERE CASE facet WHEN 'methodology' THEN TRUE
+                         WHEN 'year' THEN year_bucket IS NOT NULL
+                         WHEN 'category' THEN category_id IS NOT NULL
+                         ELSE keyword_id IS NOT NULL END
+    )
+    SELECT facet, methodology_type, year_bucket, category_id, category_name, keyword_id, keyword_name, papers
+    FROM ranked
+    WHERE facet <> 'keyword' OR rank <= %s
+"""
+
+
+def _facets_sql(matched):
+    return _FACETS_SQL.format(
+        matched=matched,
+        papers=ResearchPaper._meta.db_table,
+        links=ResearchPaper.keywords.through._meta.db_table,
+        keywords=Keyword._meta.db_table,
+        categories=KeywordCategory._meta.db_table,
+    )
+
+
+def paper_facets(queryset, top_keywords=FACET_TOP_KEYWORDS, year_bucket=FACET_YEAR_BUCKET):
+    """Per-facet paper counts of ``queryset``, most papers first (years in order)"""
+    facets = {'methodology_types': [], 'years': [], 'keyword_categories': [], 'keywords': []}
+    try:
+        matched, params = queryset.order_by().values('id').query.sql_with_params()
+    except EmptyResultSet:
+        return facets
+
+    with connection.cursor() as cursor:
+        cursor.execute(_facets_sql(matched), [*params, year_bucket, year_bucket, top_keywords])
+        rows = cursor.fetchall()
+
+    for facet, methodology, bucket, category_id, category_name, keyword_id, keyword_name, count in rows:
+        if facet == 'methodology':
+            facets['methodology_types'].append({'value': methodology, 'count': count})
+        elif facet == 'year':
+            facets['years'].append({'from': bucket, 'to': bucket + year_bucket - 1, 'count': count})
+        elif facet == 'category':
+            facets['keyword_categories'].append({
+                # Same id and name as the uncategorized group of filter_options
+                'id': category_id or 'uncategorized',
+                'name': category_name if category_id else 'Other Keywords',
+                'count': count,
+            })
+        else:
+            facets['keywords'].append({'id': keyword_id, 'name': keyword_name, 'count': count})
+
+    facets['methodology_types'].sort(key=lambda entry: (-entry['count'], entry['value'] or ''))
+    facets['years'].sort(key=lambda entry: entry['from'])
+    facets['keyword_categories'].sort(key=lambda entry: (-entry['count'], entry['name'] or ''))
+    facets['keywords'].sort(key=lambda entry: (-entry['count'], entry['name']))
+    return facets
+
+
+def facet_cache_key(params):
+    """Cache key of the facets for the filters in ``params`` (a QueryDict)"""
+    filters = sorted(
+        (name, sorted(value for value in params.getlist(name) if value))
+        for name in params if name not in _NON_FILTER_PARAMS
+    )
+    normalized = [(name, values) for name, values in filters if values]
+    digest = hashlib.sha1(json.dumps(normalized).encode()).hexdigest()
+    return f'research:facets:{get_generation(RESEARCH_RESPONSES)}:{digest}'
+
+
+def get_facets(queryset, params):
+    """``paper_facets`` of ``queryset``, cached per normalized filter key"""
+    key = facet_cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = paper_facets(queryset)
+        cache.set(key, facets, RESPONSE_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,275 @@
+"""
+In-process filter index for the paper list.
+
+Most catalogue requests only filter by keyword (``keyword_logic`` and/or),
+methodology, year range and citation bounds. ``PaperFilterIndex`` keeps those
+attributes of every paper in numpy arrays, with papers numbered in the default
+catalogue order:
+
+* per keyword, the sorted positions of its papers (a compressed posting list,
+  like the array containers of a roaring bitmap),
+* per paper, its methodology code, integer year and citation count.
+
+Each condition of a request becomes a boolean bitset over all papers and the
+bitsets are AND-ed. The set positions are already in catalogue order, so a page
+is a slice of them and the database is only asked for that page's rows, by
+``id__in``.
+
+The index is loaded per process (``core.wsgi`` starts loading it when a worker
+boots) and tagged with the generation of the research response cache, which
+the catalogue signals and the importer bump on every write. A stale index is
+never used: requests go through the ORM while a rebuild runs in a background
+thread, at most once per ``REBUILD_INTERVAL``.
+
+The full-text clause that ``get_queryset`` adds for ``keyword`` terms is not
+evaluated here: a paper linked to a keyword carries the keyword's words in its
+search vector, so the keyword link filter implies it.
+
+numpy is an optional dependency: without it, or with settings.PAPER_FILTER_INDEX
+off, ``get_filter_index`` returns None and callers use the ORM.
+"""
+import itertools
+import logging
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models.functions import Upper
+
+from apps.utils.response_cache import get_generation
+
+from .models import Keyword, ResearchPaper
+from .signals import RESEARCH_RESPONSES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# The paper list's default order; positions in the index follow it
+CATALOGUE_ORDER = ('-publication_year', '-created_at', 'id')
+# Filters the index answers
+INDEXED_PARAMS = {'keyword', 'keyword_logic', 'methodology_type', 'year_from', 'year_to',
+                  'min_citations', 'max_citations'}
+# Parameters that do not change which papers match, or in which order
+_NEUTRAL_PARAMS = {'page', 'format', 'facets'}
+# Seconds between background rebuilds after the catalogue changed
+REBUILD_INTERVAL = 30
+
+
+def is_available():
+    return np is not None and settings.PAPER_FILTER_INDEX
+
+
+def can_answer(params):
+    """Whether a paper list request with query ``params`` only uses indexed filters"""
+    if params.get('keyword_logic', '').lower() == 'and' and not all(
+        keyword.isascii() for keyword in params.getlist('keyword')
+    ):
+        # Only ASCII terms upper-case in Python as they do in Postgres
+        return False
+    return all(
+        name in INDEXED_PARAMS or name in _NEUTRAL_PARAMS or not any(params.getlist(name))
+        for name in params
+    )
+
+
+class PaperFilterIndex:
+    """Filterable paper attributes of one catalogue generation"""
+
+    def __init__(self, version, ids, methodologies, methodology_codes, years, citations,
+                 keyword_ids, keyword_indptr, keyword_positions, keyword_names, keyword_terms):
+        self.version = version
+        self.ids = ids
+        self.methodologies = methodologies
+        self.methodology_codes = methodology_codes
+        # 0 for undated papers
+        self.years = years
+        self.citations = citations
+        # Postings of keyword_ids[i]: keyword_positions[keyword_indptr[i]:keyword_indptr[i + 1]]
+        self.keyword_ids = keyword_ids
+        self.keyword_indptr = keyword_indptr
+        self.keyword_positions = keyword_positions
+        self.keyword_names = keyword_names
+        # UPPER(name), folded by Postgres like keyword_paper_ids does -> keyword ids
+        self.keyword_folded_names = {}
+        for term, keyword_id in keyword_terms:
+            self.keyword_folded_names.setdefault(term, []).append(keyword_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, version, chunk_size=5000):
+        """Read every paper and keyword link; two scans and one keyword name query"""
+        ids, methodologies, years, citations = array('q'), array('i'), array('h'), array('q')
+        methodology_codes = {}
+        papers = ResearchPaper.objects.order_by(*CATALOGUE_ORDER).values_list(
+            'id', 'methodology_type', 'publication_year_int', 'citation_count'
+        )
+        for paper_id, methodology, year, cited in papers.iterator(chunk_size=chunk_size):
+            ids.append(paper_id)
+            methodologies.append(methodology_codes.setdefault(methodology, len(methodology_codes)))
+            years.append(year or 0)
+            citations.append(cited)
+        ids = np.frombuffer(ids, dtype=np.int64)
+
+        links = ResearchPaper.keywords.through.objects.values_list('keyword_id', 'researchpaper_id')
+        links = np.fromiter(
+            itertools.chain.from_iterable(links.iterator(chunk_size=chunk_size)), dtype=np.int64
+        ).reshape(-1, 2)
+        # Paper id -> position; links of papers added since the first scan are dropped
+        by_id = np.argsort(ids)
+        slots = np.minimum(np.searchsorted(ids[by_id], links[:, 1]), max(len(ids) - 1, 0))
+        known = ids[by_id][slots] == links[:, 1] if len(ids) else np.zeros(len(links), dtype=bool)
+        keywords, positions = links[known, 0], by_id[slots[known]]
+        order = np.lexsort((positions, keywords))
+        keywords, positions = keywords[order], positions[order].astype(np.int32)
+        keyword_ids, starts = np.unique(keywords, return_index=True)
+        names = list(Keyword.objects.values_list('id', 'name', Upper('name')))
+
+        return cls(
+            version=version,
+            ids=ids,
+            methodologies=np.frombuffer(methodologies, dtype=np.int32),
+            methodology_codes=methodology_codes,
+            years=np.frombuffer(years, dtype=np.int16),
+            citations=np.frombuffer(citations, dtype=np.int64),
+            keyword_ids=keyword_ids,
+            keyword_indptr=np.append(starts, len(keywords)),
+            keyword_positions=positions,
+            keyword_names={name: keyword_id for keyword_id, name, _ in names},
+            keyword_terms=[(term, keyword_id) for keyword_id, _, term in names],
+        )
+
+    def postings(self, keyword_ids):
+        """Sorted positions of the papers linked to any of ``keyword_ids``"""
+        parts = []
+        for keyword_id in keyword_ids:
+            slot = int(np.searchsorted(self.keyword_ids, keyword_id))
+            if slot < len(self.keyword_ids) and self.keyword_ids[slot] == keyword_id:
+                parts.append(self.keyword_positions[self.keyword_indptr[slot]:self.keyword_indptr[slot + 1]])
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def match(self, keywords=(), keyword_logic='or', methodology_types=(), year_from=None, year_to=None,
+              min_citations=None, max_citations=None):
+        """
+        Positions, in catalogue order, of the papers matching the filters of
+        ``ResearchPaperViewSet.get_queryset``: keywords by exact name (or, with
+        ``keyword_logic='and'``, every keyword case-insensitively; ASCII terms
+        only, see ``can_answer``).
+        """
+        matched = np.ones(len(self.ids), dtype=bool)
+        if keywords:
+            if keyword_logic == 'and':
+                # Intersect from the rarest keyword up
+                lists = sorted(
+                    (self.postings(self.keyword_folded_names.get(name.upper(), ())) for name in keywords), key=len
+                )
+                positions = lists[0]
+                for other in lists[1:]:
+                    positions = positions[np.isin(positions, other, assume_unique=True)]
+            else:
+                positions = self.postings([self.keyword_names[name] for name in keywords if name in self.keyword_names])
+            linked = np.zeros(len(self.ids), dtype=bool)
+            linked[positions] = True
+            matched &= linked
+        if methodology_types:
+            codes = [self.methodology_codes[name] for name in methodology_types if name in self.methodology_codes]
+            matched &= np.isin(self.methodologies, codes)
+        if year_from is not None or year_to is not None:
+            matched &= self.years != 0
+        if year_from is not None:
+            matched &= self.years >= year_from
+        if year_to is not None:
+            matched &= self.years <= year_to
+        if min_citations is not None:
+            matched &= self.citations >= min_citations
+        if max_citations is not None:
+            matched &= self.citations <= max_citations
+        return np.flatnonzero(matched)
+
+
+class IndexedPapers:
+    """
+    Matched papers of an index lookup as a sequence Django's ``Paginator``
+    accepts: ``count()`` needs no query and a slice fetches its rows by id.
+    """
+
+    def __init__(self, index, positions, queryset):
+        self.index = index
+        self.positions = positions
+        self.queryset = queryset
+
+    def count(self):
+        return len(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def ids(self, item=slice(None)):
+        return [int(paper_id) for paper_id in self.index.ids[self.positions[item]]]
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        ids = self.ids(item)
+        papers = {paper.id: paper for paper in self.queryset.filter(id__in=ids)}
+        return [papers[paper_id] for paper_id in ids if paper_id in papers]
+
+
+_state = {'index': None, 'building': False, 'last_build': float('-inf')}
+_lock = threading.Lock()
+
+
+def load_filter_index():
+    """Build the index from the database now and make it this process's current one"""
+    version = get_generation(RESEARCH_RESPONSES)
+    _state['last_build'] = time.monotonic()
+    _state['index'] = PaperFilterIndex.build(version)
+    return _state['index']
+
+
+def _build_in_background():
+    try:
+        load_filter_index()
+    except DatabaseError:
+        logger.exception('Could not build the paper filter index')
+    finally:
+        _state['building'] = False
+        connection.close()
+
+
+def schedule_rebuild(force=False):
+    """Rebuild the index in a background thread unless one runs or ran recently"""
+    with _lock:
+        if _state['building']:
+            return
+        if not force and time.monotonic() - _state['last_build'] < REBUILD_INTERVAL:
+            return
+        _state['building'] = True
+        _state['last_build'] = time.monotonic()
+    threading.Thread(target=_build_in_background, daemon=True).start()
+
+
+def warm_filter_index():
+    """Start loading the index when a worker boots"""
+    if is_available():
+        schedule_rebuild(force=True)
+
+
+def get_filter_index():
+    """This process's index if it matches the current catalogue, else None (and rebuild it)"""
+    if not is_available():
+        return None
+    index = _state['index']
+    if index is not None and index.version == get_generation(RESEARCH_RESPONSES):
+        return index
+    schedule_rebuild()
+    return None
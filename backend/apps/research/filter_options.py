@@ -0,0 +1,117 @@
+"""
+Cached snapshot of the research catalogue filter options.
+
+``filter_options`` and ``paper_filter_options`` both render from one snapshot
+that is built with a fixed number of queries, stored in Django's cache and
+dropped by signals (and again on commit) whenever a paper, author, keyword or keyword category is
+saved or deleted. The snapshot carries an ETag and a build time so the views
+can answer conditional requests with 304.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Author, Keyword, KeywordCategory, ResearchPaper
+
+FILTER_OPTIONS_CACHE_KEY = 'research:filter_options'
+# Signals keep the snapshot fresh; the timeout only bounds drift from
+# queryset.update()/bulk_create() writes that bypass them
+FILTER_OPTIONS_CACHE_TIMEOUT = 60 * 60
+
+# Attribute used to memoise the snapshot on the request being served
+_REQUEST_ATTR = '_filter_options_snapshot'
+
+
+# Bounds of the years offered as filter options
+YEAR_RANGE = (1900, 2100)
+
+
+def build_filter_options():
+    """Compute the filter option snapshot straight from the database"""
+    methodology_types = list(
+        ResearchPaper.objects
+        .exclude(methodology_type__isnull=True)
+        .exclude(methodology_type__exact='')
+        .order_by('methodology_type')
+        .values_list('methodology_type', flat=True)
+        .distinct()
+    )
+
+    # Distinct years straight off the research_paper_year index
+    years = list(
+        ResearchPaper.objects
+        .filter(publication_year_int__range=YEAR_RANGE)
+        .order_by('publication_year_int')
+        .values_list('publication_year_int', flat=True)
+        .distinct()
+    )
+
+    # One pass over categories and one over keywords, grouped in Python
+    categories = list(KeywordCategory.objects.order_by('name').values('id', 'name', 'description'))
+    keywords_by_category = {category['id']: [] for category in categories}
+    uncategorized = []
+    for keyword in Keyword.objects.order_by('name').values('id', 'name', 'category_id'):
+        entry = {'id': keyword['id'], 'name': keyword['name']}
+        keywords_by_category.get(keyword['category_id'], uncategorized).append(entry)
+    for category in categories:
+        category['keywords'] = keywords_by_category[category['id']]
+
+    paper_counts = ResearchPaper.objects.aggregate(
+        total=Count('id'),
+        dated=Count('id', filter=~Q(publication_year='') & Q(publication_year__isnull=False)),
+    )
+
+    data = {
+        'methodology_types': methodology_types,
+        'years': years,
+        'categories': categories,
+        'uncategorized_keywords': uncategorized,
+        'total_papers': paper_counts['total'],
+        'total_dated_papers': paper_counts['dated'],
+        'total_authors': Author.objects.count(),
+        'total_keywords': sum(len(c['keywords']) for c in categories) + len(uncategorized),
+    }
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    return {
+        'data': data,
+        'etag': f'"{digest}"',
+        'last_modified': timezone.now().replace(microsecond=0),
+    }
+
+
+def get_filter_options(request=None):
+    """Return the cached snapshot, rebuilding it on a miss"""
+    if request is not None and hasattr(request, _REQUEST_ATTR):
+        return getattr(request, _REQUEST_ATTR)
+
+    snapshot = cache.get(FILTER_OPTIONS_CACHE_KEY)
+    if snapshot is None:
+        snapshot = build_filter_options()
+        cache.set(FILTER_OPTIONS_CACHE_KEY, snapshot, FILTER_OPTIONS_CACHE_TIMEOUT)
+
+    if request is not None:
+        setattr(request, _REQUEST_ATTR, snapshot)
+    return snapshot
+
+
+def invalidate_filter_options(**kwargs):
+    """
+    Drop the cached snapshot; usable directly as a signal receiver.
+
+    It is dropped again once the surrounding transaction commits, so a
+    snapshot built from pre-commit data in between is not kept.
+    """
+    cache.delete(FILTER_OPTIONS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(FILTER_OPTIONS_CACHE_KEY))
+
+
+def filter_options_etag(request, *args, **kwargs):
+    return get_filter_options(request)['etag']
+
+
+def filter_options_last_modified(request, *args, **kwargs):
+    return get_filter_options(request)['last_modified']
@@ -0,0 +1,240 @@
+"""
+Streaming readers and writers for paper catalogues in NDJSON, CSV and BibTeX.
+
+Each reader takes a text stream and lazily yields one dict per record in the
+shape accepted by ``PaperImportSerializer``. A record that cannot be parsed is
+yielded as a ``ValueError`` instead, so the importer can report it by index and
+carry on with the rest of the file. Writers do the reverse: they take an
+iterable of such dicts and lazily yield chunks of text, so an export can be
+imported again.
+
+In CSV, ``authors`` and ``keywords`` hold several names separated by ``;``.
+"""
+import csv
+import json
+import re
+
+FORMATS = ('ndjson', 'csv', 'bibtex')
+
+FORMAT_EXTENSIONS = {
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+    '.bib': 'bibtex',
+    '.bibtex': 'bibtex',
+}
+
+LIST_SEPARATOR = ';'
+
+# Fields of an exported record, in CSV column order
+RECORD_FIELDS = [
+    'title', 'slug', 'abstract', 'authors', 'keywords', 'publication_year', 'journal', 'doi',
+    'download_url', 'methodology_type', 'citation_count', 'citation_trend', 'volume', 'issue', 'pages',
+]
+
+# BibTeX field -> import field
+BIBTEX_FIELDS = {
+    'title': 'title',
+    'abstract': 'abstract',
+    'year': 'publication_year',
+    'journal': 'journal',
+    'booktitle': 'journal',
+    'doi': 'doi',
+    'url': 'download_url',
+    'volume': 'volume',
+    'number': 'issue',
+    'pages': 'pages',
+}
+
+_BIBTEX_SKIPPED_TYPES = {'comment', 'preamble', 'string'}
+_BIBTEX_ENTRY_START = re.compile(r'@\s*(\w+)\s*([{(])')
+_BIBTEX_FIELD = re.compile(r'\s*,?\s*([\w-]+)\s*=\s*')
+_BIBTEX_BARE_VALUE = re.compile(r'[^,\s]+')
+
+
+def format_for_path(path):
+    """Format implied by a file extension, or None"""
+    match = re.search(r'\.[^./\\]+$', path.lower())
+    return FORMAT_EXTENSIONS.get(match.group(0)) if match else None
+
+
+def split_names(value, separator=LIST_SEPARATOR):
+    return [name.strip() for name in value.split(separator) if name.strip()]
+
+
+def read_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield ValueError(f'Invalid JSON: {exc}')
+
+
+def read_csv(stream):
+    for record in csv.DictReader(stream):
+        if None in record:
+            yield ValueError('Row has more values than the header')
+            continue
+        # Empty cells mean "not given" so model defaults apply
+        row = {field.strip(): value.strip() for field, value in record.items() if value and value.strip()}
+        for field in ('authors', 'keywords'):
+            if field in row:
+                row[field] = split_names(row[field])
+        yield row
+
+
+def read_bibtex(stream):
+    for entry_type, body in _bibtex_entries(stream):
+        if entry_type in _BIBTEX_SKIPPED_TYPES:
+            continue
+        if body is None:
+            yield ValueError('Unterminated BibTeX entry')
+            continue
+        try:
+            fields = _bibtex_fields(body)
+        except ValueError as exc:
+            yield exc
+            continue
+
+        row = {}
+        for name, value in fields.items():
+            if name in BIBTEX_FIELDS and value:
+                row.setdefault(BIBTEX_FIELDS[name], value)
+        if fields.get('author'):
+            row['authors'] = [name.strip() for name in re.split(r'\s+and\s+', fields['author']) if name.strip()]
+        if fields.get('keywords'):
+            row['keywords'] = split_names(fields['keywords'].replace(',', LIST_SEPARATOR))
+        yield row
+
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+    'bibtex': read_bibtex,
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def write_ndjson(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def write_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(RECORD_FIELDS)
+    for record in records:
+        yield writer.writerow([
+            f'{LIST_SEPARATOR} '.join(value) if isinstance(value, list) else ('' if value is None else value)
+            for value in (record.get(field) for field in RECORD_FIELDS)
+        ])
+
+
+def write_bibtex(records):
+    fields = {name: field for field, name in BIBTEX_FIELDS.items() if field != 'booktitle'}
+    for record in records:
+        lines = []
+        if record.get('authors'):
+            lines.append(('author', ' and '.join(record['authors'])))
+        if record.get('keywords'):
+            lines.append(('keywords', ', '.join(record['keywords'])))
+        for name, field in fields.items():
+            if record.get(name) not in (None, ''):
+                lines.append((field, str(record[name])))
+        body = ',\n'.join(f'  {field} = {{{_bibtex_escape(value)}}}' for field, value in lines)
+        yield f"@article{{{record.get('slug') or 'paper'},\n{body}\n}}\n\n"
+
+
+WRITERS = {
+    'ndjson': write_ndjson,
+    'csv': write_csv,
+    'bibtex': write_bibtex,
+}
+
+
+def _bibtex_escape(value):
+    # Braces delimit values; the reader drops them from values anyway
+    return re.sub(r'\s+', ' ', value.replace('{', '').replace('}', '')).strip()
+
+
+def _bibtex_entries(stream):
+    """Yield (type, body) for each ``@type{...}`` entry, reading line by line; body is None if unterminated"""
+    entry_type, body, depth, opener, closer = None, [], 0, '{', '}'
+    for line in stream:
+        position = 0
+        while position < len(line):
+            if entry_type is None:
+                match = _BIBTEX_ENTRY_START.search(line, position)
+                if not match:
+                    break
+                entry_type, body, depth = match.group(1).lower(), [], 1
+                opener = match.group(2)
+                closer = '}' if opener == '{' else ')'
+                position = match.end()
+                continue
+
+            char = line[position]
+            if char == opener:
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                if depth == 0:
+                    yield entry_type, ''.join(body)
+                    entry_type = None
+                    position += 1
+                    continue
+            body.append(char)
+            position += 1
+    if entry_type is not None:
+        # Input ended inside an entry
+        yield entry_type, None
+
+
+def _bibtex_fields(body):
+    """Parse ``key, name = {value}, name = "value", name = 123`` into a dict"""
+    _, _, rest = body.partition(',')
+    fields = {}
+    position = 0
+    while True:
+        match = _BIBTEX_FIELD.match(rest, position)
+        if not match:
+            if rest[position:].strip(' \t\r\n,'):
+                raise ValueError('Malformed BibTeX entry')
+            return fields
+        name, position = match.group(1).lower(), match.end()
+        value, position = _bibtex_value(rest, position)
+        fields[name] = re.sub(r'\s+', ' ', value.replace('{', '').replace('}', '')).strip()
+
+
+def _bibtex_value(text, position):
+    if position >= len(text):
+        raise ValueError('Malformed BibTeX entry')
+    opener = text[position]
+    if opener == '{':
+        depth = 0
+        for end in range(position, len(text)):
+            if text[end] == '{':
+                depth += 1
+            elif text[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[position + 1:end], end + 1
+        raise ValueError('Unbalanced braces in BibTeX entry')
+    if opener == '"':
+        end = text.find('"', position + 1)
+        if end == -1:
+            raise ValueError('Unterminated quote in BibTeX entry')
+        return text[position + 1:end], end + 1
+    match = _BIBTEX_BARE_VALUE.match(text, position)
+    if not match:
+        raise ValueError('Malformed BibTeX entry')
+    return match.group(0), match.end()
@@ -0,0 +1,301 @@
+"""
+Batched import of research papers.
+
+``PaperImporter`` validates rows one at a time but writes them in batches:
+author and keyword names are resolved with one query each, missing ones and the
+papers are inserted with ``bulk_create`` and the M2M through rows are inserted
+in bulk. Every batch commits on its own, and a row that fails validation or the
+insert is reported by index instead of aborting the whole import.
+
+``bulk_create`` bypasses ``ResearchPaper.save`` and the model signals, so the
+importer applies the same defaults itself, refreshes the search vectors,
+related papers and keyword paper counts of the new papers and invalidates the cached catalogue data
+after each batch.
+"""
+import functools
+import operator
+from collections import Counter
+
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from apps.utils.counters import adjust_counters
+from apps.utils.response_cache import invalidate_responses
+
+from .filter_options import invalidate_filter_options
+from .models import Author, Keyword, ResearchPaper, parse_publication_year
+from .related import refresh_related_papers
+from .search import update_search_vectors
+from .signals import RESEARCH_RESPONSES
+
+DEFAULT_BATCH_SIZE = 500
+
+_SLUG_MAX_LENGTH = ResearchPaper._meta.get_field('slug').max_length
+
+
+class NamedEntryField(serializers.Field):
+    """An author or keyword given either as a plain name or as an object with a ``name``"""
+
+    def __init__(self, max_length, **kwargs):
+        self.max_length = max_length
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = {'name': data}
+        if not isinstance(data, dict) or not isinstance(data.get('name'), str):
+            raise serializers.ValidationError('Expected a name or an object with a "name".')
+        name = data['name'].strip()
+        if len(name) > self.max_length:
+            raise serializers.ValidationError(f'Names are limited to {self.max_length} characters.')
+        return {
+            'name': name,
+            'affiliation': data.get('affiliation') or '',
+            'email': data.get('email') or None,
+        }
+
+    def to_representation(self, value):
+        return value
+
+
+class PaperImportSerializer(serializers.Serializer):
+    """Validation for one imported paper; writes are done by PaperImporter"""
+    title = serializers.CharField(max_length=255)
+    slug = serializers.CharField(max_length=_SLUG_MAX_LENGTH, required=False, allow_blank=True)
+    abstract = serializers.CharField()
+    authors = serializers.ListField(child=NamedEntryField(max_length=100), required=False)
+    keywords = serializers.ListField(child=NamedEntryField(max_length=100), required=False)
+    publication_year = serializers.CharField(max_length=10, required=False, allow_blank=True)
+    journal = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    doi = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    download_url = serializers.URLField(max_length=500, required=False, allow_blank=True, allow_null=True)
+    methodology_type = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    citation_count = serializers.IntegerField(min_value=0, required=False)
+    citation_trend = serializers.ChoiceField(
+        choices=ResearchPaper._meta.get_field('citation_trend').choices, required=False
+    )
+    volume = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    issue = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    pages = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+
+
+class ImportResult:
+    """Outcome of an import: created papers and per-row errors, keyed by row index"""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+        # Input rows covered, including invalid ones
+        self.rows = 0
+        self.last_index = None
+
+    def add_error(self, index, row, errors):
+        title = row.get('title') if isinstance(row, dict) else None
+        self.errors.append({'index': index, 'title': title if isinstance(title, str) else '', 'errors': errors})
+
+    @property
+    def status(self):
+        if not self.errors:
+            return 'success'
+        return 'partial' if self.created else 'failed'
+
+    def as_dict(self):
+        return {
+            'status': self.status,
+            'success_count': len(self.created),
+            'error_count': len(self.errors),
+            'papers': [{'index': index, 'id': paper.id, 'slug': paper.slug} for index, paper in self.created],
+            'errors': self.errors,
+        }
+
+
+class PaperImporter:
+    """
+    Import papers in batches of ``batch_size``.
+
+    ``run(rows)`` accepts any iterable of dicts. ``iter_chunks(rows)`` does the
+    same lazily, for callers that stream rows and must not hold the whole
+    import in memory.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+
+    def run(self, rows, start=0):
+        result = ImportResult()
+        for chunk in self.iter_chunks(rows, start=start):
+            result.created.extend(chunk.created)
+            result.errors.extend(chunk.errors)
+            result.rows += chunk.rows
+            result.last_index = chunk.last_index
+        result.errors.sort(key=lambda error: error['index'])
+        return result
+
+    def iter_chunks(self, rows, start=0):
+        """
+        Import ``rows`` ``batch_size`` input rows at a time.
+
+        Yields an ImportResult per chunk once it is committed; every row up to
+        its ``last_index`` has then been either imported or reported.
+        """
+        chunk, batch = ImportResult(), []
+        for index, row in enumerate(rows, start=start):
+            data = self.validate(index, row, chunk)
+            if data is not None:
+                batch.append((index, data))
+            chunk.rows += 1
+            chunk.last_index = index
+            if chunk.rows >= self.batch_size:
+                self.write_batch(batch, chunk)
+                yield chunk
+                chunk, batch = ImportResult(), []
+        if chunk.rows:
+            self.write_batch(batch, chunk)
+            yield chunk
+
+    def validate(self, index, row, result):
+        """Cleaned data for a valid row; errors are recorded on ``result`` and None returned"""
+        if isinstance(row, Exception):
+            # A reader could not parse the record
+            result.add_error(index, None, {'non_field_errors': [str(row)]})
+            return None
+        if not isinstance(row, dict):
+            result.add_error(index, row, {'non_field_errors': ['Expected an object.']})
+            return None
+        serializer = PaperImportSerializer(data=row)
+        if serializer.is_valid():
+            return serializer.validated_data
+        result.add_error(index, row, serializer.errors)
+        return None
+
+    def write_batch(self, batch, result):
+        """Insert a batch in its own transaction; on failure retry row by row to isolate bad rows"""
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                created = self.insert(batch)
+        except DatabaseError as exc:
+            if len(batch) == 1:
+                index, data = batch[0]
+                result.add_error(index, data, {'non_field_errors': [str(exc).strip()]})
+                return
+            for item in batch:
+                self.write_batch([item], result)
+            return
+
+        result.created.extend(created)
+        invalidate_filter_options()
+        invalidate_responses(RESEARCH_RESPONSES)
+
+    def insert(self, batch):
+        author_ids = self.resolve_authors(batch)
+        keyword_ids = self.resolve_keywords(batch)
+        slugs = self.assign_slugs(batch)
+
+        papers = ResearchPaper.objects.bulk_create([
+            self.build_paper(data, slug) for (_, data), slug in zip(batch, slugs)
+        ])
+
+        AuthorLink = ResearchPaper.authors.through
+        KeywordLink = ResearchPaper.keywords.through
+        author_links, keyword_links, keyworded = [], [], set()
+        for (_, data), paper in zip(batch, papers):
+            for author_id in {author_ids[entry['name']] for entry in data.get('authors', []) if entry['name']}:
+                author_links.append(AuthorLink(researchpaper_id=paper.id, author_id=author_id))
+            for keyword_id in {keyword_ids[name] for name in self.keyword_names(data)}:
+                keyword_links.append(KeywordLink(researchpaper_id=paper.id, keyword_id=keyword_id))
+                keyworded.add(paper.id)
+        AuthorLink.objects.bulk_create(author_links)
+        KeywordLink.objects.bulk_create(keyword_links)
+        adjust_counters(Keyword, 'paper_count', Counter(link.keyword_id for link in keyword_links))
+
+        update_search_vectors([paper.id for paper in papers])
+        # Only the new papers' own lists; existing papers pick them up on the next build_related_papers
+        refresh_related_papers(keyworded)
+        return [(index, paper) for (index, _), paper in zip(batch, papers)]
+
+    def resolve_authors(self, batch):
+        """Map every author name in the batch to an id, creating missing authors"""
+        entries = {}
+        for _, data in batch:
+            for entry in data.get('authors', []):
+                if entry['name']:
+                    entries.setdefault(entry['name'], entry)
+
+        ids = {}
+        # Author names are not unique; reuse the oldest author with the name
+        for name, author_id in (
+            Author.objects.filter(name__in=list(entries)).order_by('-id').values_list('name', 'id')
+        ):
+            ids[name] = author_id
+
+        missing = [entries[name] for name in entries if name not in ids]
+        for author in Author.objects.bulk_create([
+            Author(name=entry['name'], affiliation=entry['affiliation'], email=entry['email'])
+            for entry in missing
+        ]):
+            ids[author.name] = author.id
+        return ids
+
+    def keyword_names(self, data):
+        return {entry['name'].lower() for entry in data.get('keywords', []) if entry['name']}
+
+    def resolve_keywords(self, batch):
+        """Map every keyword name in the batch to an id, creating missing keywords"""
+        names = set()
+        for _, data in batch:
+            names |= self.keyword_names(data)
+
+        ids = dict(Keyword.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - ids.keys()
+        if missing:
+            # ignore_conflicts tolerates a concurrent import creating the same keyword
+            Keyword.objects.bulk_create([Keyword(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(Keyword.objects.filter(name__in=missing).values_list('name', 'id'))
+        return ids
+
+    def assign_slugs(self, batch):
+        """Unique slugs for the batch, suffixing -2, -3, ... on collisions"""
+        bases = [
+            slugify(data.get('slug') or data['title'])[:_SLUG_MAX_LENGTH] or 'paper'
+            for _, data in batch
+        ]
+        taken = set(ResearchPaper.objects.filter(slug__in=set(bases)).values_list('slug', flat=True))
+
+        seen = set()
+        colliding = {base for base in bases if base in taken or base in seen or seen.add(base)}
+        if colliding:
+            prefixes = functools.reduce(operator.or_, [Q(slug__startswith=f'{base}-') for base in colliding])
+            taken |= set(ResearchPaper.objects.filter(prefixes).values_list('slug', flat=True))
+
+        slugs = []
+        for base in bases:
+            slug, suffix = base, 1
+            while slug in taken:
+                suffix += 1
+                tail = f'-{suffix}'
+                slug = base[:_SLUG_MAX_LENGTH - len(tail)] + tail
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    def build_paper(self, data, slug):
+        return ResearchPaper(
+            title=data['title'],
+            slug=slug,
+            abstract=data['abstract'],
+            publication_year=data.get('publication_year') or '',
+            publication_year_int=parse_publication_year(data.get('publication_year')),
+            journal=data.get('journal') or '',
+            doi=data.get('doi') or None,
+            download_url=data.get('download_url') or None,
+            methodology_type=data.get('methodology_type') or 'Unknown',
+            citation_count=data.get('citation_count') or 0,
+            citation_trend=data.get('citation_trend') or 'stable',
+            volume=data.get('volume') or None,
+            issue=data.get('issue') or None,
+            pages=data.get('pages') or None,
+        )
@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.utils.text import slugify
+
+from apps.research.importer import DEFAULT_BATCH_SIZE, PaperImporter
+from apps.research.serializers import ResearchPaperSerializer
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names
+
+METHODOLOGIES = ['Qualitative', 'Quantitative', 'Mixed Methods', 'Experimental', 'Review', 'Case Study']
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare bulk import throughput of the batched importer with per-row serializer saves'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--rows', type=int, default=5000, help='Papers imported by the batched importer')
+        parser.add_argument('--legacy-rows', type=int, default=500,
+                            help='Papers imported one by one through ResearchPaperSerializer')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def run_benchmark(self, rows, legacy_rows, batch_size, seed, **options):
+        rng = random.Random(seed)
+        authors = list(synthetic_names(2000, seed=seed, words=(2, 2)))
+        keywords = list(synthetic_names(300, seed=seed + 1, words=(1, 2)))
+        titles = iter(synthetic_names(rows + legacy_rows, seed=seed + 2, words=(3, 6)))
+
+        def make_rows(count, duplicates=0.0):
+            return [
+                {
+                    'title': 'Duplicate benchmark title' if rng.random() < duplicates else next(titles),
+                    'abstract': 'Synthetic abstract about soil, water and yield.',
+                    'authors': [{'name': name.title(), 'affiliation': 'Benchmark'} for name in rng.sample(authors, 3)],
+                    'keywords': [{'name': name} for name in rng.sample(keywords, 4)],
+                    'publication_year': str(rng.randint(1990, 2024)),
+                    'methodology_type': rng.choice(METHODOLOGIES),
+                    'citation_count': rng.randint(0, 500),
+                }
+                for _ in range(count)
+            ]
+
+        legacy = make_rows(legacy_rows)
+        for row in legacy:
+            row['slug'] = slugify(row['title'])
+        self.stdout.write(f'Importing {legacy_rows} papers one by one...')
+        start = time.perf_counter()
+        for row in legacy:
+            # Nested validation rejects keywords that already exist, so time the per-row writes only
+            ResearchPaperSerializer().create(row)
+        self.throughput('per-row serializer', legacy_rows, time.perf_counter() - start)
+
+        # The serializer path cannot resolve slug collisions; the importer gets some
+        batched = make_rows(rows, duplicates=0.05)
+        self.stdout.write(f'Importing {rows} papers in batches of {batch_size}...')
+        start = time.perf_counter()
+        result = PaperImporter(batch_size=batch_size).run(batched)
+        self.throughput('batched importer', len(result.created), time.perf_counter() - start)
+        if result.errors:
+            self.stdout.write(self.style.WARNING(f'{len(result.errors)} rows failed, first: {result.errors[0]}'))
+
+    def throughput(self, label, count, seconds):
+        self.stdout.write(f'{label:<32} {count:>7} rows in {seconds:7.2f}s = {count / max(seconds, 1e-9):9.0f} rows/s')
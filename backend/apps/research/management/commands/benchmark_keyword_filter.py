@@ -0,0 +1,66 @@
+import random
+
+from django.db import connection
+
+from apps.research.filter_index import CATALOGUE_ORDER
+from apps.research.models import Keyword, ResearchPaper
+from apps.research.views import keyword_paper_ids
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names, time_call
+
+
+def join_per_keyword(keywords):
+    """The previous AND filter: one iexact join per keyword, then DISTINCT"""
+    queryset = ResearchPaper.objects.all()
+    for keyword in keywords:
+        queryset = queryset.filter(keywords__name__iexact=keyword)
+    return queryset.distinct().order_by(*CATALOGUE_ORDER)
+
+
+def grouped_subquery(keywords):
+    return ResearchPaper.objects.filter(
+        id__in=keyword_paper_ids(keywords, match_all=True)
+    ).distinct().order_by(*CATALOGUE_ORDER)
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark and EXPLAIN keyword AND filtering: join per keyword vs one grouped subquery'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--papers', type=int, default=100000, help='Synthetic research papers')
+        parser.add_argument('--keywords', type=int, default=2000, help='Synthetic keywords')
+        parser.add_argument('--queries', type=int, default=30, help='Lookups per strategy and keyword count')
+        parser.add_argument('--plans', action='store_true', help='Print EXPLAIN ANALYZE of one lookup per case')
+
+    def run_benchmark(self, papers, keywords, queries, plans, seed, **options):
+        rng = random.Random(seed)
+        names = list(synthetic_names(keywords, seed=seed))
+        self.stdout.write(f'Seeding {papers} papers over {keywords} keywords...')
+        keyword_rows = Keyword.objects.bulk_create([Keyword(name=name) for name in names])
+        weights = [1 / (rank + 1) for rank in range(keywords)]
+        paper_rows = ResearchPaper.objects.bulk_create([
+            ResearchPaper(title=f'Keyword benchmark paper {index}', slug=f'keyword-bench-{index}', abstract='...')
+            for index in range(papers)
+        ], batch_size=5000)
+        Link = ResearchPaper.keywords.through
+        Link.objects.bulk_create([
+            Link(researchpaper_id=paper.id, keyword_id=keyword_rows[position].id)
+            for paper in paper_rows
+            for position in set(rng.choices(range(keywords), weights=weights, k=rng.randint(2, 6)))
+        ], batch_size=10000)
+        with connection.cursor() as cursor:
+            for table in (ResearchPaper._meta.db_table, Keyword._meta.db_table, Link._meta.db_table):
+                cursor.execute(f'ANALYZE {table}')
+
+        popular = names[:40]
+        for size in (2, 3, 4):
+            # Mixed case, as typed by users
+            cases = [[name.upper() if rng.random() < 0.5 else name for name in rng.sample(popular, size)]
+                     for _ in range(queries)]
+            for label, build in (('join per keyword', join_per_keyword), ('grouped subquery', grouped_subquery)):
+                self.report(f'{size} keywords {label} page',
+                            [time_call(lambda terms=terms: list(build(terms)[:10]))[0] for terms in cases])
+                self.report(f'{size} keywords {label} count',
+                            [time_call(lambda terms=terms: build(terms).count())[0] for terms in cases])
+                if plans:
+                    self.stdout.write(build(cases[0])[:10].explain(analyze=True))
@@ -0,0 +1,100 @@
+import random
+import time
+
+from django.core.management.base import CommandError
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.research.filter_index import load_filter_index, np
+from apps.research.models import Keyword, ResearchPaper
+from apps.research.search import update_search_vectors
+from apps.research.views import ResearchPaperViewSet
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names, time_call
+
+METHODOLOGIES = ['Experimental', 'Survey', 'Review', 'Case Study', 'Modelling', 'Qualitative']
+
+
+def list_view(params):
+    request = Request(APIRequestFactory().get('/api/research/papers/', params))
+    return ResearchPaperViewSet(request=request, format_kwarg=None, action='list', kwargs={})
+
+
+def orm_page(params):
+    """Count and first page through get_queryset and the filter backends"""
+    view = list_view(params)
+    return view.paginate_queryset(view.filter_queryset(view.get_queryset()))
+
+
+def index_page(params):
+    """Count and first page from the in-process filter index"""
+    view = list_view(params)
+    return view.paginate_queryset(view.indexed_papers())
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark paper list filtering through the ORM against the in-process filter index'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--papers', type=int, default=100000, help='Synthetic research papers')
+        parser.add_argument('--keywords', type=int, default=500, help='Synthetic keywords')
+        parser.add_argument('--queries', type=int, default=30, help='Requests per filter combination')
+
+    def run_benchmark(self, papers, keywords, queries, seed, **options):
+        if np is None:
+            raise CommandError('numpy is required: pip install numpy')
+
+        rng = random.Random(seed)
+        names = list(synthetic_names(keywords, seed=seed))
+        self.stdout.write(f'Seeding {papers} papers over {keywords} keywords...')
+        keyword_rows = Keyword.objects.bulk_create([Keyword(name=name) for name in names])
+        weights = [1 / (rank + 1) for rank in range(keywords)]
+        paper_rows = ResearchPaper.objects.bulk_create([
+            ResearchPaper(
+                title=f'Filter benchmark paper {index}', slug=f'filter-bench-{index}', abstract='...',
+                publication_year=str(year) if year else '', publication_year_int=year,
+                methodology_type=rng.choice(METHODOLOGIES), citation_count=int(rng.paretovariate(1.2)),
+            )
+            for index, year in ((index, rng.choice([0, *range(1990, 2025)])) for index in range(papers))
+        ], batch_size=5000)
+        Link = ResearchPaper.keywords.through
+        Link.objects.bulk_create([
+            Link(researchpaper_id=paper.id, keyword_id=keyword_rows[position].id)
+            for paper in paper_rows
+            for position in set(rng.choices(range(keywords), weights=weights, k=rng.randint(2, 6)))
+        ], batch_size=10000)
+        # The ORM path also matches keyword terms against the search vectors
+        elapsed, _ = time_call(update_search_vectors)
+        self.stdout.write(f'Search vectors built in {elapsed / 1000:.1f}s')
+
+        with override_settings(PAPER_FILTER_INDEX=True):
+            started = time.perf_counter()
+            index = load_filter_index()
+            self.stdout.write(
+                f'Filter index of {len(index)} papers and {len(index.keyword_positions)} keyword links '
+                f'built in {time.perf_counter() - started:.1f}s'
+            )
+
+            popular = names[:30]
+            combinations = {
+                'one keyword': lambda: {'keyword': rng.choice(popular)},
+                'two keywords (or)': lambda: {'keyword': rng.sample(popular, 2)},
+                'two keywords (and)': lambda: {'keyword': rng.sample(popular, 2), 'keyword_logic': 'and'},
+                'methodology + years': lambda: {
+                    'methodology_type': rng.choice(METHODOLOGIES), 'year_from': rng.randint(1990, 2015),
+                },
+                'keyword + method + citations': lambda: {
+                    'keyword': rng.choice(popular), 'methodology_type': rng.sample(METHODOLOGIES, 2),
+                    'min_citations': 2,
+                },
+                'methodology, page 50': lambda: {'methodology_type': rng.choice(METHODOLOGIES), 'page': 50},
+            }
+            for label, make in combinations.items():
+                requests = [make() for _ in range(queries)]
+                for params in requests:
+                    orm, indexed = orm_page(params), index_page(params)
+                    if [paper.id for paper in orm] != [paper.id for paper in indexed]:
+                        raise CommandError(f'Index and ORM pages differ for {params}')
+                self.report(f'{label} orm', [time_call(orm_page, params)[0] for params in requests])
+                self.report(f'{label} index', [time_call(index_page, params)[0] for params in requests])
@@ -0,0 +1,76 @@
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import CommandError
+
+from apps.research.models import ResearchPaper
+from apps.research.similarity import build_similarity_index, is_available
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names, time_call
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark building and querying the TF-IDF similarity index on synthetic papers'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--papers', type=int, default=50000, help='Synthetic research papers')
+        parser.add_argument('--queries', type=int, default=500, help='Papers to find neighbours for')
+        parser.add_argument('--batch', type=int, default=32, help='Query rows per batched sparse product')
+        parser.add_argument('--limit', type=int, default=10, help='Neighbours per query')
+
+    def run_benchmark(self, papers, queries, batch, limit, seed, **options):
+        if not is_available():
+            raise CommandError('numpy and scipy are required: pip install numpy scipy')
+
+        rng = random.Random(seed)
+        # Zipf-like vocabulary so some terms are common and most are rare
+        vocabulary = list(synthetic_names(5000, seed=seed, words=(1, 1)))
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+        self.stdout.write(f'Seeding {papers} papers...')
+        ResearchPaper.objects.bulk_create([
+            ResearchPaper(
+                title=' '.join(rng.choices(vocabulary, weights, k=6)),
+                slug=f'similarity-bench-{index}',
+                abstract=' '.join(rng.choices(vocabulary, weights, k=120)),
+            )
+            for index in range(papers)
+        ], batch_size=5000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            index = build_similarity_index(directory=directory)
+            size = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(directory) for name in names
+            )
+            self.stdout.write(
+                f'Built index of {index.meta["papers"]} papers, {index.matrix.nnz} weights, '
+                f'{size / 2 ** 20:.1f} MiB in {time.perf_counter() - started:.1f}s'
+            )
+
+            sample = rng.sample(
+                list(ResearchPaper.objects.values_list('id', 'title', 'abstract')), min(queries, papers)
+            )
+            single = []
+            for paper in sample:
+                elapsed, _ = time_call(lambda: index.nearest(index.query_rows([paper]), limit, exclude=[paper[0]]))
+                single.append(elapsed)
+            self.report('single query', single)
+
+            per_paper = []
+            for start in range(0, len(sample), batch):
+                chunk = sample[start:start + batch]
+                elapsed, _ = time_call(
+                    lambda: index.nearest(index.query_rows(chunk), limit, exclude=[paper[0] for paper in chunk])
+                )
+                per_paper.extend([elapsed / len(chunk)] * len(chunk))
+            self.report(f'batched x{batch}, per paper', per_paper)
+
+            unseen = [(None, ' '.join(rng.choices(vocabulary, weights, k=6)),
+                       ' '.join(rng.choices(vocabulary, weights, k=120))) for _ in range(len(sample))]
+            self.report('unindexed text query', [
+                time_call(lambda: index.nearest(index.query_rows([paper]), limit))[0] for paper in unseen
+            ])
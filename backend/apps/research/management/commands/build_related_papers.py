@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.research.related import RELATED_PAPERS_TOP_K, build_related_papers
+from apps.research.signals import RESEARCH_RESPONSES
+from apps.utils.response_cache import invalidate_responses
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed related papers (top-k keyword Jaccard neighbours) of every paper'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=RELATED_PAPERS_TOP_K, help='Neighbours stored per paper')
+        parser.add_argument('--batch-size', type=int, default=500, help='Papers ranked per transaction')
+
+    def handle(self, top_k, batch_size, **options):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{done}/{total} papers ({done / max(elapsed, 1e-9):.0f} papers/s)')
+
+        written = build_related_papers(batch_size=batch_size, top_k=top_k, progress=progress)
+        # Cached `related` responses were read from the previous table
+        invalidate_responses(RESEARCH_RESPONSES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {written} related papers in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.research.signals import RESEARCH_RESPONSES
+from apps.research.similarity import DEFAULT_FEATURES, build_similarity_index, index_directory, is_available
+from apps.utils.response_cache import invalidate_responses
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TF-IDF similarity index over paper titles and abstracts used by the `similar` endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--features', type=int, default=DEFAULT_FEATURES,
+                            help='Hashed feature space size (a power of two works best)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Papers read per database round trip')
+
+    def handle(self, features, chunk_size, **options):
+        if not is_available():
+            raise CommandError('numpy and scipy are required: pip install numpy scipy')
+
+        started = time.perf_counter()
+        index = build_similarity_index(
+            n_features=features, chunk_size=chunk_size,
+            progress=lambda count: self.stdout.write(f'{count} papers read'),
+        )
+        # Cached `similar` responses were computed from the previous version
+        invalidate_responses(RESEARCH_RESPONSES)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {index.meta['papers']} papers ({index.matrix.nnz} weights) into {index_directory()} "
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
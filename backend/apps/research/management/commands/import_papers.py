@@ -0,0 +1,135 @@
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.research.formats import FORMATS, READERS, format_for_path
+from apps.research.importer import DEFAULT_BATCH_SIZE, PaperImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream research papers from an NDJSON, CSV or BibTeX file (or stdin) into the catalogue. '
+        'Rows are committed in chunks and progress is checkpointed after each chunk, so an '
+        'interrupted import can be continued with --resume; at most the chunk that was being '
+        'committed when the process died is imported twice.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='File to import, or - for stdin')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Input format; inferred from the file extension when omitted')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows committed per transaction')
+        parser.add_argument('--checkpoint',
+                            help='Checkpoint file (default: <source>.checkpoint; required to resume stdin)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the rows recorded in the checkpoint file')
+        parser.add_argument('--errors', help='Write rejected rows to this file as NDJSON instead of stderr')
+
+    def handle(self, source, format, chunk_size, checkpoint, resume, errors, **options):
+        from_stdin = source == '-'
+        format = format or (None if from_stdin else format_for_path(source))
+        if format is None:
+            raise CommandError('Cannot infer the input format; pass --format')
+        if checkpoint is None and not from_stdin:
+            checkpoint = f'{source}.checkpoint'
+
+        state = {'next_row': 0, 'created': 0, 'failed': 0}
+        if resume:
+            state = self.read_checkpoint(checkpoint, source, format)
+            self.stdout.write(f"Resuming at row {state['next_row']}")
+
+        if from_stdin:
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8') if hasattr(sys.stdin, 'buffer') else sys.stdin
+        else:
+            try:
+                stream = open(source, encoding='utf-8', newline='')
+            except OSError as exc:
+                raise CommandError(f'Cannot open {source}: {exc}')
+
+        error_log = open(errors, 'a', encoding='utf-8') if errors else None
+        try:
+            totals = self.import_stream(stream, format, chunk_size, state, checkpoint, source, error_log)
+        finally:
+            if not from_stdin:
+                stream.close()
+            if error_log:
+                error_log.close()
+
+        created, failed, rows, elapsed = totals
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {rows} rows read, {created} imported, {failed} rejected in total; {elapsed:.1f}s '
+            f'({rows / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
+
+    def import_stream(self, stream, format, chunk_size, state, checkpoint, source, error_log):
+        start = state['next_row']
+        rows = itertools.islice(READERS[format](stream), start, None)
+        importer = PaperImporter(batch_size=chunk_size)
+        created, failed, processed = state['created'], state['failed'], 0
+        began = time.perf_counter()
+
+        for chunk in importer.iter_chunks(rows, start=start):
+            created += len(chunk.created)
+            failed += len(chunk.errors)
+            processed += chunk.rows
+            for error in chunk.errors:
+                self.report_error(error, error_log)
+            if checkpoint:
+                self.write_checkpoint(checkpoint, source, format, chunk.last_index + 1, created, failed)
+
+            elapsed = time.perf_counter() - began
+            self.stdout.write(
+                f'row {chunk.last_index + 1}: {created} imported, {failed} rejected, '
+                f'{processed / max(elapsed, 1e-9):.0f} rows/s'
+            )
+
+        if checkpoint and os.path.exists(checkpoint):
+            # A finished import has nothing to resume
+            os.remove(checkpoint)
+        return created, failed, processed, time.perf_counter() - began
+
+    def report_error(self, error, error_log):
+        if error_log:
+            error_log.write(json.dumps(error, default=str) + '\n')
+        else:
+            self.stderr.write(f"row {error['index']} {error['title']!r}: {json.dumps(error['errors'], default=str)}")
+
+    def read_checkpoint(self, path, source, format):
+        if not path:
+            raise CommandError('--resume from stdin needs --checkpoint')
+        try:
+            with open(path, encoding='utf-8') as handle:
+                state = json.load(handle)
+        except FileNotFoundError:
+            raise CommandError(f'No checkpoint at {path}')
+        except ValueError as exc:
+            raise CommandError(f'Unreadable checkpoint {path}: {exc}')
+        if state.get('source') != source or state.get('format') != format:
+            raise CommandError(
+                f"Checkpoint {path} belongs to {state.get('source')} ({state.get('format')}), not {source}"
+            )
+        return {'next_row': int(state['next_row']), 'created': state.get('created', 0), 'failed': state.get('failed', 0)}
+
+    def write_checkpoint(self, path, source, format, next_row, created, failed):
+        state = {
+            'source': source,
+            'format': format,
+            'next_row': next_row,
+            'created': created,
+            'failed': failed,
+            'updated_at': timezone.now().isoformat(),
+        }
+        # Write then rename, so a crash never leaves a half-written checkpoint
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
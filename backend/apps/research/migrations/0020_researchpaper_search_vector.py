@@ -0,0 +1,56 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    """Backfill the weighted search document for existing papers"""
+    ResearchPaper = apps.get_model("research", "ResearchPaper")
+    Author = apps.get_model("research", "Author")
+    Keyword = apps.get_model("research", "Keyword")
+
+    def joined_names(model):
+        return Subquery(
+            model.objects.filter(papers=OuterRef("pk"))
+            .values("papers")
+            .annotate(joined=StringAgg("name", delimiter=" "))
+            .values("joined")[:1]
+        )
+
+    ResearchPaper.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector(joined_names(Keyword), weight="B", config="english")
+            + SearchVector(joined_names(Author), weight="C", config="english")
+            + SearchVector("abstract", "journal", weight="D", config="english")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("research", "0019_alter_researchpaper_options_alter_author_affiliation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="researchpaper",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="research_paper_search_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
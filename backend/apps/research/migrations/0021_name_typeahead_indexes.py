@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:06
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("research", "0020_researchpaper_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="author",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="research_author_name_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="author",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="research_author_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="keyword",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="research_keyword_name_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="keyword",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="research_keyword_name_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("research", "0021_name_typeahead_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=models.Index(
+                fields=["-publication_year", "-created_at", "id"],
+                name="research_paper_keyset",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:19
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("research", "0022_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=models.Index(
+                fields=["methodology_type", "-publication_year", "-created_at", "id"],
+                name="research_paper_method",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=models.Index(
+                fields=["citation_trend", "-citation_count", "-publication_year"],
+                name="research_paper_trending",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("journal"),
+                    name="gin_trgm_ops",
+                ),
+                name="research_paper_journal_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_paper_counts(apps, schema_editor):
+    """Count the papers already tagged with each keyword"""
+    Keyword = apps.get_model("research", "Keyword")
+    ResearchPaper = apps.get_model("research", "ResearchPaper")
+    links = ResearchPaper.keywords.through.objects.filter(keyword=OuterRef("pk"))
+    Keyword.objects.update(
+        paper_count=Coalesce(
+            Subquery(
+                links.order_by()
+                .values("keyword")
+                .annotate(total=Count("pk"))
+                .values("total")[:1]
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("research", "0024_related_papers"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="keyword",
+            name="paper_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="keyword",
+            index=models.Index(
+                fields=["-paper_count", "name"], name="research_keyword_popular"
+            ),
+        ),
+        migrations.RunPython(backfill_paper_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:59
+
+from django.db import migrations, models, transaction
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_publication_years(apps, schema_editor):
+    """Parse the leading year of every publication_year, one committed id range at a time"""
+    ResearchPaper = apps.get_model("research", "ResearchPaper")
+    table = ResearchPaper._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute(
+                    f"UPDATE {table} "
+                    r"SET publication_year_int = substring(publication_year FROM '^\s*(\d{4})(?!\d)')::smallint "
+                    "WHERE id >= %s AND id < %s",
+                    [start, start + BACKFILL_BATCH_SIZE],
+                )
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own instead of one long transaction
+    atomic = False
+
+    dependencies = [
+        ("research", "0025_popularity_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="researchpaper",
+            name="publication_year_int",
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_publication_years, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="researchpaper",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("publication_year_int"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("created_at"), descending=True),
+                models.F("id"),
+                name="research_paper_year",
+            ),
+        ),
+    ]
@@ -1,6 +1,13 @@
+import re
+
 from django.db import models
+from django.db.models import F
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from django.utils.text import slugify
 from apps.utils.fields import YearField
+from apps.utils.typeahead import typeahead_indexes
 import datetime
 from django.utils import timezone
 
@@ -24,6 +31,8 @@ class Keyword(models.Model):
     # Keep the year fields for user input
     year_created = models.CharField(max_length=4, null=True, blank=True, help_text="Year when the keyword was added")
     year_updated = models.CharField(max_length=4, null=True, blank=True, help_text="Year when the keyword was last updated")
+    # Number of papers tagged with the keyword, maintained by apps.research.signals
+    paper_count = models.IntegerField(default=0)
     
     def __str__(self):
         return self.name
@@ -31,6 +40,10 @@ class Keyword(models.Model):
     class Meta:
         verbose_name = "Keyword"
         verbose_name_plural = "Keywords"
+        indexes = [
+            *typeahead_indexes('name', 'research_keyword_name'),
+            models.Index(fields=['-paper_count', 'name'], name='research_keyword_popular'),
+        ]
 
 class Author(models.Model):
     name = models.CharField(max_length=100)
@@ -47,6 +60,18 @@ class Author(models.Model):
     class Meta:
         verbose_name = "Author"
         verbose_name_plural = "Authors"
+        indexes = [
+            *typeahead_indexes('name', 'research_author_name'),
+        ]
+
+_LEADING_YEAR = re.compile(r'^\s*(\d{4})(?!\d)')
+
+
+def parse_publication_year(value):
+    """Integer year of a publication_year string ('2021', '2021-03'), or None"""
+    match = _LEADING_YEAR.match(str(value or ''))
+    return int(match.group(1)) if match else None
+
 
 class ResearchPaper(models.Model):
     title = models.CharField(max_length=255)
@@ -61,6 +86,9 @@ class ResearchPaper(models.Model):
         default='',  # Empty default instead of '2023'
         blank=True,  # Allow blank values
     )
+    # Integer copy of publication_year for range filters and year sorting,
+    # kept in sync by save() (NULL when the string holds no year)
+    publication_year_int = models.SmallIntegerField(null=True, blank=True, editable=False)
     journal = models.CharField(max_length=255, blank=True)
     doi = models.CharField(max_length=100, blank=True, null=True)
     # This is the download_url field for file downloads
@@ -77,11 +105,29 @@ class ResearchPaper(models.Model):
     pages = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted full-text document, maintained by apps.research.search
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-publication_year', '-created_at', 'id']  # Order by publication year desc, then created date desc, then id for consistency
         verbose_name = "Research Paper"
         verbose_name_plural = "Research Papers"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='research_paper_search_gin'),
+            # Default catalogue order, used by keyset pagination
+            models.Index(fields=['-publication_year', '-created_at', 'id'], name='research_paper_keyset'),
+            # Methodology filter served in catalogue order
+            models.Index(fields=['methodology_type', '-publication_year', '-created_at', 'id'],
+                         name='research_paper_method'),
+            # `trending`: citation_trend filter, citation_count order
+            models.Index(fields=['citation_trend', '-citation_count', '-publication_year'],
+                         name='research_paper_trending'),
+            # journal__icontains
+            GinIndex(OpClass(Upper('journal'), name='gin_trgm_ops'), name='research_paper_journal_trgm'),
+            # Year ranges and `sort=date_newest` (forwards) / `date_oldest` (backwards)
+            models.Index(F('publication_year_int').desc(nulls_last=True), F('created_at').desc(), 'id',
+                         name='research_paper_year'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -100,7 +146,11 @@ class ResearchPaper(models.Model):
                 else:
                     # Fall back to string conversion
                     self.publication_year = str(self.publication_year)
-                    
+        self.publication_year_int = parse_publication_year(self.publication_year)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'publication_year' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'publication_year_int'}
+
         # Set default methodology_type if not provided
         if not self.methodology_type:
             self.methodology_type = "Unknown"
@@ -109,3 +159,27 @@ class ResearchPaper(models.Model):
     
     def __str__(self):
         return self.title
+
+
+class RelatedPaper(models.Model):
+    """
+    Precomputed top-k neighbours of a paper by keyword overlap.
+
+    Maintained by apps.research.related; ``rank`` 1 is the closest paper.
+    """
+    # Indexed by the (paper, rank) constraint below
+    paper = models.ForeignKey(ResearchPaper, on_delete=models.CASCADE, related_name='related_links', db_index=False)
+    related = models.ForeignKey(ResearchPaper, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    # Jaccard similarity of the two keyword sets
+    score = models.FloatField()
+    shared_keywords = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also the index behind `related`: WHERE paper_id = ? AND rank <= ? ORDER BY rank
+            models.UniqueConstraint(fields=['paper', 'rank'], name='research_related_paper_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.paper_id} -> {self.related_id} ({self.score:.3f})'
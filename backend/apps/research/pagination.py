@@ -0,0 +1,7 @@
+from apps.utils.pagination import KeysetPagination
+
+
+class PaperKeysetPagination(KeysetPagination):
+    """Opt-in cursor pages in the default catalogue order"""
+    ordering = ('-publication_year', '-created_at', 'id')
+    page_size = 10
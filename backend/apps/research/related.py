@@ -0,0 +1,113 @@
+"""
+Precomputed related papers.
+
+``RelatedPaper`` stores, for every paper, its ``RELATED_PAPERS_TOP_K`` closest
+papers by Jaccard similarity of their keyword sets (shared keywords divided by
+the keywords of either paper), ties broken by the newer paper. The ranking is
+computed in a single SQL statement per batch of papers, so ``related`` only
+has to read ``WHERE paper_id = ? AND rank <= ?``.
+
+``build_related_papers`` fills the table and ``refresh_after_keyword_change``
+keeps it current from the keyword signals. The incremental refresh re-ranks
+the changed papers and every paper whose list contains them or that they now
+list; a paper that would only newly rank a changed paper further down its own
+list is picked up by the next full build.
+"""
+from django.db import connection, transaction
+
+from .models import RelatedPaper, ResearchPaper
+
+RELATED_PAPERS_TOP_K = 20
+
+_RANKED_SQL = """
+    WITH pairs AS (
+        SELECT source.researchpaper_id AS paper_id,
+               candidate.researchpaper_id AS related_id,
+               COUNT(*) AS shared
+        FROM {links} source
+        JOIN {links} candidate
+          ON candidate.keyword_id = source.keyword_id
+         AND candidate.researchpaper_id <> source.researchpaper_id
+        WHERE source.researchpaper_id = ANY(%(paper_ids)s)
+        GROUP BY 1, 2
+    ),
+    sizes AS (
+        SELECT researchpaper_id AS paper_id, COUNT(*) AS keyword_count
+        FROM {links}
+        WHERE researchpaper_id IN (SELECT paper_id FROM pairs UNION SELECT related_id FROM pairs)
+        GROUP BY 1
+    ),
+    scored AS (
+        SELECT pairs.paper_id, pairs.related_id, pairs.shared,
+               pairs.shared::float / (a.keyword_count + b.keyword_count - pairs.shared) AS score,
+               paper.publication_year
+        FROM pairs
+        JOIN sizes a ON a.paper_id = pairs.paper_id
+        JOIN sizes b ON b.paper_id = pairs.related_id
+        JOIN {papers} paper ON paper.id = pairs.related_id
+    ),
+    ranked AS (
+        SELECT paper_id, related_id, shared, score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY paper_id ORDER BY score DESC, publication_year DESC, related_id
+               ) AS rank
+        FROM scored
+    )
+    SELECT paper_id, related_id, rank, score, shared FROM ranked WHERE rank <= %(top_k)s
+"""
+
+
+def _ranked_sql():
+    return _RANKED_SQL.format(
+        links=ResearchPaper.keywords.through._meta.db_table,
+        papers=ResearchPaper._meta.db_table,
+    )
+
+
+def rank_related(paper_ids, top_k=RELATED_PAPERS_TOP_K):
+    """(paper_id, related_id, rank, score, shared) rows for ``paper_ids``, computed live"""
+    with connection.cursor() as cursor:
+        cursor.execute(_ranked_sql() + ' ORDER BY paper_id, rank', {'paper_ids': list(paper_ids), 'top_k': top_k})
+        return cursor.fetchall()
+
+
+def refresh_related_papers(paper_ids, top_k=RELATED_PAPERS_TOP_K):
+    """Replace the stored neighbours of ``paper_ids``; returns the number of rows written"""
+    paper_ids = list(paper_ids)
+    if not paper_ids:
+        return 0
+    table = RelatedPaper._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE paper_id = ANY(%(paper_ids)s)', {'paper_ids': paper_ids})
+        cursor.execute(
+            f'INSERT INTO {table} (paper_id, related_id, rank, score, shared_keywords) ' + _ranked_sql(),
+            {'paper_ids': paper_ids, 'top_k': top_k},
+        )
+        return cursor.rowcount
+
+
+def refresh_after_keyword_change(paper_ids, top_k=RELATED_PAPERS_TOP_K):
+    """Re-rank papers whose keywords changed and the papers whose lists involve them"""
+    paper_ids = set(paper_ids)
+    if not paper_ids:
+        return
+    listing = set(RelatedPaper.objects.filter(related_id__in=paper_ids).values_list('paper_id', flat=True))
+    refresh_related_papers(paper_ids, top_k)
+    # Similarity is symmetric: a paper's new neighbours may now rank it too
+    listed = set(RelatedPaper.objects.filter(paper_id__in=paper_ids).values_list('related_id', flat=True))
+    refresh_related_papers((listing | listed) - paper_ids, top_k)
+
+
+def build_related_papers(batch_size=500, top_k=RELATED_PAPERS_TOP_K, progress=None):
+    """
+    Rebuild the table for every paper, ``batch_size`` papers per transaction.
+
+    ``progress(done, total)`` is called after each batch. Returns rows written.
+    """
+    paper_ids = list(ResearchPaper.objects.order_by('id').values_list('id', flat=True))
+    written = 0
+    for start in range(0, len(paper_ids), batch_size):
+        written += refresh_related_papers(paper_ids[start:start + batch_size], top_k)
+        if progress:
+            progress(min(start + batch_size, len(paper_ids)), len(paper_ids))
+    return written
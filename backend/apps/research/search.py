@@ -0,0 +1,87 @@
+"""
+Full-text search helpers for research papers.
+
+Every paper keeps a weighted tsvector in ``ResearchPaper.search_vector``
+(title > keywords > authors > abstract/journal) backed by a GIN index. It is
+rebuilt in a single UPDATE by ``update_search_vectors`` whenever a paper or its
+author/keyword links change (see ``apps.research.signals``).
+"""
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, Subquery
+
+from .models import Author, Keyword, ResearchPaper
+
+SEARCH_CONFIG = 'english'
+
+# Characters that carry meaning in to_tsquery syntax and must not leak in
+_TSQUERY_UNSAFE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def _joined_names(model):
+    """Subquery returning the space-joined names of a paper's related rows"""
+    return Subquery(
+        model.objects.filter(papers=OuterRef('pk'))
+        .values('papers')
+        .annotate(joined=StringAgg('name', delimiter=' '))
+        .values('joined')[:1]
+    )
+
+
+def paper_search_vector():
+    """Weighted tsvector expression for a ResearchPaper row"""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(_joined_names(Keyword), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(_joined_names(Author), weight='C', config=SEARCH_CONFIG)
+        + SearchVector('abstract', 'journal', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(paper_ids=None):
+    """
+    Recompute the stored search vector for the given papers (all papers if None).
+
+    Returns the number of rows updated.
+    """
+    queryset = ResearchPaper.objects.all()
+    if paper_ids is not None:
+        queryset = queryset.filter(pk__in=paper_ids)
+    return queryset.update(search_vector=paper_search_vector())
+
+
+def build_search_query(terms):
+    """
+    Build a prefix-matching SearchQuery from user supplied terms.
+
+    Words inside one term must all match (AND), separate terms are OR-ed,
+    mirroring the previous icontains behaviour. Returns None if nothing
+    searchable is left after sanitising.
+    """
+    clauses = []
+    for term in terms:
+        words = [w for w in _TSQUERY_UNSAFE.split(term or '') if w]
+        if words:
+            clauses.append('(' + ' & '.join(f'{word}:*' for word in words) + ')')
+    if not clauses:
+        return None
+    return SearchQuery(' | '.join(clauses), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_papers(queryset, terms, rank=False):
+    """
+    Restrict ``queryset`` to papers matching ``terms``.
+
+    With ``rank=True`` the queryset is annotated with ``rank`` and ordered by it.
+    """
+    query = build_search_query(terms)
+    if query is None:
+        return queryset
+    queryset = queryset.filter(search_vector=query)
+    if rank:
+        queryset = queryset.annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-publication_year', '-created_at', 'id')
+    return queryset
@@ -37,6 +37,11 @@ class ResearchPaperSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'url': {'lookup_field': 'slug'}
         }
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Prefetch nested authors and keywords: two queries for any number of papers"""
+        return queryset.prefetch_related('authors', 'keywords')
     
     def get_publication_date(self, obj):
         """
@@ -48,6 +53,17 @@ class ResearchPaperSerializer(serializers.ModelSerializer):
         # Simply return the publication_year value since it's now stored as a string
         return obj.publication_year
     
+    @staticmethod
+    def get_or_create_keywords(keywords_data):
+        """Keywords for the nested keyword data, by lower-cased name"""
+        keywords = []
+        for keyword_data in keywords_data:
+            keyword_name = keyword_data.get('name', '').strip().lower()
+            if keyword_name:  # Only proceed if name is not empty
+                keyword, _ = Keyword.objects.get_or_create(name=keyword_name)
+                keywords.append(keyword)
+        return keywords
+
     def create(self, validated_data):
         # Extract nested data
         authors_data = validated_data.pop('authors', [])
@@ -91,11 +107,7 @@ class ResearchPaperSerializer(serializers.ModelSerializer):
                         pass  # If this fails too, we'll skip the author
         
         # Handle keywords
-        for keyword_data in keywords_data:
-            keyword_name = keyword_data.get('name', '').strip().lower()
-            if keyword_name:  # Only proceed if name is not empty
-                keyword, _ = Keyword.objects.get_or_create(name=keyword_name)
-                paper.keywords.add(keyword)
+        paper.keywords.add(*self.get_or_create_keywords(keywords_data))
         
         return paper
     
@@ -126,11 +138,7 @@ class ResearchPaperSerializer(serializers.ModelSerializer):
         
         # Update keywords if provided
         if keywords_data is not None:
-            instance.keywords.clear()
-            for keyword_data in keywords_data:
-                keyword_name = keyword_data.get('name', '').strip().lower()
-                if keyword_name:  # Only proceed if name is not empty
-                    keyword, _ = Keyword.objects.get_or_create(name=keyword_name)
-                    instance.keywords.add(keyword)
+            # One set() call: only the links that differ change, in one signal each way
+            instance.keywords.set(self.get_or_create_keywords(keywords_data))
         
         return instance
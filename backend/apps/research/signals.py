@@ -0,0 +1,190 @@
+"""
+Signal handlers keeping denormalised research data in sync.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.utils.counters import adjust_counters
+from apps.utils.response_cache import invalidate_responses
+
+from .filter_options import invalidate_filter_options
+from .models import Author, Keyword, KeywordCategory, RelatedPaper, ResearchPaper
+from .related import refresh_after_keyword_change, refresh_related_papers
+from .search import update_search_vectors
+
+# Fields that feed the stored search document directly
+SEARCH_FIELDS = {'title', 'abstract', 'journal'}
+
+# Response cache namespace of the public paper and keyword endpoints
+RESEARCH_RESPONSES = 'research'
+
+
+@receiver(post_save, sender=ResearchPaper)
+def refresh_paper_search_vector(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Rebuild the search vector after a paper's text changes"""
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_search_vectors([instance.pk])
+
+
+def _changed_paper_ids(instance, action, reverse, pk_set):
+    """Papers whose author/keyword links an m2m_changed signal reports, or None for pre_ actions"""
+    if action == 'pre_clear' and reverse:
+        # Remember which papers are about to lose the link
+        instance._cleared_paper_ids = list(instance.papers.values_list('pk', flat=True))
+        return None
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return None
+
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        return getattr(instance, '_cleared_paper_ids', [])
+    return list(pk_set or [])
+
+
+def _refresh_linked_papers(instance, action, reverse, pk_set, **kwargs):
+    """Rebuild search vectors for papers whose author/keyword links changed"""
+    paper_ids = _changed_paper_ids(instance, action, reverse, pk_set)
+    if paper_ids:
+        update_search_vectors(paper_ids)
+
+
+def _run_related_refresh(connection):
+    paper_ids = connection.pending_related_refresh
+    connection.pending_related_refresh = set()
+    if paper_ids:
+        refresh_after_keyword_change(paper_ids)
+
+
+def queue_related_refresh(paper_ids):
+    """
+    Re-rank the related papers around ``paper_ids`` on commit. Papers queued in
+    the same transaction are re-ranked together, once: saving a paper's
+    keywords sends several m2m_changed signals. Each signal still registers a
+    callback, so a rolled back savepoint cannot drop the others' refresh; the
+    first callback to run takes the whole set. Papers queued by a rolled back
+    change are re-ranked with the next batch, which leaves their lists as
+    they were.
+    """
+    connection = transaction.get_connection()
+    if not hasattr(connection, 'pending_related_refresh'):
+        connection.pending_related_refresh = set()
+    connection.pending_related_refresh.update(paper_ids)
+    transaction.on_commit(lambda: _run_related_refresh(connection))
+
+
+def _refresh_related_papers(instance, action, reverse, pk_set, **kwargs):
+    """Re-rank the precomputed related papers around papers whose keywords changed"""
+    paper_ids = _changed_paper_ids(instance, action, reverse, pk_set)
+    if paper_ids:
+        queue_related_refresh(paper_ids)
+
+
+m2m_changed.connect(_refresh_linked_papers, sender=ResearchPaper.authors.through,
+                    dispatch_uid='research_paper_authors_search')
+m2m_changed.connect(_refresh_linked_papers, sender=ResearchPaper.keywords.through,
+                    dispatch_uid='research_paper_keywords_search')
+m2m_changed.connect(_refresh_related_papers, sender=ResearchPaper.keywords.through,
+                    dispatch_uid='research_paper_keywords_related')
+
+
+def _linked_keyword_counts(instance, reverse, pk_set=None):
+    """{keyword id: links} that a remove() or clear() on ``instance`` is about to delete"""
+    links = ResearchPaper.keywords.through.objects.all()
+    if reverse:
+        links = links.filter(keyword_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(researchpaper_id__in=pk_set)
+        return {instance.pk: links.count()}
+    links = links.filter(researchpaper_id=instance.pk)
+    if pk_set is not None:
+        links = links.filter(keyword_id__in=pk_set)
+    return dict.fromkeys(links.values_list('keyword_id', flat=True), 1)
+
+
+def _count_keyword_links(instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep Keyword.paper_count in step with the links. Deleting rows of an
+    auto-created through table sends no post_delete, and post_remove reports the
+    requested ids rather than the deleted ones, so removals are counted up front.
+    """
+    if action == 'post_add' and pk_set:
+        if reverse:
+            adjust_counters(Keyword, 'paper_count', {instance.pk: len(pk_set)})
+        else:
+            adjust_counters(Keyword, 'paper_count', dict.fromkeys(pk_set, 1))
+    elif action in ('pre_remove', 'pre_clear'):
+        instance._unlinked_keyword_counts = _linked_keyword_counts(
+            instance, reverse, pk_set if action == 'pre_remove' else None
+        )
+    elif action in ('post_remove', 'post_clear'):
+        counts = instance.__dict__.pop('_unlinked_keyword_counts', {})
+        adjust_counters(Keyword, 'paper_count', {pk: -count for pk, count in counts.items()})
+
+
+m2m_changed.connect(_count_keyword_links, sender=ResearchPaper.keywords.through,
+                    dispatch_uid='research_keyword_paper_count')
+
+
+@receiver(pre_delete, sender=ResearchPaper)
+def uncount_deleted_paper_keywords(sender, instance, **kwargs):
+    """The cascade to the keyword links bypasses m2m_changed"""
+    counts = _linked_keyword_counts(instance, reverse=False)
+    adjust_counters(Keyword, 'paper_count', {pk: -count for pk, count in counts.items()})
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Keyword)
+def refresh_named_papers(sender, instance, created=False, raw=False, **kwargs):
+    """A renamed author or keyword changes the document of every linked paper"""
+    if created or raw:
+        return
+    update_search_vectors(instance.papers.values('pk'))
+
+
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Keyword)
+def remember_named_papers(sender, instance, **kwargs):
+    """Cascade deletes of through rows bypass m2m_changed, so refresh afterwards"""
+    paper_ids = list(instance.papers.values_list('pk', flat=True))
+    if paper_ids:
+        transaction.on_commit(lambda: update_search_vectors(paper_ids))
+        if sender is Keyword:
+            queue_related_refresh(paper_ids)
+
+
+@receiver(pre_delete, sender=ResearchPaper)
+def remember_listing_papers(sender, instance, **kwargs):
+    """Papers listing a deleted paper as related lose it by cascade; re-rank them afterwards"""
+    paper_ids = list(RelatedPaper.objects.filter(related=instance).values_list('paper_id', flat=True))
+    if paper_ids:
+        transaction.on_commit(lambda: refresh_related_papers(paper_ids))
+
+
+# Any catalogue write can change the filter option snapshot
+for _model in (ResearchPaper, Author, Keyword, KeywordCategory):
+    post_save.connect(invalidate_filter_options, sender=_model,
+                      dispatch_uid=f'filter_options_saved_{_model.__name__}')
+    post_delete.connect(invalidate_filter_options, sender=_model,
+                        dispatch_uid=f'filter_options_deleted_{_model.__name__}')
+
+
+def invalidate_research_responses(action=None, **kwargs):
+    if action and action.startswith('pre_'):
+        return
+    invalidate_responses(RESEARCH_RESPONSES)
+
+
+# Cached paper and keyword responses embed authors, keywords and categories
+for _model in (ResearchPaper, Author, Keyword, KeywordCategory):
+    post_save.connect(invalidate_research_responses, sender=_model,
+                      dispatch_uid=f'research_responses_saved_{_model.__name__}')
+    post_delete.connect(invalidate_research_responses, sender=_model,
+                        dispatch_uid=f'research_responses_deleted_{_model.__name__}')
+for _through in (ResearchPaper.authors.through, ResearchPaper.keywords.through):
+    m2m_changed.connect(invalidate_research_responses, sender=_through,
+                        dispatch_uid=f'research_responses_m2m_{_through.__name__}')
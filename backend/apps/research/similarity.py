@@ -0,0 +1,236 @@
+"""
+Content similarity index over paper titles and abstracts.
+
+``build_similarity_index`` hashes the words of every paper into a fixed
+``n_features`` space (so no vocabulary has to be stored), weights them with
+TF-IDF and saves the L2-normalised matrix, its transpose (an inverted index),
+the idf weights and the paper ids as ``.npy`` files. Workers open the files
+with ``mmap_mode='r'``, so all gunicorn workers share one copy through the page
+cache, and notice a rebuild by the ``CURRENT`` pointer file changing.
+
+Nearest neighbours are a sparse product of a batch of query rows with the
+inverted index, which only touches the postings of the query terms, followed
+by ``argpartition`` per row. Scores are cosine similarities.
+
+numpy and scipy are optional dependencies: without them, or before the first
+build, ``get_index`` returns None and callers should degrade gracefully.
+"""
+import json
+import os
+import re
+import shutil
+import time
+import zlib
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ResearchPaper
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    np = sparse = None
+
+DEFAULT_FEATURES = 2 ** 18
+SIMILAR_PAPERS_MAX_LIMIT = 50
+# Title words count this many times as much as abstract words
+TITLE_WEIGHT = 2
+# Rebuilds kept on disk; older ones may still be mapped by running workers
+KEEP_VERSIONS = 2
+
+STOP_WORDS = frozenset("""
+    about also among and are based been between both but can could each from has have into its may
+    more most not our over paper results such than that the their these this those through under
+    using used was were which while with within study studies
+""".split())
+
+_WORD = re.compile(r'[a-z][a-z0-9]{2,}')
+_ARRAYS = (
+    'matrix_data', 'matrix_indices', 'matrix_indptr',
+    'inverted_data', 'inverted_indices', 'inverted_indptr',
+    'paper_ids', 'idf',
+)
+
+
+def is_available():
+    return np is not None
+
+
+def index_directory():
+    return settings.SIMILARITY_INDEX_DIR
+
+
+def paper_terms(title, abstract):
+    words = _WORD.findall((title or '').lower()) * TITLE_WEIGHT + _WORD.findall((abstract or '').lower())
+    return [word for word in words if word not in STOP_WORDS]
+
+
+def hashed_counts(title, abstract, n_features):
+    """{feature: term count} of a paper; crc32 keeps the hashing stable across processes"""
+    return Counter(zlib.crc32(word.encode()) % n_features for word in paper_terms(title, abstract))
+
+
+class SimilarityIndex:
+    """A loaded (memory-mapped) index version"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as handle:
+            self.meta = json.load(handle)
+        self.n_features = self.meta['n_features']
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in _ARRAYS}
+        self.paper_ids = arrays['paper_ids']
+        self.idf = arrays['idf']
+        shape = (len(self.paper_ids), self.n_features)
+        self.matrix = sparse.csr_matrix(
+            (arrays['matrix_data'], arrays['matrix_indices'], arrays['matrix_indptr']), shape=shape, copy=False
+        )
+        self.inverted = sparse.csr_matrix(
+            (arrays['inverted_data'], arrays['inverted_indices'], arrays['inverted_indptr']),
+            shape=shape[::-1], copy=False,
+        )
+
+    def position(self, paper_id):
+        """Row of ``paper_id`` in the matrix, or None if it was added after the build"""
+        if paper_id is None:
+            return None
+        position = int(np.searchsorted(self.paper_ids, paper_id))
+        if position < len(self.paper_ids) and self.paper_ids[position] == paper_id:
+            return position
+        return None
+
+    def vectorize(self, title, abstract):
+        """Query row for text that is not in the index, weighted with the stored idf"""
+        counts = hashed_counts(title, abstract, self.n_features)
+        features = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        values = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+        values *= self.idf[features]
+        norm = np.linalg.norm(values)
+        if norm:
+            values /= norm
+        return sparse.csr_matrix((values, features, [0, len(features)]), shape=(1, self.n_features))
+
+    def query_rows(self, papers):
+        """Stack query rows for (id, title, abstract) tuples, reusing indexed rows where possible"""
+        rows = []
+        for paper_id, title, abstract in papers:
+            position = self.position(paper_id)
+            rows.append(self.matrix[position] if position is not None else self.vectorize(title, abstract))
+        return sparse.vstack(rows, format='csr')
+
+    def nearest(self, queries, limit, exclude=()):
+        """
+        Top ``limit`` (paper_id, score) pairs for each row of ``queries``.
+
+        ``exclude`` lists a paper id per query row that must not match itself.
+        """
+        scores = (queries @ self.inverted).toarray()
+        results = []
+        for row_number, row in enumerate(scores):
+            if row_number < len(exclude):
+                position = self.position(exclude[row_number])
+                if position is not None:
+                    row[position] = 0
+            count = min(limit, len(row))
+            if not count:
+                results.append([])
+                continue
+            top = np.argpartition(-row, count - 1)[:count]
+            top = top[np.argsort(-row[top], kind='stable')]
+            results.append([(int(self.paper_ids[i]), float(row[i])) for i in top if row[i] > 0])
+        return results
+
+
+_loaded = {'marker': None, 'index': None}
+
+
+def get_index():
+    """The current index of this process, reloaded when a rebuild swapped ``CURRENT``"""
+    if not is_available():
+        return None
+    pointer = os.path.join(index_directory(), 'CURRENT')
+    try:
+        with open(pointer, encoding='utf-8') as handle:
+            version = handle.read().strip()
+    except FileNotFoundError:
+        return None
+    if _loaded['marker'] != version:
+        _loaded['index'] = SimilarityIndex(os.path.join(index_directory(), version))
+        _loaded['marker'] = version
+    return _loaded['index']
+
+
+def similar_papers(paper, limit):
+    """(paper_id, score) pairs most similar to ``paper``, or None without an index"""
+    index = get_index()
+    if index is None:
+        return None
+    queries = index.query_rows([(paper.id, paper.title, paper.abstract)])
+    return index.nearest(queries, limit, exclude=[paper.id])[0]
+
+
+def build_similarity_index(n_features=DEFAULT_FEATURES, chunk_size=2000, progress=None, directory=None):
+    """
+    Build a new index version from every paper and make it current in
+    ``directory`` (default: settings.SIMILARITY_INDEX_DIR).
+
+    ``progress(papers_read)`` is called after each chunk. Returns the new index.
+    """
+    if not is_available():
+        raise RuntimeError('numpy and scipy are required to build the similarity index')
+
+    paper_ids, indices, counts, indptr = array('q'), array('i'), array('f'), array('q', [0])
+    papers = ResearchPaper.objects.order_by('id').values_list('id', 'title', 'abstract')
+    for number, (paper_id, title, abstract) in enumerate(papers.iterator(chunk_size=chunk_size), start=1):
+        terms = hashed_counts(title, abstract, n_features)
+        paper_ids.append(paper_id)
+        indices.extend(terms.keys())
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+        if progress and number % chunk_size == 0:
+            progress(number)
+
+    indices = np.frombuffer(indices, dtype=np.int32)
+    total = len(paper_ids)
+    document_frequency = np.bincount(indices, minlength=n_features)
+    idf = (np.log((1 + total) / (1 + document_frequency)) + 1).astype(np.float32)
+    data = (1 + np.log(np.frombuffer(counts, dtype=np.float32))) * idf[indices]
+    matrix = sparse.csr_matrix(
+        (data, indices, np.frombuffer(indptr, dtype=np.int64)), shape=(total, n_features)
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = sparse.diags(1 / norms).astype(np.float32) @ matrix
+    matrix = matrix.tocsr()
+    matrix.sort_indices()
+    inverted = matrix.T.tocsr()
+    inverted.sort_indices()
+
+    directory = directory or index_directory()
+    version = f'v{time.time_ns()}'
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    for name, values in (
+        ('matrix_data', matrix.data), ('matrix_indices', matrix.indices), ('matrix_indptr', matrix.indptr),
+        ('inverted_data', inverted.data), ('inverted_indices', inverted.indices),
+        ('inverted_indptr', inverted.indptr),
+        ('paper_ids', np.frombuffer(paper_ids, dtype=np.int64)), ('idf', idf),
+    ):
+        np.save(os.path.join(path, f'{name}.npy'), values)
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as handle:
+        json.dump({'n_features': n_features, 'papers': total, 'built_at': timezone.now().isoformat()}, handle)
+
+    # Swap the pointer atomically, then drop versions no worker should still be opening
+    pointer = os.path.join(directory, 'CURRENT')
+    with open(f'{pointer}.tmp', 'w', encoding='utf-8') as handle:
+        handle.write(version)
+    os.replace(f'{pointer}.tmp', pointer)
+    versions = sorted(name for name in os.listdir(directory) if name.startswith('v'))
+    for stale in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+
+    return SimilarityIndex(path)
@@ -0,0 +1,110 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.research.importer import PaperImporter
+from apps.research.models import ResearchPaper, Author, Keyword
+
+
+def paper_row(title, **extra):
+    row = {
+        "title": title,
+        "abstract": "An abstract.",
+        "authors": [{"name": "Ada Field", "affiliation": "Soil Lab"}, "Ben Crop"],
+        "keywords": [{"name": "Cover Crops"}, "soil"],
+        "publication_year": 2021,
+    }
+    row.update(extra)
+    return row
+
+
+class PaperImporterTests(TestCase):
+    def test_shared_authors_and_keywords_are_created_once(self):
+        Keyword.objects.create(name="soil")
+        result = PaperImporter().run([paper_row("First"), paper_row("Second")])
+
+        self.assertEqual(len(result.created), 2)
+        self.assertEqual(Author.objects.filter(name="Ada Field").count(), 1)
+        self.assertEqual(Author.objects.get(name="Ada Field").affiliation, "Soil Lab")
+        self.assertEqual(sorted(Keyword.objects.values_list("name", flat=True)), ["cover crops", "soil"])
+
+        paper = ResearchPaper.objects.get(title="First")
+        self.assertEqual(paper.publication_year, "2021")
+        self.assertEqual(paper.publication_year_int, 2021)
+        self.assertEqual(paper.methodology_type, "Unknown")
+        self.assertEqual(sorted(paper.authors.values_list("name", flat=True)), ["Ada Field", "Ben Crop"])
+        self.assertEqual(paper.keywords.count(), 2)
+        self.assertTrue(ResearchPaper.objects.filter(pk=paper.pk, search_vector__isnull=False).exists())
+
+    def test_existing_author_is_reused(self):
+        author = Author.objects.create(name="Ada Field")
+        PaperImporter().run([paper_row("First")])
+        self.assertEqual(ResearchPaper.objects.get().authors.filter(pk=author.pk).count(), 1)
+
+    def test_slug_collisions(self):
+        ResearchPaper.objects.create(title="Same", slug="same", abstract="...")
+        ResearchPaper.objects.create(title="Same", slug="same-2", abstract="...")
+        result = PaperImporter().run([paper_row("Same"), paper_row("Same"), paper_row("Other", slug="same")])
+
+        self.assertEqual([paper.slug for _, paper in result.created], ["same-3", "same-4", "same-5"])
+
+    def test_invalid_rows_are_reported(self):
+        result = PaperImporter(batch_size=2).run([
+            paper_row("Good"),
+            {"abstract": "No title"},
+            "not an object",
+            paper_row("Also good", citation_trend="sideways"),
+            paper_row("Third good"),
+        ])
+
+        self.assertEqual([index for index, _ in result.created], [0, 4])
+        self.assertEqual([error["index"] for error in result.errors], [1, 2, 3])
+        self.assertIn("title", result.errors[0]["errors"])
+        self.assertEqual(result.errors[2]["title"], "Also good")
+        self.assertEqual(result.status, "partial")
+
+    def test_database_errors_only_fail_their_row(self):
+        result = PaperImporter().run([
+            paper_row("Fine"),
+            paper_row("Too long", keywords=["x" * 101]),
+            paper_row("Also fine", authors=[{"name": "Cy Yield", "email": "e" * 300}]),
+        ])
+
+        self.assertEqual([index for index, _ in result.created], [0])
+        self.assertEqual([error["index"] for error in result.errors], [1, 2])
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        counts = []
+        for size in (2, 20):
+            rows = [
+                paper_row(f"Paper {size}-{i}", authors=[f"Author {size}-{i}"], keywords=[f"keyword {size}-{i}"])
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                PaperImporter().run(rows)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class BulkImportViewTests(APITestCase):
+    url = '/api/research/papers/bulk-import/'
+
+    def test_success(self):
+        response = self.client.post(self.url, [paper_row("First"), paper_row("Second")], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["success_count"], 2)
+        self.assertEqual(response.data["error_count"], 0)
+
+    def test_partial_import_keeps_valid_rows(self):
+        response = self.client.post(self.url, [paper_row("First"), {"title": "No abstract"}], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertTrue(ResearchPaper.objects.filter(title="First").exists())
+
+    def test_nothing_imported(self):
+        response = self.client.post(self.url, [{"title": "No abstract"}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.data)
+
+        response = self.client.post(self.url, {"title": "Not a list"}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.research.formats import read_bibtex, read_ndjson
+from apps.research.importer import PaperImporter
+from apps.research.models import ResearchPaper, Author, Keyword
+
+
+class PaperExportTests(APITestCase):
+    url = '/api/research/papers/export/'
+
+    def setUp(self):
+        cache.clear()
+        self.soil = Keyword.objects.create(name="soil")
+        self.ada = Author.objects.create(name="Ada Field", affiliation="Lab")
+        for i in range(3):
+            self.create_paper(i, methodology_type="Experimental" if i else "Review")
+
+    def create_paper(self, i, **extra):
+        paper = ResearchPaper.objects.create(
+            title=f"Soil study {i}", slug=f"soil-study-{i}", abstract="Soil.", publication_year="2020", **extra
+        )
+        paper.authors.add(self.ada)
+        paper.keywords.add(self.soil)
+        return paper
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["authors"], "Ada Field")
+        self.assertEqual(rows[0]["keywords"], "soil")
+
+    def test_list_filters_apply(self):
+        records = list(read_ndjson(io.StringIO(self.export(output="ndjson", methodology_type="Review"))))
+        self.assertEqual([record["slug"] for record in records], ["soil-study-0"])
+
+    def test_bibtex(self):
+        entries = list(read_bibtex(io.StringIO(self.export(output="bibtex"))))
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[0]["authors"], ["Ada Field"])
+
+    def test_unknown_output(self):
+        response = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_queries_are_per_chunk_not_per_paper(self):
+        counts = []
+        for extra in (0, 20):
+            for i in range(extra):
+                self.create_paper(100 + i)
+            response = self.client.get(self.url, {"output": "ndjson"})
+            with CaptureQueriesContext(connection) as context:
+                body = b"".join(response.streaming_content)
+            self.assertEqual(len(body.splitlines()), ResearchPaper.objects.count())
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_export_round_trips_through_the_importer(self):
+        records = list(read_ndjson(io.StringIO(self.export(output="ndjson"))))
+        ResearchPaper.objects.all().delete()
+
+        result = PaperImporter().run(records)
+        self.assertEqual(result.errors, [])
+        paper = ResearchPaper.objects.get(slug="soil-study-1")
+        self.assertEqual(paper.methodology_type, "Experimental")
+        self.assertEqual(list(paper.keywords.values_list("name", flat=True)), ["soil"])
+        self.assertEqual(json.loads(json.dumps(records[0]))["authors"], ["Ada Field"])
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.http import QueryDict
+from rest_framework.test import APITestCase
+from apps.research.facets import facet_cache_key, paper_facets
+from apps.research.models import Keyword, KeywordCategory, ResearchPaper
+
+
+class PaperFacetTests(APITestCase):
+    url = '/api/research/papers/'
+
+    def setUp(self):
+        cache.clear()
+        soil = KeywordCategory.objects.create(name="Soil")
+        compost = Keyword.objects.create(name="compost", category=soil)
+        tillage = Keyword.objects.create(name="tillage", category=soil)
+        policy = Keyword.objects.create(name="policy")
+        rows = [
+            ("2012", "Experimental", [compost, tillage]),
+            ("2015", "Experimental", [compost]),
+            ("2021", "Survey", [policy, compost]),
+            ("", "Survey", []),
+        ]
+        for index, (year, methodology, keywords) in enumerate(rows):
+            paper = ResearchPaper.objects.create(
+                title=f"Paper {index}", slug=f"paper-{index}", abstract="...",
+                publication_year=year, methodology_type=methodology,
+            )
+            paper.keywords.set(keywords)
+        self.soil = soil
+
+    def test_counts_every_facet_of_all_papers(self):
+        facets = paper_facets(ResearchPaper.objects.all())
+        self.assertEqual(facets['methodology_types'], [
+            {'value': "Experimental", 'count': 2}, {'value': "Survey", 'count': 2},
+        ])
+        self.assertEqual(facets['years'], [
+            {'from': 2010, 'to': 2019, 'count': 2}, {'from': 2020, 'to': 2029, 'count': 1},
+        ])
+        # A paper with two Soil keywords counts once
+        self.assertEqual(facets['keyword_categories'], [
+            {'id': self.soil.id, 'name': "Soil", 'count': 3},
+            {'id': 'uncategorized', 'name': "Other Keywords", 'count': 1},
+        ])
+        self.assertEqual([(k['name'], k['count']) for k in facets['keywords']],
+                         [("compost", 3), ("policy", 1), ("tillage", 1)])
+
+    def test_top_keywords_are_limited(self):
+        facets = paper_facets(ResearchPaper.objects.all(), top_keywords=1)
+        self.assertEqual([k['name'] for k in facets['keywords']], ["compost"])
+
+    def test_list_returns_facets_of_the_filtered_papers_in_one_query(self):
+        params = {'facets': 'true', 'methodology_type': 'Experimental'}
+        with self.assertNumQueries(1):
+            paper_facets(ResearchPaper.objects.filter(methodology_type="Experimental"))
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        facets = response.data['facets']
+        self.assertEqual(facets['methodology_types'], [{'value': "Experimental", 'count': 2}])
+        self.assertEqual([(k['name'], k['count']) for k in facets['keywords']], [("compost", 2), ("tillage", 1)])
+
+        self.assertNotIn('facets', self.client.get(self.url).data)
+
+    def test_empty_filters(self):
+        facets = paper_facets(ResearchPaper.objects.none())
+        self.assertEqual(facets, {'methodology_types': [], 'years': [], 'keyword_categories': [], 'keywords': []})
+
+    def test_cache_key_ignores_paging_order_and_blanks(self):
+        key = facet_cache_key(QueryDict('keyword=soil&keyword=compost&year_from=2010'))
+        self.assertEqual(key, facet_cache_key(QueryDict('year_from=2010&keyword=compost&keyword=soil&page=3&sort=title_asc&q=')))
+        self.assertNotEqual(key, facet_cache_key(QueryDict('keyword=soil&year_from=2010')))
+
+    def test_cached_facets_follow_catalogue_writes(self):
+        params = {'facets': '1', 'methodology_type': 'Survey'}
+        self.assertEqual(self.client.get(self.url, params).data['facets']['methodology_types'][0]['count'], 2)
+        ResearchPaper.objects.create(title="New survey", slug="new", abstract="...", methodology_type="Survey")
+        self.assertEqual(self.client.get(self.url, params).data['facets']['methodology_types'][0]['count'], 3)
+
+    def test_facets_follow_search_and_keyword_filters(self):
+        params = {'facets': '1', 'keyword': ['compost', 'tillage'], 'keyword_logic': 'and', 'sort': 'relevance'}
+        facets = self.client.get(self.url, params).data['facets']
+        self.assertEqual(facets['years'], [{'from': 2010, 'to': 2019, 'count': 1}])
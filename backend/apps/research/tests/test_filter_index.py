@@ -0,0 +1,82 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from apps.research.filter_index import can_answer, get_filter_index, load_filter_index
+from apps.research.models import Keyword, ResearchPaper
+from apps.research.views import ResearchPaperViewSet
+
+
+@override_settings(PAPER_FILTER_INDEX=True)
+class PaperFilterIndexTests(APITestCase):
+    url = '/api/research/papers/'
+
+    def setUp(self):
+        cache.clear()
+        keywords = [Keyword.objects.create(name=name) for name in ["soil", "Compost", "policy"]]
+        for i in range(14):
+            paper = ResearchPaper.objects.create(
+                title=f"Paper {i}", slug=f"paper-{i}", abstract="...",
+                publication_year=str(2010 + i % 6) if i % 7 else "",
+                methodology_type=["Experimental", "Survey", "Review"][i % 3],
+                citation_count=i * 5,
+            )
+            paper.keywords.set(keywords[j] for j in range(3) if (i >> j) & 1)
+        # Authenticated requests bypass the shared response cache
+        user = get_user_model().objects.create_user(username="reader", email="reader@example.com",
+                                                    password="long-enough-pw")
+        self.client.force_login(user)
+        self.index = load_filter_index()
+
+    def fetch(self, params, indexed):
+        with override_settings(PAPER_FILTER_INDEX=indexed):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_answers_plain_filters_like_the_orm(self):
+        for params in [
+            {},
+            {'page': 2},
+            {'keyword': ["soil", "Compost"]},
+            {'keyword': ["soil", "compost"], 'keyword_logic': 'and'},
+            {'keyword': "soil", 'methodology_type': ["Survey", "Review"]},
+            {'year_from': 2012, 'year_to': 2014},
+            {'year_to': 2013, 'min_citations': 10, 'max_citations': 50},
+            {'keyword': "missing"},
+        ]:
+            with self.subTest(params=params):
+                expected = self.fetch(params, indexed=False)
+                with mock.patch.object(ResearchPaperViewSet, 'get_queryset', side_effect=AssertionError):
+                    self.assertEqual(self.fetch(params, indexed=True), expected)
+
+    def test_other_filters_use_the_orm(self):
+        for params in [
+            {'q': "paper"}, {'sort': 'title_asc'}, {'author': "Ada"}, {'pagination': 'cursor'},
+            # Python and Postgres upper-case non-ASCII letters differently
+            {'keyword': ["straße", "soil"], 'keyword_logic': 'and'},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.fetch(params, indexed=True), self.fetch(params, indexed=False))
+
+    def test_non_ascii_and_terms_are_not_indexed(self):
+        self.assertFalse(can_answer(QueryDict('keyword=stra%C3%9Fe&keyword=soil&keyword_logic=and')))
+        self.assertTrue(can_answer(QueryDict('keyword=stra%C3%9Fe&keyword=soil')))
+
+    def test_keyword_logic(self):
+        index = self.index
+        ids = lambda positions: sorted(int(index.ids[p]) for p in positions)  # noqa: E731
+        both = ResearchPaper.objects.filter(keywords__name="soil").filter(keywords__name="Compost")
+        self.assertEqual(ids(index.match(keywords=["SOIL", "compost"], keyword_logic='and')),
+                         sorted(both.values_list('id', flat=True)))
+        # OR matches names exactly, like keywords__name__in
+        self.assertEqual(len(index.match(keywords=["compost"])), 0)
+
+    def test_stale_index_is_not_used(self):
+        self.assertIs(get_filter_index(), self.index)
+        ResearchPaper.objects.create(title="Fresh", slug="fresh", abstract="...", methodology_type="Survey")
+        self.assertIsNone(get_filter_index())
+        data = self.fetch({'methodology_type': "Survey"}, indexed=True)
+        self.assertIn("fresh", [paper['slug'] for paper in data['results']])
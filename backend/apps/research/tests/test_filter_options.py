@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APITestCase, APIRequestFactory
+from apps.research.models import ResearchPaper, Keyword, KeywordCategory
+from apps.research.filter_options import FILTER_OPTIONS_CACHE_KEY
+from apps.research.views import paper_filter_options
+
+
+class FilterOptionsCacheTests(APITestCase):
+    url = '/api/research/filter-options/'
+
+    def setUp(self):
+        cache.clear()
+        self.category = KeywordCategory.objects.create(name="Soil")
+        Keyword.objects.create(name="compost", category=self.category)
+        Keyword.objects.create(name="policy")
+        ResearchPaper.objects.create(
+            title="Compost trials", slug="compost", abstract="...",
+            publication_year="2019", methodology_type="Experimental",
+        )
+
+    def test_payload_shape(self):
+        data = self.client.get(self.url).data
+        self.assertEqual(data['methodology_types'], ["Experimental"])
+        self.assertEqual(data['years_available'], [2019])
+        self.assertEqual(
+            [(c['name'], [k['name'] for k in c['keywords']]) for c in data['keyword_categories']],
+            [("Soil", ["compost"]), ("Other Keywords", ["policy"])],
+        )
+        self.assertEqual(data['stats'], {'total_papers': 1, 'total_categories': 2, 'total_keywords': 2})
+
+    def test_second_request_is_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_paper_filter_options_shares_the_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = paper_filter_options(APIRequestFactory().get('/'))
+        self.assertEqual(response.data['years'], [2019])
+        self.assertEqual(response.data['keyword_categories'][0]['keyword_count'], 1)
+
+    def test_catalogue_writes_invalidate(self):
+        first = self.client.get(self.url)
+        Keyword.objects.create(name="biochar", category=self.category)
+        second = self.client.get(self.url)
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(
+            [k['name'] for k in second.data['keyword_categories'][0]['keywords']],
+            ["biochar", "compost"],
+        )
+
+        self.category.delete()
+        third = self.client.get(self.url)
+        self.assertEqual(third.data['keyword_categories'][0]['name'], "Other Keywords")
+
+    def test_snapshot_built_before_commit_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Keyword.objects.create(name="biochar", category=self.category)
+                # A concurrent request caching the snapshot before the commit
+                cache.set(FILTER_OPTIONS_CACHE_KEY, {"stale": True})
+        response = self.client.get(self.url)
+        self.assertIn("biochar", [k['name'] for k in response.data['keyword_categories'][0]['keywords']])
+
+    def test_conditional_requests_get_304(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        ResearchPaper.objects.create(title="New", slug="new", abstract="...", publication_year="2020")
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
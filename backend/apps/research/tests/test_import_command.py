@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from apps.research.formats import read_bibtex, read_csv
+from apps.research.importer import PaperImporter
+from apps.research.models import ResearchPaper
+
+BIBTEX = """
+@comment{exported by a reference manager}
+@article{field2021,
+  title = {Cover {Crops} and Soil Carbon},
+  author = {Field, Ada and Ben Crop},
+  year = 2021,
+  journal = "Soil Biology",
+  keywords = {cover crops, soil},
+  abstract = {Effects of cover crops (rye) on soil carbon.}
+}
+@inproceedings(yield2019,
+  title = {Yield gaps},
+  booktitle = {Agronomy Conference},
+  abstract = {Gaps.}
+)
+@article{broken, title = {Unclosed
+}
+"""
+
+
+class ReaderTests(TestCase):
+    def test_bibtex(self):
+        rows = list(read_bibtex(io.StringIO(BIBTEX)))
+        self.assertEqual(rows[0]["title"], "Cover Crops and Soil Carbon")
+        self.assertEqual(rows[0]["authors"], ["Field, Ada", "Ben Crop"])
+        self.assertEqual(rows[0]["keywords"], ["cover crops", "soil"])
+        self.assertEqual(rows[0]["publication_year"], "2021")
+        self.assertEqual(rows[0]["journal"], "Soil Biology")
+        self.assertEqual(rows[1]["journal"], "Agronomy Conference")
+        self.assertIsInstance(rows[2], ValueError)
+
+    def test_csv_lists_and_blank_cells(self):
+        rows = list(read_csv(io.StringIO(
+            "title,abstract,authors,keywords,citation_count\n"
+            "Cover crops,Soil.,Ada Field; Ben Crop,soil;water,\n"
+        )))
+        self.assertEqual(rows, [{
+            "title": "Cover crops", "abstract": "Soil.",
+            "authors": ["Ada Field", "Ben Crop"], "keywords": ["soil", "water"],
+        }])
+
+    def test_parse_errors_are_reported_by_index(self):
+        rows = list(read_bibtex(io.StringIO(BIBTEX)))
+        result = PaperImporter().run(rows)
+        self.assertEqual(len(result.created), 2)
+        self.assertEqual(result.errors[0]["index"], 2)
+
+
+class ImportPapersCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.source = os.path.join(self.directory, "papers.ndjson")
+        with open(self.source, "w") as handle:
+            for i in range(5):
+                handle.write(json.dumps({"title": f"Paper {i}", "abstract": "Soil.", "keywords": ["soil"]}) + "\n")
+            handle.write("{not json\n")
+
+    def call(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_papers", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_in_chunks(self):
+        out, err = self.call(self.source, "--chunk-size", "2")
+        self.assertEqual(ResearchPaper.objects.count(), 5)
+        self.assertIn("rows/s", out)
+        self.assertIn("row 5", err)
+        self.assertFalse(os.path.exists(self.source + ".checkpoint"))
+
+    def test_resume_skips_checkpointed_rows(self):
+        with open(self.source + ".checkpoint", "w") as handle:
+            json.dump({"source": self.source, "format": "ndjson", "next_row": 3, "created": 3, "failed": 0}, handle)
+
+        errors = os.path.join(self.directory, "errors.ndjson")
+        out, _ = self.call(self.source, "--resume", "--errors", errors)
+        self.assertEqual(
+            sorted(ResearchPaper.objects.values_list("title", flat=True)), ["Paper 3", "Paper 4"]
+        )
+        self.assertIn("5 imported", out)
+        with open(errors) as handle:
+            self.assertEqual(json.loads(handle.read())["index"], 5)
+
+    def test_checkpoint_survives_a_crash(self):
+        original = PaperImporter.write_batch
+        calls = []
+
+        def crash_on_second_chunk(importer, batch, result):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            return original(importer, batch, result)
+
+        with mock.patch.object(PaperImporter, "write_batch", crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.call(self.source, "--chunk-size", "2")
+        with open(self.source + ".checkpoint") as handle:
+            self.assertEqual(json.load(handle)["next_row"], 2)
+
+        self.call(self.source, "--chunk-size", "2", "--resume")
+        self.assertEqual(ResearchPaper.objects.count(), 5)
+
+    def test_stdin(self):
+        data = "title,abstract\nFrom stdin,Soil.\n"
+        with mock.patch("sys.stdin", io.StringIO(data)):
+            self.call("-", "--format", "csv")
+        self.assertTrue(ResearchPaper.objects.filter(title="From stdin").exists())
+
+    def test_format_is_required_for_unknown_extensions(self):
+        with self.assertRaises(CommandError):
+            self.call(os.path.join(self.directory, "papers.txt"))
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.research.models import Keyword, ResearchPaper
+from apps.research.views import keyword_paper_ids
+
+
+class KeywordFilterTests(APITestCase):
+    url = '/api/research/papers/'
+
+    def setUp(self):
+        cache.clear()
+        names = ["soil", "Soil", "compost", "policy"]
+        self.keywords = {name: Keyword.objects.create(name=name) for name in names}
+        for slug, tagged in [
+            ("both", ["soil", "compost"]),
+            ("upper-both", ["Soil", "compost"]),
+            ("soil-variants", ["soil", "Soil"]),
+            ("compost-only", ["compost"]),
+            ("all", ["soil", "compost", "policy"]),
+            ("untagged", []),
+        ]:
+            paper = ResearchPaper.objects.create(title=slug, slug=slug, abstract="...")
+            paper.keywords.set(self.keywords[name] for name in tagged)
+
+    def slugs(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        slugs = [paper['slug'] for paper in response.data['results']]
+        self.assertEqual(response.data['count'], len(slugs))
+        return sorted(slugs)
+
+    def test_or_matches_any_exact_name_once(self):
+        self.assertEqual(self.slugs(keyword=["soil", "policy"]), ["all", "both", "soil-variants"])
+        self.assertEqual(self.slugs(keyword=["Soil"]), ["soil-variants", "upper-both"])
+        self.assertEqual(self.slugs(keyword=["missing"]), [])
+
+    def test_and_matches_every_name_case_insensitively(self):
+        self.assertEqual(self.slugs(keyword=["SOIL", "compost"], keyword_logic='and'), ["all", "both", "upper-both"])
+        self.assertEqual(self.slugs(keyword=["soil", "compost", "policy"], keyword_logic='AND'), ["all"])
+
+    def test_case_variants_count_as_one_term(self):
+        # Tagged with 'soil' and 'Soil' but no compost
+        self.assertNotIn("soil-variants", self.slugs(keyword=["soil", "compost"], keyword_logic='and'))
+        self.assertEqual(self.slugs(keyword=["soil", "SOIL"], keyword_logic='and'),
+                         ["all", "both", "soil-variants", "upper-both"])
+
+    def test_and_with_an_unknown_keyword_matches_nothing(self):
+        self.assertEqual(self.slugs(keyword=["soil", "missing"], keyword_logic='and'), [])
+
+    def test_and_folds_terms_like_iexact(self):
+        paper = ResearchPaper.objects.create(title="street", slug="street", abstract="...")
+        paper.keywords.set([Keyword.objects.create(name="straße"), self.keywords["compost"]])
+        self.assertEqual(self.slugs(keyword=["straße", "compost"], keyword_logic='and'), ["street"])
+        for term in ["STRASSE", "Straße"]:
+            with self.subTest(term=term):
+                expected = ResearchPaper.objects.filter(keywords__name__iexact=term).filter(
+                    keywords__name__iexact="compost"
+                )
+                self.assertEqual(
+                    self.slugs(keyword=[term, "compost"], keyword_logic='and'),
+                    sorted(expected.values_list('slug', flat=True)),
+                )
+
+    def test_and_is_one_grouped_subquery(self):
+        with self.assertNumQueries(1):
+            subquery = keyword_paper_ids(["soil", "compost", "policy"], match_all=True)
+        sql = str(ResearchPaper.objects.filter(id__in=subquery).query)
+        self.assertEqual(sql.count('JOIN'), 0)
+        self.assertIn('HAVING', sql)
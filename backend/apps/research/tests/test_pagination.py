@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.research.models import ResearchPaper
+
+
+class PaperKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(13):
+            ResearchPaper.objects.create(
+                title=f"Paper {i}", slug=f"paper-{i}", abstract="...",
+                # Repeated years exercise the created_at/id tie-breakers
+                publication_year=str(2000 + i % 4) if i % 5 else '',
+            )
+
+    def walk(self, **params):
+        ids = []
+        response = self.client.get('/api/research/papers/', {'pagination': 'cursor', **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [paper['id'] for paper in response.data['results']]
+            if not response.data['next']:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_default_order_exactly_once(self):
+        ids, _ = self.walk(page_size=4)
+        expected = ResearchPaper.objects.order_by('-publication_year', '-created_at', 'id')
+        self.assertEqual(ids, [paper.id for paper in expected])
+
+    def test_filters_apply_to_every_page(self):
+        ids, _ = self.walk(page_size=2, year_from='2002')
+        self.assertEqual(
+            sorted(ids),
+            sorted(ResearchPaper.objects.filter(publication_year__gte='2002').values_list('id', flat=True)),
+        )
+
+    def test_totals_are_opt_in(self):
+        response = self.client.get('/api/research/papers/', {'pagination': 'cursor'})
+        self.assertIsNone(response.data['count'])
+        self.assertNotIn('previous', response.data)
+
+        response = self.client.get('/api/research/papers/', {'pagination': 'cursor', 'count': 'exact'})
+        self.assertEqual(response.data['count'], 13)
+
+        response = self.client.get('/api/research/papers/', {'pagination': 'cursor', 'count': 'estimate'})
+        self.assertIsInstance(response.data['count'], int)
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get('/api/research/papers/')
+        self.assertEqual(response.data['count'], 13)
+        self.assertIn('previous', response.data)
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.research.importer import PaperImporter
+from apps.research.models import ResearchPaper, Keyword
+
+
+class KeywordPaperCountTests(APITestCase):
+    url = '/api/research/papers/popular_keywords/'
+
+    def setUp(self):
+        cache.clear()
+        self.soil, self.water, self.seeds = (Keyword.objects.create(name=name) for name in ["soil", "water", "seeds"])
+        self.papers = [
+            ResearchPaper.objects.create(
+                title=f"Paper {i}", slug=f"paper-{i}", abstract="Soil.", publication_year="2020"
+            )
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return dict(Keyword.objects.values_list("name", "paper_count"))
+
+    def test_counts_follow_link_changes(self):
+        first, second, third = self.papers
+        first.keywords.set([self.soil, self.water])
+        self.soil.papers.add(second, third)
+        second.keywords.remove(self.water)
+        self.assertEqual(self.counts(), {"soil": 3, "water": 1, "seeds": 0})
+
+        first.keywords.set([self.seeds])
+        self.soil.papers.clear()
+        self.assertEqual(self.counts(), {"soil": 0, "water": 0, "seeds": 1})
+
+    def test_paper_deletion_decrements(self):
+        for paper in self.papers:
+            paper.keywords.add(self.soil)
+        self.papers[0].delete()
+        self.assertEqual(self.counts()["soil"], 2)
+
+    def test_importer_counts_bulk_links(self):
+        self.papers[0].keywords.add(self.soil)
+        result = PaperImporter().run([
+            {"title": "Imported 1", "abstract": "Soil.", "keywords": ["Soil", "Water"]},
+            {"title": "Imported 2", "abstract": "Soil.", "keywords": ["soil", "tillage"]},
+        ])
+        self.assertEqual(result.errors, [])
+        self.assertEqual(self.counts(), {"soil": 3, "water": 1, "seeds": 0, "tillage": 1})
+
+    def test_popular_keywords_is_a_top_n_read(self):
+        for paper in self.papers:
+            paper.keywords.add(self.water)
+        self.papers[0].keywords.add(self.soil)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"limit": 5})
+        self.assertEqual([keyword["name"] for keyword in response.data], ["water", "soil"])
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase, APIRequestFactory
+from apps.research.models import ResearchPaper, parse_publication_year
+from apps.research.views import paper_filter_options
+
+
+class PublicationYearTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.papers = {
+            year: ResearchPaper.objects.create(
+                title=f"Paper {year or 'undated'}", slug=f"paper-{year or 'undated'}",
+                abstract="...", publication_year=year,
+            )
+            for year in ["2019", "2020-05", "2021", "", "n.d."]
+        }
+
+    def slugs(self, response):
+        return [paper['slug'] for paper in response.data['results']]
+
+    def test_parse_publication_year(self):
+        self.assertEqual(parse_publication_year("2021"), 2021)
+        self.assertEqual(parse_publication_year(" 2020-05"), 2020)
+        self.assertEqual(parse_publication_year(1999), 1999)
+        self.assertIsNone(parse_publication_year(""))
+        self.assertIsNone(parse_publication_year("n.d."))
+        self.assertIsNone(parse_publication_year("20210"))
+
+    def test_save_keeps_the_integer_year_in_sync(self):
+        paper = self.papers["2019"]
+        self.assertEqual(paper.publication_year_int, 2019)
+
+        paper.publication_year = "2018"
+        paper.save(update_fields=["publication_year"])
+        paper.refresh_from_db()
+        self.assertEqual((paper.publication_year, paper.publication_year_int), ("2018", 2018))
+
+        paper.publication_year = ""
+        paper.save()
+        paper.refresh_from_db()
+        self.assertIsNone(paper.publication_year_int)
+
+    def test_year_range_compares_numbers(self):
+        # As strings "2020-05" > "2020" fell outside year_to=2020
+        response = self.client.get('/api/research/papers/', {'year_from': 2020, 'year_to': 2020})
+        self.assertEqual(self.slugs(response), ["paper-2020-05"])
+
+        response = self.client.get('/api/research/papers/', {'year_gte': 2020})
+        self.assertEqual(sorted(self.slugs(response)), ["paper-2020-05", "paper-2021"])
+
+    def test_year_sorting_puts_undated_papers_at_the_end_of_newest_first(self):
+        newest = self.slugs(self.client.get('/api/research/papers/', {'sort': 'date_newest'}))
+        self.assertEqual(newest[:3], ["paper-2021", "paper-2020-05", "paper-2019"])
+        self.assertEqual(set(newest[3:]), {"paper-undated", "paper-n.d."})
+
+        oldest = self.slugs(self.client.get('/api/research/papers/', {'sort': 'date_oldest'}))
+        self.assertEqual(oldest[2:], ["paper-2019", "paper-2020-05", "paper-2021"])
+
+    def test_year_list_comes_from_the_integer_column(self):
+        response = paper_filter_options(APIRequestFactory().get('/'))
+        self.assertEqual(response.data['years'], [2019, 2020, 2021])
+        self.assertEqual(response.data['stats']['year_range'], {'min': 2019, 'max': 2021})
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.research.models import ResearchPaper, Author, Keyword
+
+
+class PaperQueryCountTests(APITestCase):
+    """Nested authors/keywords must not cost a query per paper"""
+
+    def setUp(self):
+        cache.clear()
+        self.keywords = [Keyword.objects.create(name=f"keyword {i}") for i in range(3)]
+        self.authors = [Author.objects.create(name=f"Author {i}", affiliation="Lab") for i in range(3)]
+
+    def create_papers(self, count):
+        for i in range(ResearchPaper.objects.count(), ResearchPaper.objects.count() + count):
+            paper = ResearchPaper.objects.create(
+                title=f"Soil study {i}", slug=f"soil-study-{i}", abstract="Soil.",
+                publication_year="2020", citation_trend='increasing',
+            )
+            paper.authors.set(self.authors)
+            # Related papers are ranked on commit
+            with self.captureOnCommitCallbacks(execute=True):
+                paper.keywords.set(self.keywords)
+
+    def assertConstantQueries(self, url, params=None):
+        """Same number of queries with 2 and with 12 papers"""
+        counts = []
+        for count in (2, 10):
+            self.create_papers(count)
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        return counts[0]
+
+    def test_list(self):
+        # count, page, authors, keywords
+        self.assertEqual(self.assertConstantQueries('/api/research/papers/'), 4)
+
+    def test_search(self):
+        self.assertEqual(self.assertConstantQueries('/api/research/search/', {'q': 'soil'}), 4)
+
+    def test_trending(self):
+        self.assertEqual(self.assertConstantQueries('/api/research/papers/trending/'), 3)
+
+    def test_related(self):
+        # paper id, precomputed links joined to papers, authors, keywords
+        self.assertEqual(self.assertConstantQueries('/api/research/papers/soil-study-0/related/'), 4)
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from unittest import mock
+from rest_framework.test import APITestCase
+from apps.users.models import User
+from apps.research.models import ResearchPaper, Keyword, RelatedPaper
+from apps.research.related import rank_related
+
+
+class RelatedPapersTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.keywords = {name: Keyword.objects.create(name=name) for name in ("soil", "water", "maize", "rice")}
+        self.papers = {}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_papers()
+
+    def create_papers(self):
+        for slug, names, year in (
+            ("base", ["soil", "water", "maize"], "2020"),
+            ("close", ["soil", "water", "maize"], "2018"),
+            ("partial", ["soil", "water"], "2021"),
+            ("far", ["soil", "rice"], "2022"),
+            ("unrelated", ["rice"], "2022"),
+        ):
+            paper = ResearchPaper.objects.create(title=slug, slug=slug, abstract="...", publication_year=year)
+            paper.keywords.set([self.keywords[name] for name in names])
+            self.papers[slug] = paper
+
+    def related_slugs(self, slug, **params):
+        cache.clear()
+        response = self.client.get(f'/api/research/papers/{slug}/related/', params)
+        self.assertEqual(response.status_code, 200)
+        return [paper["slug"] for paper in response.json()]
+
+    def stored(self, slug):
+        return list(
+            RelatedPaper.objects.filter(paper=self.papers[slug]).order_by('rank').values_list('related__slug', flat=True)
+        )
+
+    def test_ranked_by_jaccard(self):
+        self.assertEqual(self.related_slugs("base"), ["close", "partial", "far"])
+        self.assertEqual(self.related_slugs("base", limit=2), ["close", "partial"])
+        link = RelatedPaper.objects.get(paper=self.papers["base"], related=self.papers["partial"])
+        self.assertAlmostEqual(link.score, 2 / 3)
+        self.assertEqual(link.shared_keywords, 2)
+
+    def test_keyword_changes_refresh_incrementally(self):
+        self.assertEqual(self.stored("unrelated"), ["far"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.papers["unrelated"].keywords.add(self.keywords["soil"], self.keywords["water"])
+        # far and partial tie at 2/3; the newer paper wins
+        self.assertEqual(self.stored("unrelated"), ["far", "partial", "base", "close"])
+        # Neighbours see the change too
+        self.assertIn("unrelated", self.stored("partial"))
+
+        # Reverse side: far keeps only "soil"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.keywords["rice"].papers.clear()
+        self.assertEqual(self.stored("far"), ["unrelated", "partial", "base", "close"])
+
+    def test_one_refresh_per_transaction(self):
+        with mock.patch('apps.research.signals.refresh_after_keyword_change') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    paper = self.papers["unrelated"]
+                    paper.keywords.clear()
+                    for name in ("soil", "water", "maize"):
+                        paper.keywords.add(self.keywords[name])
+                    self.keywords["rice"].papers.clear()
+                self.assertFalse(refresh.called)
+        refresh.assert_called_once()
+        self.assertEqual(set(refresh.call_args.args[0]), {self.papers["unrelated"].id, self.papers["far"].id})
+
+    def test_rolled_back_savepoint_keeps_the_refresh(self):
+        with mock.patch('apps.research.signals.refresh_after_keyword_change') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    with transaction.atomic():
+                        self.papers["far"].keywords.clear()
+                        transaction.set_rollback(True)
+                    self.papers["base"].keywords.remove(self.keywords["maize"])
+        refresh.assert_called_once()
+        # Re-ranking far again is harmless: its links are unchanged
+        self.assertIn(self.papers["base"].id, refresh.call_args.args[0])
+
+    def test_serializer_update_refreshes_once(self):
+        self.client.force_authenticate(User.objects.create_superuser("admin", "admin@example.com", "pass"))
+        with mock.patch('apps.research.signals.refresh_after_keyword_change') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    '/api/research/papers/base/', {"keywords": [{"name": "peat"}, {"name": "clay"}]}, format='json'
+                )
+        self.assertEqual(response.status_code, 200, response.content)
+        refresh.assert_called_once()
+        self.assertEqual(
+            set(self.papers["base"].keywords.values_list('name', flat=True)), {"peat", "clay"}
+        )
+
+    def test_build_command_invalidates_cached_responses(self):
+        url = '/api/research/papers/base/related/'
+        self.assertEqual([paper["slug"] for paper in self.client.get(url).json()], ["close", "partial", "far"])
+        # Unlinked without signals, e.g. by raw SQL; only the rebuild sees it
+        ResearchPaper.keywords.through.objects.filter(researchpaper=self.papers["close"]).delete()
+        call_command('build_related_papers', stdout=open('/dev/null', 'w'))
+        self.assertEqual([paper["slug"] for paper in self.client.get(url).json()], ["partial", "far"])
+
+    def test_deleting_a_paper_reranks_its_listers(self):
+        self.papers["close"].delete()
+        self.assertEqual(self.stored("base"), ["partial", "far"])
+
+    def test_build_command_matches_live_ranking(self):
+        RelatedPaper.objects.all().delete()
+        self.assertEqual(self.related_slugs("base"), ["close", "partial", "far"])
+
+        call_command('build_related_papers', '--batch-size', '2', stdout=open('/dev/null', 'w'))
+        for slug, paper in self.papers.items():
+            live = [related_id for _, related_id, *_ in rank_related([paper.id])]
+            self.assertEqual(
+                list(RelatedPaper.objects.filter(paper=paper).order_by('rank').values_list('related_id', flat=True)),
+                live,
+            )
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.research.models import ResearchPaper, Keyword
+
+
+class AnonymousResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.paper = ResearchPaper.objects.create(
+            title="Cover crops", slug="cover-crops", abstract="...", publication_year="2020",
+        )
+        self.keyword = Keyword.objects.create(name="cover crops")
+
+    def assertServedFromCache(self, url, params=None):
+        self.client.get(url, params)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_paper_and_keyword_lists_are_cached(self):
+        for url in ('/api/research/papers/', '/api/research/keywords/'):
+            response = self.assertServedFromCache(url)
+            self.assertIn('Authorization', response['Vary'])
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get('/api/research/papers/', {'methodology': 'Experimental'})
+        response = self.client.get('/api/research/papers/')
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_model_changes_invalidate(self):
+        self.assertEqual(self.client.get('/api/research/papers/').json()['count'], 1)
+
+        ResearchPaper.objects.create(title="Agroforestry", slug="agroforestry", abstract="...")
+        self.assertEqual(self.client.get('/api/research/papers/').json()['count'], 2)
+
+        self.paper.keywords.add(self.keyword)
+        response = self.client.get('/api/research/papers/cover-crops/')
+        self.assertEqual([k['name'] for k in response.json()['keywords']], ["cover crops"])
+
+        self.keyword.delete()
+        response = self.client.get('/api/research/papers/cover-crops/')
+        self.assertEqual(response.json()['keywords'], [])
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = get_user_model().objects.create_user(
+            username='reader', email='reader@example.com', password='long-enough-pw'
+        )
+        self.client.get('/api/research/papers/')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}'
+        )
+        response = self.client.get('/api/research/papers/')
+        # Only freshly rendered DRF responses carry .data
+        self.assertTrue(hasattr(response, 'data'))
@@ -0,0 +1,59 @@
+from rest_framework.test import APITestCase
+from apps.research.models import ResearchPaper, Author, Keyword
+
+
+class PaperSearchVectorTests(APITestCase):
+    def setUp(self):
+        self.soil = ResearchPaper.objects.create(
+            title="Soil carbon in smallholder farms",
+            slug="soil-carbon",
+            abstract="We measure carbon stocks.",
+            publication_year="2020",
+        )
+        self.water = ResearchPaper.objects.create(
+            title="Irrigation scheduling",
+            slug="irrigation",
+            abstract="Water use and soil moisture.",
+            publication_year="2021",
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/research/papers/', params)
+        self.assertEqual(response.status_code, 200)
+        return [paper['slug'] for paper in response.data['results']]
+
+    def test_vector_populated_on_save(self):
+        self.soil.refresh_from_db()
+        self.assertIsNotNone(self.soil.search_vector)
+
+    def test_keyword_link_updates_vector(self):
+        keyword = Keyword.objects.create(name="agroforestry")
+        self.assertEqual(self.search(q="agroforestry"), [])
+
+        self.water.keywords.add(keyword)
+        self.assertEqual(self.search(q="agroforestry"), ["irrigation"])
+
+        keyword.papers.clear()
+        self.assertEqual(self.search(q="agroforestry"), [])
+
+    def test_author_rename_updates_vector(self):
+        author = Author.objects.create(name="Ada Lovelace", affiliation="Analytical")
+        self.soil.authors.add(author)
+        self.assertEqual(self.search(q="lovelace"), ["soil-carbon"])
+
+        author.name = "Grace Hopper"
+        author.save()
+        self.assertEqual(self.search(q="lovelace"), [])
+        self.assertEqual(self.search(q="hopper"), ["soil-carbon"])
+
+    def test_prefix_and_stemmed_matching(self):
+        self.assertEqual(self.search(q="irrig"), ["irrigation"])
+        self.assertEqual(self.search(q="farm"), ["soil-carbon"])
+
+    def test_relevance_prefers_title_matches(self):
+        # "soil" is in the title of one paper and only the abstract of the other
+        self.assertEqual(self.search(q="soil", sort="relevance"), ["soil-carbon", "irrigation"])
+
+    def test_terms_are_or_combined_and_sanitised(self):
+        slugs = self.search(q=["carbon", "irrigation & | !"])
+        self.assertCountEqual(slugs, ["soil-carbon", "irrigation"])
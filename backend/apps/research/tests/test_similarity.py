@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import unittest
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from apps.research.models import ResearchPaper
+from apps.research.similarity import build_similarity_index, get_index, is_available
+
+
+@unittest.skipUnless(is_available(), "numpy and scipy are not installed")
+class SimilarPapersTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(SIMILARITY_INDEX_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for slug, title, abstract in (
+            ("cover-crops", "Cover crops and soil carbon", "Rye cover crops increase soil organic carbon."),
+            ("soil-carbon", "Soil organic carbon under cover crops", "Carbon accumulates in soil with rye."),
+            ("irrigation", "Drip irrigation scheduling", "Water savings from drip irrigation of maize."),
+            ("market", "Farmer market access", "Smallholder prices and market distance."),
+        ):
+            ResearchPaper.objects.create(title=title, slug=slug, abstract=abstract)
+
+    def similar(self, slug, **params):
+        cache.clear()
+        return self.client.get(f'/api/research/papers/{slug}/similar/', params)
+
+    def test_unavailable_before_first_build(self):
+        self.assertEqual(self.similar("cover-crops").status_code, 503)
+
+    def test_nearest_neighbours(self):
+        build_similarity_index(n_features=2 ** 12)
+        response = self.similar("cover-crops", limit=2)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(results[0]["slug"], "soil-carbon")
+        self.assertGreater(results[0]["similarity"], 0.3)
+        self.assertNotIn("cover-crops", [paper["slug"] for paper in results])
+
+    def test_papers_added_after_the_build_are_vectorized_on_the_fly(self):
+        build_similarity_index(n_features=2 ** 12)
+        ResearchPaper.objects.create(title="Drip irrigation for maize", slug="new", abstract="Irrigation water.")
+        self.assertEqual(self.similar("new").json()[0]["slug"], "irrigation")
+
+    def test_rebuild_is_picked_up(self):
+        first = build_similarity_index(n_features=2 ** 12)
+        self.assertEqual(get_index().path, first.path)
+        ResearchPaper.objects.get(slug="market").delete()
+        second = build_similarity_index(n_features=2 ** 12)
+        self.assertEqual(get_index().path, second.path)
+        self.assertEqual(get_index().meta["papers"], 3)
@@ -0,0 +1,39 @@
+from rest_framework.test import APITestCase
+from apps.research.models import Author, Keyword
+from apps.utils.typeahead import TYPEAHEAD_MAX_LIMIT
+
+
+class TypeaheadTests(APITestCase):
+    def setUp(self):
+        for name in ["agroforestry", "agriculture", "soil carbon", "organic agriculture"]:
+            Keyword.objects.create(name=name)
+        Author.objects.create(name="Elinor Ostrom", affiliation="Indiana University")
+
+    def names(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.data]
+
+    def test_prefix_matches_come_first(self):
+        names = self.names('/api/research/keywords/typeahead/', q="agri")
+        self.assertEqual(names[0], "agriculture")
+        self.assertIn("organic agriculture", names)
+        self.assertNotIn("soil carbon", names)
+
+    def test_typos_are_tolerated(self):
+        self.assertEqual(self.names('/api/research/keywords/typeahead/', q="agroforstry"), ["agroforestry"])
+        self.assertEqual(self.names('/api/research/authors/typeahead/', q="ostromm"), ["Elinor Ostrom"])
+
+    def test_prefix_match_is_case_insensitive(self):
+        self.assertEqual(self.names('/api/research/authors/typeahead/', q="eli"), ["Elinor Ostrom"])
+
+    def test_limit_is_capped(self):
+        Keyword.objects.bulk_create([Keyword(name=f"agri{i}") for i in range(40)])
+        self.assertEqual(len(self.names('/api/research/keywords/typeahead/', q="ag", limit=3)), 3)
+        self.assertEqual(
+            len(self.names('/api/research/keywords/typeahead/', q="ag", limit=1000)),
+            TYPEAHEAD_MAX_LIMIT,
+        )
+
+    def test_blank_term_returns_nothing(self):
+        self.assertEqual(self.names('/api/research/keywords/typeahead/', q="  "), [])
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResearchPaperViewSet, AuthorViewSet, KeywordViewSet, KeywordCategoryViewSet, filter_options
+from .views import ResearchPaperViewSet, AuthorViewSet, KeywordViewSet, KeywordCategoryViewSet, filter_options, paper_search
 
 router = DefaultRouter()
 router.register(r'papers', ResearchPaperViewSet)
@@ -9,10 +9,11 @@ router.register(r'authors', AuthorViewSet)
 router.register(r'keyword-categories', KeywordCategoryViewSet)
 
 urlpatterns = [
-    path('', include(router.urls)),
-    # Special endpoint for bulk imports
+    # Special endpoint for bulk imports; must precede the router's papers/<slug>/ route
     path('papers/bulk-import/', ResearchPaperViewSet.as_view({'post': 'bulk_import'}), name='paper-bulk-import'),
+    path('', include(router.urls)),
     path('filter-options/', filter_options, name='filter-options'),
+    path('search/', paper_search, name='paper-search'),
     # Additional custom endpoints (these are also registered automatically by the router above)
     # path('papers/<slug:slug>/related/', ResearchPaperViewSet.as_view({'get': 'related'}), name='paper-related'),
     # path('papers/popular-keywords/', ResearchPaperViewSet.as_view({'get': 'popular_keywords'}), name='popular-keywords'),
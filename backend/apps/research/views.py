@@ -1,13 +1,31 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet
-from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Case, Count, F, Value, When, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+from django.shortcuts import get_object_or_404
 from django.core.exceptions import FieldError
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
-from .models import ResearchPaper, Author, Keyword, KeywordCategory
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from .models import ResearchPaper, Author, Keyword, KeywordCategory, RelatedPaper
+from .related import RELATED_PAPERS_TOP_K, rank_related
+from .similarity import SIMILAR_PAPERS_MAX_LIMIT, similar_papers
+from .search import search_papers
+from .importer import PaperImporter
+from .export import EXPORT_CONTENT_TYPES, export_response
+from .facets import get_facets
+from .filter_index import IndexedPapers, can_answer, get_filter_index
+from .pagination import PaperKeysetPagination
+from .signals import RESEARCH_RESPONSES
+from .filter_options import (
+    get_filter_options,
+    filter_options_etag,
+    filter_options_last_modified,
+)
 from .serializers import (
     ResearchPaperSerializer, 
     AuthorSerializer, 
@@ -16,6 +34,9 @@ from .serializers import (
 )
 import django_filters
 from apps.utils.fields import YearField
+from apps.utils.typeahead import typeahead_search, parse_limit
+from apps.utils.response_cache import AnonymousResponseCacheMixin
+from apps.utils.pagination import wants_keyset
 from rest_framework.throttling import ScopedRateThrottle
 
 # Custom filter for YearField
@@ -36,10 +57,24 @@ class AuthorViewSet(viewsets.ModelViewSet):
             
         return queryset
 
-class KeywordViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """
+        Prefix-first, similarity-ranked author suggestions for autocomplete
+        """
+        authors = typeahead_search(
+            Author.objects.all(),
+            request.query_params.get('q', ''),
+            limit=parse_limit(request.query_params.get('limit')),
+        )
+        serializer = self.get_serializer(authors, many=True)
+        return Response(serializer.data)
+
+class KeywordViewSet(AnonymousResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Keyword.objects.all()
     serializer_class = KeywordSerializer
     permission_classes = [AllowAny]  # Allow anyone to view keywords
+    response_cache_namespace = RESEARCH_RESPONSES
     
     def get_queryset(self):
         queryset = Keyword.objects.all()
@@ -50,6 +85,19 @@ class KeywordViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """
+        Prefix-first, similarity-ranked keyword suggestions for autocomplete
+        """
+        keywords = typeahead_search(
+            Keyword.objects.all(),
+            request.query_params.get('q', ''),
+            limit=parse_limit(request.query_params.get('limit')),
+        )
+        serializer = self.get_serializer(keywords, many=True)
+        return Response(serializer.data)
+
 class KeywordCategoryViewSet(viewsets.ModelViewSet):
     """
     API endpoint that allows keyword categories to be viewed.
@@ -63,11 +111,11 @@ class KeywordCategoryViewSet(viewsets.ModelViewSet):
 # Custom FilterSet for ResearchPaper that handles YearField
 class ResearchPaperFilterSet(FilterSet):
     # Define year filters explicitly
-    year = django_filters.NumberFilter(field_name='publication_year')
-    year_gt = django_filters.NumberFilter(field_name='publication_year', lookup_expr='gt')
-    year_lt = django_filters.NumberFilter(field_name='publication_year', lookup_expr='lt')
-    year_gte = django_filters.NumberFilter(field_name='publication_year', lookup_expr='gte')
-    year_lte = django_filters.NumberFilter(field_name='publication_year', lookup_expr='lte')
+    year = django_filters.NumberFilter(field_name='publication_year_int')
+    year_gt = django_filters.NumberFilter(field_name='publication_year_int', lookup_expr='gt')
+    year_lt = django_filters.NumberFilter(field_name='publication_year_int', lookup_expr='lt')
+    year_gte = django_filters.NumberFilter(field_name='publication_year_int', lookup_expr='gte')
+    year_lte = django_filters.NumberFilter(field_name='publication_year_int', lookup_expr='lte')
     
     class Meta:
         model = ResearchPaper
@@ -77,6 +125,58 @@ class ResearchPaperFilterSet(FilterSet):
             # publication_year is handled by our custom filters above
         }
 
+class PaperOrderingFilter(filters.OrderingFilter):
+    """Skip the default ordering when get_queryset already applied an explicit `sort`"""
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('sort'):
+            return None
+        return super().get_default_ordering(view)
+
+def keyword_paper_ids(keywords, match_all=False):
+    """
+    Subquery of the ids of papers tagged with any of ``keywords`` (exact names)
+    or, with ``match_all``, with every one of them (case-insensitive).
+
+    Keyword ids are resolved first (AND terms through the UPPER(name) index),
+    so the papers come from one GROUP BY over the link table instead of a join
+    per keyword. The terms are upper-cased by Postgres too: Python's
+    str.upper() folds non-ASCII letters differently ('ß' -> 'SS').
+    """
+    links = ResearchPaper.keywords.through.objects
+    if not match_all:
+        return links.filter(keyword__name__in=keywords).values('researchpaper_id')
+
+    keywords = list(keywords)
+    resolved = list(
+        Keyword.objects.annotate(term=Upper('name'))
+        .filter(term__in=[Upper(Value(keyword)) for keyword in keywords])
+        # Distinct terms after folding, counted in the same query
+        .annotate(terms=RawSQL('SELECT COUNT(DISTINCT UPPER(t)) FROM unnest(%s::text[]) AS t', (keywords,)))
+        .values_list('id', 'term', 'terms')
+    )
+    ids_by_term = {}
+    for keyword_id, term, _ in resolved:
+        ids_by_term.setdefault(term, []).append(keyword_id)
+    terms = resolved[0][2] if resolved else 0
+    if not resolved or len(ids_by_term) < terms:
+        return links.none().values('researchpaper_id')
+
+    keyword_ids = [keyword_id for ids in ids_by_term.values() for keyword_id in ids]
+    if len(keyword_ids) == terms:
+        matched = Count('keyword_id', distinct=True)
+    else:
+        # Case variants of one name ('Soil', 'soil') satisfy the same term
+        matched = Count(Case(*[
+            When(keyword_id__in=ids, then=Value(number)) for number, ids in enumerate(ids_by_term.values())
+        ]), distinct=True)
+    return (
+        links.filter(keyword_id__in=keyword_ids)
+        .values('researchpaper_id')
+        .annotate(matched=matched)
+        .filter(matched=terms)
+        .values('researchpaper_id')
+    )
+
 def parse_year_param(year_str):
     """Helper function to safely parse year parameters"""
     if not year_str or year_str == 'undefined' or year_str == 'null':
@@ -90,95 +190,57 @@ def parse_year_param(year_str):
     except (ValueError, TypeError):
         return None
 
+@condition(etag_func=filter_options_etag, last_modified_func=filter_options_last_modified)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def filter_options(request):
     """
     Returns filter options with smart keyword categorization
     """
+    options = get_filter_options(request)['data']
+
     # 1. Methodology types (cleaned)
-    methodology_types = (
-        ResearchPaper.objects
-        .exclude(methodology_type__isnull=True)
-        .exclude(methodology_type__exact="")
-        .exclude(methodology_type__exact="Unknown")
-        .values_list('methodology_type', flat=True)
-        .distinct()
-    )
-    methodology_types = sorted(set(methodology_types))
+    methodology_types = [m for m in options['methodology_types'] if m != "Unknown"]
 
     # 2. Publication years (1900-2025)
-    years_available = (
-        ResearchPaper.objects
-        .exclude(publication_year__isnull=True)
-        .exclude(publication_year__exact="")
-        .values_list('publication_year', flat=True)
-        .distinct()
-    )
-    valid_years = []
-    for year in years_available:
-        try:
-            year_int = int(year)
-            if 1900 <= year_int <= 2025:
-                valid_years.append(year_int)
-        except (ValueError, TypeError):
-            continue
-    valid_years.sort()
-
-    # 3. Get keyword categories with their keywords
-    categories = KeywordCategory.objects.prefetch_related('keywords').all().order_by('name')
-    keyword_categories = []
-    all_categorized_keywords = set()
-    
-    for category in categories:
-        keywords_in_category = []
-        for keyword in category.keywords.all().order_by('name'):
-            keywords_in_category.append({
-                "id": keyword.id,
-                "name": keyword.name
-            })
-            all_categorized_keywords.add(keyword.id)
-        
-        if keywords_in_category:  # Only include categories that have keywords
-            keyword_categories.append({
-                "id": category.id,
-                "name": category.name,
-                "description": category.description,
-                "keywords": keywords_in_category
-            })
-
-    # 4. Get uncategorized keywords
-    uncategorized_keywords = []
-    uncategorized_qs = Keyword.objects.exclude(id__in=all_categorized_keywords).order_by('name')
-    for keyword in uncategorized_qs:
-        uncategorized_keywords.append({
-            "id": keyword.id,
-            "name": keyword.name
-        })
-    
-    # Add uncategorized as a special category if there are any
-    if uncategorized_keywords:
+    valid_years = [year for year in options['years'] if year <= 2025]
+
+    # 3. Keyword categories with their keywords (only categories that have keywords)
+    keyword_categories = [
+        {
+            "id": category['id'],
+            "name": category['name'],
+            "description": category['description'],
+            "keywords": category['keywords'],
+        }
+        for category in options['categories'] if category['keywords']
+    ]
+
+    # 4. Uncategorized keywords as a special category if there are any
+    if options['uncategorized_keywords']:
         keyword_categories.append({
             "id": "uncategorized",
             "name": "Other Keywords",
             "description": "Keywords not assigned to any specific category",
-            "keywords": uncategorized_keywords
+            "keywords": options['uncategorized_keywords']
         })
 
-    return Response({
+    response = Response({
         "methodology_types": methodology_types,
         "year_range": {"min": 1900, "max": 2025},
         "years_available": valid_years,
         "keyword_categories": keyword_categories,
         "stats": {
-            "total_papers": ResearchPaper.objects.count(),
+            "total_papers": options['total_papers'],
             "total_categories": len(keyword_categories),
-            "total_keywords": Keyword.objects.count()
+            "total_keywords": options['total_keywords']
         }
     })
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
     
     
-class ResearchPaperViewSet(viewsets.ModelViewSet):
+class ResearchPaperViewSet(AnonymousResponseCacheMixin, viewsets.ModelViewSet):
     """
     API endpoint for research papers
     """
@@ -186,12 +248,25 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
     queryset = ResearchPaper.objects.all().order_by('-publication_year')
     serializer_class = ResearchPaperSerializer
     permission_classes = [AllowAny]  # Allow anyone to view papers
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    response_cache_namespace = RESEARCH_RESPONSES
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, PaperOrderingFilter]
     filterset_class = ResearchPaperFilterSet  # Use our custom filterset
     search_fields = ['title', 'abstract', 'authors__name', 'keywords__name']
     ordering_fields = ['publication_year', 'title', 'created_at', 'citation_count']  # Changed from publication_date
     ordering = ['-publication_year', '-created_at', 'id']
     lookup_field = 'slug'
+    # Unscoped by default; set per action (see export)
+    throttle_scope = None
+
+    @property
+    def paginator(self):
+        """Page numbers by default; keyset pages (which ignore ?sort=) when opted in"""
+        if not hasattr(self, '_paginator'):
+            if wants_keyset(self.request):
+                self._paginator = PaperKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
 
     def get_queryset(self):
         queryset = ResearchPaper.objects.all().order_by('-publication_year', '-created_at', 'id')
@@ -208,32 +283,14 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
         sort = self.request.query_params.get('sort', None)
         keyword_logic = self.request.query_params.get('keyword_logic', 'or').lower()
 
-        # Arbitrary word matching (OR logic)
-        word_filters = []
-        for word in q + keywords:
-            if word:
-                word_filters.append(
-                    Q(title__icontains=word) |
-                    Q(abstract__icontains=word) |
-                    Q(authors__name__icontains=word) |
-                    Q(keywords__name__icontains=word) |
-                    Q(journal__icontains=word)
-                )
-        if word_filters:
-            combined_filter = word_filters[0]
-            for f in word_filters[1:]:
-                combined_filter |= f
-            queryset = queryset.filter(combined_filter)
-
-        # Implements AND/OR keyword filtering based on keyword_logic param
+        # Arbitrary word matching (OR logic) against the full-text search vector,
+        # ranked by relevance when requested
+        queryset = search_papers(queryset, q + keywords, rank=(sort == 'relevance'))
+
+        # Implements AND/OR keyword filtering based on keyword_logic param:
+        # every keyword (case-insensitive) or any of them (default)
         if keywords:
-            if keyword_logic == 'and':
-                # AND logic: All keywords must be present in each paper
-                for keyword in keywords:
-                    queryset = queryset.filter(keywords__name__iexact=keyword)
-            else:
-                # OR logic: Any keyword can be present (default behavior)
-                queryset = queryset.filter(keywords__name__in=keywords)
+            queryset = queryset.filter(id__in=keyword_paper_ids(keywords, match_all=(keyword_logic == 'and')))
 
         # Authors
         if authors:
@@ -251,9 +308,9 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
 
         # Year filtering
         if year_from is not None:
-            queryset = queryset.filter(publication_year__gte=str(year_from))
+            queryset = queryset.filter(publication_year_int__gte=year_from)
         if year_to is not None:
-            queryset = queryset.filter(publication_year__lte=str(year_to))
+            queryset = queryset.filter(publication_year_int__lte=year_to)
 
         # Journal
         if journal:
@@ -261,10 +318,11 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
 
         # Sorting
         if sort and sort != 'relevance':
+            # Undated papers last when newest first, first when oldest first
             if sort == 'date_newest':
-                queryset = queryset.order_by('-publication_year')
+                queryset = queryset.order_by(F('publication_year_int').desc(nulls_last=True), '-created_at', 'id')
             elif sort == 'date_oldest':
-                queryset = queryset.order_by('publication_year')
+                queryset = queryset.order_by(F('publication_year_int').asc(nulls_first=True), 'created_at', '-id')
             elif sort == 'citations_high':
                 queryset = queryset.order_by('-citation_count')
             elif sort == 'citations_low':
@@ -275,51 +333,108 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
                 queryset = queryset.order_by('-title')
         
         # Ensure distinct results
-        return queryset.distinct()
+        return ResearchPaperSerializer.setup_eager_loading(queryset.distinct())
+
+    def indexed_papers(self):
+        """
+        The papers matching a plain filter request, looked up in the in-process
+        filter index, or None when the request needs get_queryset
+        """
+        params = self.request.query_params
+        if wants_keyset(self.request) or not can_answer(params):
+            return None
+        index = get_filter_index()
+        if index is None:
+            return None
+        try:
+            min_citations, max_citations = (
+                None if params.get(name) is None else int(params[name]) for name in ('min_citations', 'max_citations')
+            )
+        except ValueError:
+            return None
+        positions = index.match(
+            keywords=params.getlist('keyword', []),
+            keyword_logic=params.get('keyword_logic', 'or').lower(),
+            methodology_types=params.getlist('methodology_type', []),
+            year_from=parse_year_param(params.get('year_from')),
+            year_to=parse_year_param(params.get('year_to')),
+            min_citations=min_citations,
+            max_citations=max_citations,
+        )
+        return IndexedPapers(index, positions, ResearchPaperSerializer.setup_eager_loading(ResearchPaper.objects.all()))
+
+    def list(self, request, *args, **kwargs):
+        """Paper list; ?facets=true adds per-facet counts of every paper matching the filters"""
+        papers = self.indexed_papers()
+        if papers is None:
+            response = super().list(request, *args, **kwargs)
+        else:
+            page = self.paginate_queryset(papers)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        if request.query_params.get('facets', '').lower() in ('1', 'true', 'yes'):
+            response.data['facets'] = get_facets(self.filter_queryset(self.get_queryset()), request.query_params)
+        return response
     
     @action(detail=True, methods=['get'])
     def related(self, request, slug=None):
         """
-        Returns papers related to the current paper based on shared keywords
+        Returns papers related to the current paper based on shared keywords,
+        read from the precomputed RelatedPaper table (?limit=, default 5)
         """
-        # Get the current paper
-        paper = self.get_object()
-        
-        # Get the paper's keywords
-        paper_keywords = paper.keywords.all()
-        
-        if not paper_keywords:
-            return Response([])
-        
-        # Find papers with the same keywords, excluding the current paper
-        related_papers = ResearchPaper.objects.filter(
-            keywords__in=paper_keywords
-        ).exclude(
-            id=paper.id
-        ).annotate(
-            # Count the number of matching keywords
-            matching_keywords=Count('keywords', filter=Q(keywords__in=paper_keywords))
-        ).filter(
-            # Ensure at least one keyword matches
-            matching_keywords__gt=0
-        ).order_by(
-            # Order by number of matching keywords (descending) and publication date (descending)
-            '-matching_keywords', '-publication_year'
-        ).distinct()[:5]  # Limit to 5 related papers
+        paper = get_object_or_404(ResearchPaper.objects.only('id'), slug=slug)
+        limit = parse_limit(request.query_params.get('limit'), default=5, maximum=RELATED_PAPERS_TOP_K)
+
+        related_papers = [
+            link.related for link in
+            RelatedPaper.objects.filter(paper=paper, rank__lte=limit).select_related('related').order_by('rank')
+        ]
+        if not related_papers:
+            # Not built yet for this paper (or it has no neighbours): rank it live
+            ranked_ids = [related_id for _, related_id, *_ in rank_related([paper.id], limit)]
+            papers_by_id = ResearchPaper.objects.in_bulk(ranked_ids)
+            related_papers = [papers_by_id[related_id] for related_id in ranked_ids if related_id in papers_by_id]
+        prefetch_related_objects(related_papers, 'authors', 'keywords')
         
         serializer = self.get_serializer(related_papers, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def similar(self, request, slug=None):
+        """
+        Returns papers with similar titles and abstracts from the TF-IDF
+        similarity index (?limit=, default 5), each with its cosine similarity
+        """
+        paper = get_object_or_404(ResearchPaper.objects.only('id', 'title', 'abstract'), slug=slug)
+        limit = parse_limit(request.query_params.get('limit'), default=5, maximum=SIMILAR_PAPERS_MAX_LIMIT)
+
+        matches = similar_papers(paper, limit)
+        if matches is None:
+            return Response(
+                {"error": "Similarity index is not available"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        # The index may still list papers deleted since the last build
+        papers_by_id = ResearchPaperSerializer.setup_eager_loading(ResearchPaper.objects.all()).in_bulk(
+            [paper_id for paper_id, _ in matches]
+        )
+        found = [(papers_by_id[paper_id], score) for paper_id, score in matches if paper_id in papers_by_id]
+        data = self.get_serializer([paper for paper, _ in found], many=True).data
+        for item, (_, score) in zip(data, found):
+            item['similarity'] = round(score, 4)
+        return Response(data)
+    
     @action(detail=False, methods=['get'])
     def popular_keywords(self, request):
         """
         Returns the most popular keywords based on frequency of use in papers
         """
-        limit = int(request.query_params.get('limit', 20))
+        limit = parse_limit(request.query_params.get('limit'), default=20, maximum=100)
         
-        popular_keywords = Keyword.objects.annotate(
-            paper_count=Count('papers')
-        ).order_by('-paper_count')[:limit]
+        # Top-N scan of the research_keyword_popular index on the stored count
+        popular_keywords = Keyword.objects.filter(
+            paper_count__gt=0
+        ).order_by('-paper_count', 'name')[:limit]
         
         serializer = KeywordSerializer(popular_keywords, many=True)
         return Response(serializer.data)
@@ -332,7 +447,7 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
         limit = int(request.query_params.get('limit', 10))
         
         # Get papers with increasing citation trends, sorted by citation count and date
-        trending_papers = ResearchPaper.objects.filter(
+        trending_papers = ResearchPaperSerializer.setup_eager_loading(ResearchPaper.objects.all()).filter(
             citation_trend='increasing'
         ).order_by(
             '-citation_count', '-publication_year'
@@ -341,7 +456,6 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(trending_papers, many=True)
         return Response(serializer.data)
     
-    @transaction.atomic
     @action(detail=False, methods=['post'])
     def bulk_import(self, request):
         papers_data = request.data
@@ -353,20 +467,29 @@ class ResearchPaperViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Process each paper data
-        for paper_data in papers_data:
-            serializer = self.get_serializer(data=paper_data)
-            try:
-                # Validate and save the paper
-                serializer.is_valid(raise_exception=True)
-                serializer.save()
-            except Exception as e:
-                return Response({
-                    'error': str(e),
-                    'data': paper_data
-                }, status=status.HTTP_400_BAD_REQUEST)
-        
-        return Response({"status": "success"}, status=status.HTTP_201_CREATED)
+        # Rows are written in batches; invalid rows are reported, not fatal
+        result = PaperImporter().run(papers_data)
+        data = result.as_dict()
+        if result.status == 'failed':
+            data['error'] = 'None of the papers could be imported'
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        if result.status == 'partial':
+            return Response(data, status=status.HTTP_207_MULTI_STATUS)
+        return Response(data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'], throttle_scope='paper_exports')
+    def export(self, request):
+        """
+        Stream every paper matching the list filters as ?output=csv|ndjson|bibtex.
+        The files can be fed back to bulk imports and ``manage.py import_papers``.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_response(self.filter_queryset(self.get_queryset()), output)
     
 @api_view(['GET'])
 def paper_search(request):
@@ -377,23 +500,26 @@ def paper_search(request):
     
     papers = ResearchPaper.objects.all()
     
-    # Apply text search
+    # Apply full-text search, best matches first
     if query:
-        papers = papers.filter(
-            Q(title__icontains=query) |
-            Q(abstract__icontains=query) |
-            Q(authors__name__icontains=query) |
-            Q(keywords__name__icontains=query)
-        ).distinct()
+        papers = search_papers(papers, [query], rank=True)
     
     # Apply year filtering
     if year_from is not None:
-        papers = papers.filter(publication_year__gte=str(year_from))
+        papers = papers.filter(publication_year_int__gte=year_from)
     if year_to is not None:
-        papers = papers.filter(publication_year__lte=str(year_to))
+        papers = papers.filter(publication_year_int__lte=year_to)
     
-    serializer = ResearchPaperSerializer(papers, many=True)
-    return Response({'papers': serializer.data})
+    # Paginated like the paper list; nested authors/keywords are prefetched per page
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(ResearchPaperSerializer.setup_eager_loading(papers), request)
+    serializer = ResearchPaperSerializer(page, many=True)
+    return Response({
+        'count': paginator.page.paginator.count,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'papers': serializer.data,
+    })
 
 @api_view(['GET'])
 def category_keywords(request, category_id):
@@ -406,55 +532,40 @@ def category_keywords(request, category_id):
     except KeywordCategory.DoesNotExist:
         return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@condition(etag_func=filter_options_etag, last_modified_func=filter_options_last_modified)
 @api_view(['GET'])
 def paper_filter_options(request):
     """Get available filter options for papers"""
     try:
-        # Get unique years from papers
-        papers_qs = ResearchPaper.objects.exclude(publication_year__isnull=True).exclude(publication_year='')
-        years = papers_qs.values_list('publication_year', flat=True).distinct()
-        year_list = []
-        for year in years:
-            try:
-                year_int = int(year)
-                if 1900 <= year_int <= 2100:
-                    year_list.append(year_int)
-            except (ValueError, TypeError):
-                continue
-        year_list.sort()
-        
-        # Get available methodology types
-        methodology_types = papers_qs.exclude(methodology_type__isnull=True).exclude(methodology_type='').values_list('methodology_type', flat=True).distinct()
+        options = get_filter_options(request)['data']
+        year_list = options['years']
         
-        # Get keyword categories with counts (optimized query)
-        categories = KeywordCategory.objects.prefetch_related('keywords').order_by('name')
-        category_data = []
-        for category in categories:
-            category_data.append({
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'keyword_count': category.keywords.count()
-            })
-        
-        # Get total counts for frontend
-        total_papers = papers_qs.count()
-        total_authors = Author.objects.count()
-        total_keywords = Keyword.objects.count()
+        # Keyword categories with counts
+        category_data = [
+            {
+                'id': category['id'],
+                'name': category['name'],
+                'description': category['description'],
+                'keyword_count': len(category['keywords'])
+            }
+            for category in options['categories']
+        ]
         
-        return Response({
+        response = Response({
             'years': year_list,
-            'methodology_types': list(methodology_types),
+            'methodology_types': options['methodology_types'],
             'keyword_categories': category_data,
             'stats': {
-                'total_papers': total_papers,
-                'total_authors': total_authors,
-                'total_keywords': total_keywords,
+                'total_papers': options['total_dated_papers'],
+                'total_authors': options['total_authors'],
+                'total_keywords': options['total_keywords'],
                 'year_range': {
                     'min': min(year_list) if year_list else None,
                     'max': max(year_list) if year_list else None
                 }
             }
         })
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
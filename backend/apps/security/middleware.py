@@ -5,14 +5,26 @@ from django.utils.crypto import constant_time_compare
 from django.conf import settings
 import hmac
 import hashlib
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
+
 class IPSecurityMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
         self.blacklisted_ips = cache.get('blacklisted_ips', set())
+        if settings.CACHE_BACKEND in ('file', 'database') and not settings.DEBUG:
+            logger.warning(
+                'IP rate limiting is approximate with CACHE_BACKEND=%s: its incr is not atomic, so '
+                'concurrent workers lose counts, and culling can drop counters and blacklist entries. '
+                'Set REDIS_URL to use Redis.', settings.CACHE_BACKEND,
+            )
 
     def __call__(self, request):
+        # Re-read the shared blacklist so an IP blocked by one worker is blocked by all
+        self.blacklisted_ips = cache.get('blacklisted_ips', set())
         if request.META.get('REMOTE_ADDR') in self.blacklisted_ips:
             return HttpResponse('Access denied', status=403)
         return self.get_response(request)
@@ -20,17 +32,22 @@ class IPSecurityMiddleware:
     def process_request(self, request):
         ip = request.META.get('REMOTE_ADDR')
         if self._is_suspicious_activity(ip):
-            self.blacklisted_ips.add(ip)
+            # Merge with the shared set rather than overwriting other workers' entries
+            self.blacklisted_ips = cache.get('blacklisted_ips', set()) | {ip}
             cache.set('blacklisted_ips', self.blacklisted_ips, 86400)  # 24 hours
             return HttpResponse('Access denied', status=403)
 
     def _is_suspicious_activity(self, ip):
         cache_key = f'requests_{ip}'
-        requests = cache.get(cache_key, 0)
-        if requests > 100:  # Threshold
-            return True
-        cache.set(cache_key, requests + 1, 60)  # 1 minute window
-        return False
+        # add + incr is atomic on Redis, so every worker's requests count; the
+        # file and database backends emulate incr and may lose concurrent counts
+        cache.add(cache_key, 0, 60)  # 1 minute window
+        try:
+            requests = cache.incr(cache_key)
+        except ValueError:
+            cache.set(cache_key, 1, 60)
+            requests = 1
+        return requests > 101  # Threshold
 
 
 
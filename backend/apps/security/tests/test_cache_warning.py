@@ -0,0 +1,15 @@
+from django.test import SimpleTestCase, override_settings
+from apps.security.middleware import IPSecurityMiddleware
+
+
+class CacheBackendWarningTests(SimpleTestCase):
+    @override_settings(CACHE_BACKEND='file', DEBUG=False)
+    def test_warns_without_an_atomic_cache(self):
+        with self.assertLogs('apps.security.middleware', level='WARNING') as logs:
+            IPSecurityMiddleware(lambda request: None)
+        self.assertIn('CACHE_BACKEND=file', logs.output[0])
+
+    @override_settings(CACHE_BACKEND='redis', DEBUG=False)
+    def test_redis_is_quiet(self):
+        with self.assertNoLogs('apps.security.middleware', level='WARNING'):
+            IPSecurityMiddleware(lambda request: None)
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from resend.exceptions import ResendError
+from apps.utils import mail_outbox
+from apps.utils.email_service import ResendProvider, send_email
+from apps.utils.mail_outbox import LEASE, CircuitBreaker, MailWorker, MessageRejected, claim_due
+from apps.utils.models import OutboundEmail
+
+
+class FakeProvider:
+    """Local stand-in for the mail provider; records every call"""
+    calls = []
+    rejected = set()
+    down = False
+
+    def send_batch(self, messages, idempotency_key):
+        FakeProvider.calls.append(([message['to'][0] for message in messages], idempotency_key))
+        if FakeProvider.down:
+            raise ConnectionError("provider unavailable")
+        if any(message['to'][0] in FakeProvider.rejected for message in messages):
+            raise MessageRejected("422: invalid recipient")
+        return [f"fake-{len(FakeProvider.calls)}-{index}" for index in range(len(messages))]
+
+
+@override_settings(EMAIL_OUTBOX_PROVIDER='apps.users.tests.test_mail_outbox.FakeProvider')
+class MailOutboxTests(TestCase):
+    def setUp(self):
+        FakeProvider.calls, FakeProvider.rejected, FakeProvider.down = [], set(), False
+        self.clock = [0.0]
+        self.breaker = CircuitBreaker(threshold=2, cooldown=60, clock=lambda: self.clock[0])
+        self.worker = MailWorker(threads=2, batch_size=2, breaker=self.breaker)
+        self.addCleanup(self.worker.close)
+
+    def queue(self, *recipients):
+        return [send_email([to], "Hello", "<p>Hi</p>") for to in recipients]
+
+    def test_requests_only_queue_mail(self):
+        response = self.client.post('/api/users/register/', {
+            'username': "outboxer", 'email': "outboxer@example.com",
+            'password': "TestPass123!", 'password2': "TestPass123!",
+        })
+        self.assertEqual(response.status_code, 201)
+        self.client.post('/api/users/contact/', {
+            'name': "Ada", 'email': "ada@example.com", 'subject': "Compost question", 'message': "Hello there, a question about compost.",
+        })
+        self.client.post('/api/users/password/reset/', {'email': "outboxer@example.com"})
+
+        self.assertEqual(FakeProvider.calls, [])
+        queued = {email.subject: email for email in OutboundEmail.objects.all()}
+        self.assertEqual(queued["Welcome to Harvest For Good!"].to, ["outboxer@example.com"])
+        self.assertEqual(queued["Contact Form: Ada"].reply_to, "ada@example.com")
+        self.assertIn("Reset Your Password - Harvest For Good", queued)
+        self.assertTrue(all(email.status == OutboundEmail.PENDING for email in queued.values()))
+
+    def test_mail_of_a_rolled_back_transaction_is_dropped(self):
+        with transaction.atomic():
+            self.queue("gone@example.com")
+            transaction.set_rollback(True)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_worker_sends_in_batches(self):
+        self.queue(*[f"user{i}@example.com" for i in range(5)])
+        self.assertEqual(self.worker.drain_once(), (4, 0))
+        self.assertEqual(self.worker.drain_once(), (1, 0))
+        self.assertEqual([len(recipients) for recipients, _ in FakeProvider.calls], [2, 2, 1])
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists())
+        self.assertFalse(OutboundEmail.objects.filter(provider_id='').exists())
+
+    def test_rejected_batch_is_retried_message_by_message(self):
+        good, bad = self.queue("good@example.com", "bad@example.com")
+        FakeProvider.rejected = {"bad@example.com"}
+        self.assertEqual(self.worker.drain_once(), (1, 1))
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, OutboundEmail.SENT)
+        self.assertEqual((bad.status, bad.attempts), (OutboundEmail.PENDING, 1))
+        self.assertIn("invalid recipient", bad.last_error)
+        # Backed off: not due again yet
+        self.assertGreater(bad.next_attempt_at, timezone.now() + timedelta(seconds=10))
+        self.assertEqual(self.worker.drain_once(), (0, 0))
+
+    def test_outage_fails_the_whole_chunk(self):
+        self.queue("one@example.com", "two@example.com")
+        FakeProvider.down = True
+        self.assertEqual(self.worker.drain_once(), (0, 2))
+        # No per-message retries against a provider that is down
+        self.assertEqual(len(FakeProvider.calls), 1)
+        self.assertEqual(self.breaker.failures, 1)
+
+    def test_rejections_do_not_trip_the_breaker(self):
+        FakeProvider.rejected = {"bad@example.com"}
+        for _ in range(3):
+            self.queue("bad@example.com")
+            self.worker.drain_once()
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_resend_client_errors_are_rejections(self):
+        provider = ResendProvider()
+        message = {"from": "a@example.com", "to": ["b@example.com"], "subject": "Hi", "html": "<p>Hi</p>"}
+        for code, expected in (("422", MessageRejected), ("409", ResendError), ("429", ResendError), ("500", ResendError)):
+            error = ResendError(code=code, error_type="error", message="nope", suggested_action="")
+            with mock.patch('resend.Emails.send', side_effect=error):
+                with self.assertRaises(expected) as raised:
+                    provider.send_batch([message], "key")
+            if expected is ResendError:
+                self.assertNotIsInstance(raised.exception, MessageRejected)
+
+    def test_gives_up_after_max_attempts(self):
+        email, = self.queue("bad@example.com")
+        FakeProvider.rejected = {"bad@example.com"}
+        OutboundEmail.objects.filter(pk=email.pk).update(attempts=mail_outbox.MAX_ATTEMPTS - 1)
+        self.worker.drain_once()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.FAILED, mail_outbox.MAX_ATTEMPTS))
+
+    def test_circuit_breaker_pauses_a_failing_provider(self):
+        FakeProvider.down = True
+        for _ in range(2):
+            self.queue("someone@example.com")
+            self.worker.drain_once()
+            # Make the backed-off mail due again
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertFalse(self.breaker.allow())
+        calls = len(FakeProvider.calls)
+        self.assertEqual(self.worker.drain_once(), (0, 0))
+        self.assertEqual(len(FakeProvider.calls), calls)
+
+        # After the cooldown a single batch probes the provider
+        self.clock[0] += 60
+        FakeProvider.down = False
+        self.assertEqual(self.worker.drain_once(), (2, 0))
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.half_open)
+
+    def test_claimed_mail_is_leased(self):
+        self.queue("one@example.com", "two@example.com")
+        chunk, = claim_due(10)
+        self.assertEqual(len(chunk), 2)
+        self.assertEqual(claim_due(10), [])
+        OutboundEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([email.attempts for email in claim_due(10)[0]], [2, 2])
+
+    def test_retried_request_reuses_its_key(self):
+        self.queue("one@example.com", "two@example.com", "three@example.com")
+        # A worker claims a chunk, may have sent it, and dies
+        first, = claim_due(10, batch_size=3)
+        key = first[0].idempotency_key
+        self.assertTrue(key)
+        self.queue("four@example.com")
+        # The lease of one row runs out first; it brings the rest of its request
+        OutboundEmail.objects.filter(pk=first[1].pk).update(next_attempt_at=timezone.now())
+        OutboundEmail.objects.filter(to=["four@example.com"]).update(next_attempt_at=timezone.now() + LEASE)
+        self.assertEqual(self.worker.drain_once(), (3, 0))
+        self.assertEqual(FakeProvider.calls, [(["one@example.com", "two@example.com", "three@example.com"], key)])
+
+    def test_outage_keeps_the_key_for_the_retry(self):
+        self.queue("one@example.com", "two@example.com")
+        FakeProvider.down = True
+        self.worker.drain_once()
+        FakeProvider.down = False
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.worker.drain_once()
+        (_, failed_key), (recipients, retried_key) = FakeProvider.calls
+        self.assertEqual(retried_key, failed_key)
+        self.assertEqual(recipients, ["one@example.com", "two@example.com"])
+
+    def test_split_chunk_keys(self):
+        good, bad = self.queue("good@example.com", "bad@example.com")
+        FakeProvider.rejected = {"bad@example.com"}
+        self.worker.drain_once()
+        (_, key), (_, good_key), (_, bad_key) = FakeProvider.calls
+        self.assertEqual((good_key, bad_key), (f"{key}-{good.pk}", f"{key}-{bad.pk}"))
+        bad.refresh_from_db()
+        # Nothing was sent, so the next attempt is a new request
+        self.assertEqual(bad.idempotency_key, "")
+
+    def test_run_mail_worker_once(self):
+        self.queue("cmd@example.com")
+        out = StringIO()
+        # close_old_connections would drop the test case's connection
+        with mock.patch('apps.utils.management.commands.run_mail_worker.close_old_connections'):
+            call_command('run_mail_worker', '--once', stdout=out)
+        self.assertIn("1 sent, 0 failed", out.getvalue())
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.SENT)
@@ -6,7 +6,6 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -16,7 +15,8 @@ from django.contrib.auth.tokens import default_token_generator
 from rest_framework.views import APIView
 import os
 from django.core.mail import send_mail
-from apps.utils.email_service import send_contact_form_email, send_password_reset_email, send_welcome_email
+from django.db import transaction
+from apps.utils import email_service
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
@@ -33,14 +33,17 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
     def perform_create(self, serializer):
-        user = serializer.save()
-        self.send_verification_email(user)  # Re-enabled welcome email
+        # The user and the queued welcome email are committed together
+        with transaction.atomic():
+            user = serializer.save()
+            self.send_verification_email(user)  # Re-enabled welcome email
         return user
 
     def send_verification_email(self, user):
-        """Send welcome email using Resend HTTP API"""
+        """Queue the welcome email in the outbox"""
         try:
-            send_welcome_email(email=user.email, username=user.username)
+            with transaction.atomic():
+                email_service.send_welcome_email(email=user.email, username=user.username)
         except Exception as e:
             # Log but don't fail registration if email fails
             import logging
@@ -77,10 +80,10 @@ def contact(request):
         logger = logging.getLogger(__name__)
         logger.info(f"Contact request from {name} <{email}>: {message[:100]}")  # Log first 100 chars of message
         
-        # Send email to site admins using Resend HTTP API
+        # Queue the email to site admins; the mail worker sends it
         try:
-            send_contact_form_email(name=name, email=email, message=message)
-            logger.info(f"Contact email sent successfully via Resend")
+            email_service.send_contact_form_email(name=name, email=email, message=message)
+            logger.info(f"Contact email queued")
 
         except Exception as email_error:
             logger.error(f"Error sending contact email: {str(email_error)}")
@@ -133,10 +136,10 @@ def password_reset_request(request):
             # Log for debugging (remove in production)
             logger.info(f"Generated reset link: {reset_link}")
             
-            # Send password reset email using Resend HTTP API
+            # Queue the password reset email; the mail worker sends it
             try:
-                send_password_reset_email(email=email, reset_link=reset_link)
-                logger.info(f"Password reset email sent successfully to {email} via Resend")
+                email_service.send_password_reset_email(email=email, reset_link=reset_link)
+                logger.info(f"Password reset email queued for {email}")
                 
             except Exception as email_error:
                 logger.error(f"Email sending error for {email}: {str(email_error)}")
@@ -236,9 +239,7 @@ def resend_verification_email(request):
             'uid': urlsafe_base64_encode(force_bytes(user.pk)),
             'token': email_verification_token.make_token(user),
         })
-        email = EmailMessage(mail_subject, message, to=[user.email])
-        email.content_subtype = "html"  # Set content type to html
-        email.send()
+        email_service.send_email(to_emails=[user.email], subject=mail_subject, html_content=message)
         return Response(
             {'message': 'Verification email has been resent.'},
             status=status.HTTP_200_OK
@@ -293,22 +294,12 @@ def send_welcome_email(request):
             'token': token,
         })
         
-        email_message = EmailMessage(mail_subject, message, to=[email])
-        email_message.content_subtype = "html"
-        
-        # Try sending the email and capture the result
-        send_result = email_message.send()
-        
-        if send_result > 0:
-            return Response(
-                {'message': 'Welcome email has been sent successfully.'},
-                status=status.HTTP_200_OK
-            )
-        else:
-            return Response(
-                {'error': 'Failed to send welcome email. Email system returned 0.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Queued in the outbox; the mail worker sends it
+        email_service.send_email(to_emails=[email], subject=mail_subject, html_content=message)
+        return Response(
+            {'message': 'Welcome email has been sent successfully.'},
+            status=status.HTTP_200_OK
+        )
     except User.DoesNotExist:
         return Response(
             {'error': 'User with this email does not exist.'},
@@ -0,0 +1,93 @@
+"""
+Helpers for the ``benchmark_*`` management commands.
+
+Benchmarks seed synthetic rows inside a transaction that is rolled back at the
+end, so they can be pointed at a development database without leaving data
+behind.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+_SYLLABLES = [
+    'ag', 'ro', 'fo', 'res', 'try', 'soil', 'crop', 'ma', 'ize', 'rice', 'wa',
+    'ter', 'har', 'vest', 'eco', 'lo', 'gy', 'seed', 'bio', 'char', 'nu', 'tri',
+    'ent', 'graz', 'ing', 'till', 'age', 'pol', 'len', 'ca', 'tion', 'yield',
+    'bar', 'ley', 'whe', 'at', 'mil', 'let', 'sor', 'ghum', 'cas', 'sa', 'va',
+    'mul', 'ch', 'com', 'post', 'nit', 'gen', 'phos', 'pho', 'rus', 'kel',
+    'vin', 'drou', 'ght', 'flo', 'od', 'pest', 'weed', 'myc', 'or', 'rhiz', 'zy',
+    'quin', 'oa', 'ex', 'ten', 'sion', 'lab', 'our', 'mar', 'ket', 'co', 'op',
+]
+
+
+def synthetic_names(count, seed=0, words=(1, 3)):
+    """Deterministic pseudo-words, unique per call, for seeding name columns"""
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        parts = []
+        for _ in range(rng.randint(*words)):
+            parts.append(''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+        name = ' '.join(parts)
+        if name not in seen:
+            seen.add(name)
+            yield name
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_call(func, *args, **kwargs):
+    """Run ``func`` and return (elapsed milliseconds, result)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def summarize(samples):
+    """p50/p95/p99/max summary (milliseconds) of timing samples"""
+    return {
+        'n': len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples) if samples else 0.0,
+    }
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base class for benchmark commands.
+
+    Subclasses implement ``run_benchmark(**options)``; all writes it performs
+    are rolled back unless ``--keep`` is passed.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic data')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded data instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run_benchmark(**options)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def run_benchmark(self, **options):
+        raise NotImplementedError
+
+    def report(self, label, samples):
+        stats = summarize(samples)
+        self.stdout.write(
+            f"{label:<32} n={stats['n']:<5} p50={stats['p50']:8.2f}ms "
+            f"p95={stats['p95']:8.2f}ms p99={stats['p99']:8.2f}ms max={stats['max']:8.2f}ms"
+        )
+        return stats
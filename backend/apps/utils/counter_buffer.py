@@ -0,0 +1,181 @@
+"""
+Write-behind buffer for hot counter columns.
+
+``buffer_increment`` adds to a per-row counter in the shared cache instead of
+updating the row, so a popular post no longer turns every like or view into a
+write on the same database row. ``flush_counters`` moves the buffered deltas
+into the database, one ``UPDATE ... SET x = x + delta`` per model and field,
+either from a background thread started at most once per
+``COUNTER_FLUSH_INTERVAL`` or from ``manage.py flush_counters --loop``.
+
+The deltas live in Redis, shared by all workers, so a worker restart loses
+nothing; losing Redis itself loses at most the increments of the last interval
+or two. Buffering is only on when settings.COUNTER_WRITE_BEHIND is, which by
+default needs ``CACHE_BACKEND=redis``: the file and database backends emulate
+``incr`` with a read and a write, and they and locmem cull entries when full,
+so pending deltas could vanish. Views have no source rows that
+``reconcile_counters`` could recount them from. Without write-behind,
+``buffer_increment`` updates the row directly with ``adjust_counters`` and the
+readers add nothing.
+
+To find the counters to flush without scanning keys, the first increment of a
+counter in each time slot appends its key to that slot's list. A flush reads
+the lists of the slots that are complete (leaving the previous slot to writers
+with a lagging clock), subtracts what it read from each counter and applies it.
+
+Readers combine the stored value with the pending delta via ``pending_deltas``
+or ``apply_pending``.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .counters import adjust_counters
+
+logger = logging.getLogger(__name__)
+
+# Pending counters expire if left untouched this long (their delta is lost)
+COUNTER_TIMEOUT = 60 * 60 * 24 * 7
+# Slot lists are kept this long; a flusher that is down longer loses them
+SLOT_TIMEOUT = 60 * 60 * 24
+
+_PREFIX = 'counters'
+_LOCK_KEY = f'{_PREFIX}:flush-lock'
+_FLUSHED_KEY = f'{_PREFIX}:flushed-slot'
+_DUE_KEY = f'{_PREFIX}:flush-due'
+
+
+def _counter_key(model, field, pk):
+    return f'{_PREFIX}:{model._meta.label_lower}:{field}:{pk}'
+
+
+def _parse_counter_key(key):
+    _, label, field, pk = key.split(':')
+    return apps.get_model(label), field, int(pk)
+
+
+def _slot(now=None):
+    return int((now if now is not None else time.time()) // settings.COUNTER_FLUSH_INTERVAL)
+
+
+def _incr(key, delta, timeout):
+    """cache.incr that creates a missing key"""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout=timeout):
+            return delta
+        return cache.incr(key, delta)
+
+
+def buffer_increment(model, field, pk, delta=1):
+    """
+    Add ``delta`` to ``field`` of row ``pk`` of ``model`` at the next flush.
+    Returns False if write-behind is off and the row was updated directly.
+    """
+    if not settings.COUNTER_WRITE_BEHIND:
+        adjust_counters(model, field, {pk: delta})
+        return False
+    key = _counter_key(model, field, pk)
+    _incr(key, delta, COUNTER_TIMEOUT)
+
+    slot = _slot()
+    if cache.add(f'{_PREFIX}:slot:{slot}:marked:{key}', 1, timeout=SLOT_TIMEOUT):
+        position = _incr(f'{_PREFIX}:slot:{slot}:size', 1, SLOT_TIMEOUT)
+        cache.set(f'{_PREFIX}:slot:{slot}:{position}', key, timeout=SLOT_TIMEOUT)
+
+    if settings.COUNTER_BACKGROUND_FLUSH and cache.add(_DUE_KEY, 1, timeout=settings.COUNTER_FLUSH_INTERVAL):
+        threading.Thread(target=_flush_in_background, daemon=True).start()
+    return True
+
+
+def pending_deltas(model, field, pks):
+    """{pk: buffered delta} for the rows of ``pks`` that have one"""
+    if not settings.COUNTER_WRITE_BEHIND:
+        return {}
+    keys = {_counter_key(model, field, pk): pk for pk in pks}
+    return {keys[key]: value for key, value in cache.get_many(list(keys)).items() if value}
+
+
+def apply_pending(objects, fields):
+    """Add the buffered deltas of ``fields`` to model instances in place, with one cache read"""
+    objects = [obj for obj in objects if obj is not None]
+    if not objects or not settings.COUNTER_WRITE_BEHIND:
+        return objects
+    keys = {
+        _counter_key(type(obj), field, obj.pk): (obj, field)
+        for obj in objects for field in fields
+    }
+    for key, value in cache.get_many(list(keys)).items():
+        obj, field = keys[key]
+        setattr(obj, field, getattr(obj, field) + value)
+    return objects
+
+
+def _dirty_keys(first, last):
+    """Counter keys listed in slots ``first``..``last``"""
+    size_keys = {f'{_PREFIX}:slot:{slot}:size': slot for slot in range(first, last + 1)}
+    position_keys = [
+        f'{_PREFIX}:slot:{size_keys[key]}:{position}'
+        for key, size in cache.get_many(list(size_keys)).items()
+        for position in range(1, size + 1)
+    ]
+    return set(cache.get_many(position_keys).values())
+
+
+def flush_counters(include_recent=False):
+    """
+    Apply buffered deltas to the database; returns the number of counters written.
+
+    ``include_recent`` also flushes the current and previous slot, e.g. before
+    a shutdown or in tests.
+    """
+    if not cache.add(_LOCK_KEY, 1, timeout=300):
+        return 0
+    try:
+        current = _slot()
+        last = current + 1 if include_recent else current - 2
+        # Slots older than SLOT_TIMEOUT have expired anyway
+        first = current - SLOT_TIMEOUT // settings.COUNTER_FLUSH_INTERVAL
+        flushed = cache.get(_FLUSHED_KEY)
+        if flushed is not None:
+            first = max(first, flushed + 1)
+        keys = _dirty_keys(first, last)
+
+        taken = {key: value for key, value in cache.get_many(list(keys)).items() if value}
+        for key, value in taken.items():
+            _incr(key, -value, COUNTER_TIMEOUT)
+        deltas = defaultdict(dict)
+        for key, value in taken.items():
+            model, field, pk = _parse_counter_key(key)
+            deltas[model, field][pk] = value
+        try:
+            with transaction.atomic():
+                for (model, field), changes in deltas.items():
+                    adjust_counters(model, field, changes)
+        except Exception:
+            # Put the deltas back for the next flush
+            for key, value in taken.items():
+                _incr(key, value, COUNTER_TIMEOUT)
+            raise
+
+        if not include_recent:
+            cache.set(_FLUSHED_KEY, last, timeout=SLOT_TIMEOUT)
+        return len(taken)
+    finally:
+        cache.delete(_LOCK_KEY)
+
+
+def _flush_in_background():
+    try:
+        flush_counters()
+    except Exception:
+        logger.exception('Flushing buffered counters failed')
+    finally:
+        connection.close()
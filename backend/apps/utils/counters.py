@@ -0,0 +1,52 @@
+"""
+Helpers for denormalised counter columns.
+
+Counters are changed with ``F()`` expressions so concurrent writers never
+overwrite each other's increments, and inside the caller's transaction so a
+rolled back write also rolls back its count. ``reconcile_counter`` recomputes
+a column from the source rows to repair drift left by writes that bypass the
+signals (raw SQL, ``bulk_create`` of through rows, manual fixes).
+"""
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+
+def adjust_counters(model, field, deltas):
+    """Add ``{pk: delta}`` to ``field`` of ``model`` in one UPDATE; returns rows changed"""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    if len(set(deltas.values())) == 1:
+        increment = Value(next(iter(deltas.values())))
+    else:
+        increment = Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+    return model.objects.filter(pk__in=list(deltas)).update(**{field: F(field) + increment})
+
+
+def counted(queryset, field):
+    """Correlated subquery counting the rows of ``queryset`` whose ``field`` is the outer pk"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        ),
+        0,
+    )
+
+
+def reconcile_counter(model, field, actual, dry_run=False):
+    """
+    Reset ``field`` of every ``model`` row that disagrees with the ``actual``
+    expression (usually built with ``counted``). Returns the number of rows
+    that had drifted.
+    """
+    drifted = model.objects.annotate(actual_count=actual).exclude(**{field: F('actual_count')})
+    if dry_run:
+        return drifted.count()
+    return model.objects.filter(pk__in=drifted.values('pk')).update(**{field: actual})
@@ -1,26 +1,56 @@
 """
-Email service using Resend HTTP API for reliable, non-blocking email delivery.
-This replaces Django's SMTP backend to avoid timeout issues on Railway.
+Transactional email, sent through the Resend HTTP API.
+
+The ``send_*`` helpers do not talk to Resend themselves: they add the message
+to the outbox (``apps.utils.mail_outbox``) in the caller's transaction and
+return the ``OutboundEmail``. ``manage.py run_mail_worker`` delivers it with
+``ResendProvider``, so a slow provider never holds up a request.
 """
 import os
 import logging
 import resend
 from typing import List, Optional
 
+from .mail_outbox import MessageRejected, queue_email
+from .models import OutboundEmail
+
 logger = logging.getLogger(__name__)
 
 # Initialize Resend with API key from environment
 resend.api_key = os.getenv('RESEND_API_KEY', os.getenv('EMAIL_HOST_PASSWORD'))
 
+
+class ResendProvider:
+    """Outbox provider for the Resend API: one request per batch of up to 100 emails"""
+
+    # 4xx responses that are about the account, the rate or a request with the
+    # same idempotency key still in flight, not the messages
+    PROVIDER_ERRORS = {401, 403, 409, 429}
+
+    def send_batch(self, messages: List[dict], idempotency_key: str) -> List[str]:
+        # The key makes a retry after a lost response a no-op on Resend's side
+        try:
+            if len(messages) == 1:
+                response = resend.Emails.send(messages[0], {'idempotency_key': idempotency_key})
+                return [response['id']]
+            response = resend.Batch.send(messages, {'idempotency_key': idempotency_key})
+        except resend.exceptions.ResendError as error:
+            code = int(error.code) if str(error.code).isdigit() else None
+            if code and 400 <= code < 500 and code not in self.PROVIDER_ERRORS:
+                raise MessageRejected(f'{code}: {error.message}') from error
+            raise
+        return [email['id'] for email in response['data']]
+
+
 def send_email(
     to_emails: List[str],
     subject: str,
     html_content: str,
     from_email: Optional[str] = None,
     reply_to: Optional[str] = None
-) -> dict:
+) -> OutboundEmail:
     """
-    Send email using Resend HTTP API.
+    Queue an email for delivery via the Resend HTTP API.
     
     Args:
         to_emails: List of recipient email addresses
@@ -30,38 +60,17 @@ def send_email(
         reply_to: Reply-to email address
         
     Returns:
-        dict: Response from Resend API with 'id' if successful
-        
-    Raises:
-        Exception: If email fails to send
+        OutboundEmail: The queued outbox row
     """
     if not from_email:
         from_email = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@harvestforgood.org')
     
-    try:
-        params = {
-            "from": from_email,
-            "to": to_emails,
-            "subject": subject,
-            "html": html_content,
-        }
-        
-        if reply_to:
-            params["reply_to"] = reply_to
-        
-        logger.info(f"Sending email via Resend API to {to_emails}")
-        response = resend.Emails.send(params)
-        logger.info(f"Email sent successfully: {response}")
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Failed to send email via Resend: {e}")
-        raise
+    logger.info(f"Queueing email to {to_emails}")
+    return queue_email(to_emails, subject, html_content, from_email=from_email, reply_to=reply_to)
 
 
-def send_contact_form_email(name: str, email: str, message: str) -> dict:
-    """Send contact form submission to admins."""
+def send_contact_form_email(name: str, email: str, message: str) -> OutboundEmail:
+    """Queue the contact form submission to admins."""
     admin_email = os.getenv('ADMIN_EMAIL', 'contact@harvestforgood.org')
     
     html_content = f"""
@@ -83,8 +92,8 @@ def send_contact_form_email(name: str, email: str, message: str) -> dict:
     )
 
 
-def send_password_reset_email(email: str, reset_link: str) -> dict:
-    """Send password reset email to user."""
+def send_password_reset_email(email: str, reset_link: str) -> OutboundEmail:
+    """Queue the password reset email to a user."""
     html_content = f"""
     <html>
         <body>
@@ -105,8 +114,8 @@ def send_password_reset_email(email: str, reset_link: str) -> dict:
     )
 
 
-def send_welcome_email(email: str, username: str) -> dict:
-    """Send welcome email to newly registered user."""
+def send_welcome_email(email: str, username: str) -> OutboundEmail:
+    """Queue the welcome email to a newly registered user."""
     html_content = f"""
     <html>
         <body>
@@ -0,0 +1,246 @@
+"""
+Durable outbox for transactional email.
+
+``queue_email`` only inserts an ``OutboundEmail`` row, in the caller's
+transaction: requests no longer wait on the mail provider, and the mail of a
+request that rolls back is never sent. ``manage.py run_mail_worker`` drains the
+outbox with a ``MailWorker``:
+
+* ``claim_due`` takes due rows with ``FOR UPDATE SKIP LOCKED`` and leases them
+  by moving ``next_attempt_at`` ``LEASE`` ahead, so concurrent workers never
+  share a row and the rows of a crashed worker come due again;
+* the claimed rows are sent in chunks of up to ``BATCH_SIZE`` through the
+  provider's batch call, from a thread pool. Each chunk gets an idempotency
+  key, stored on its rows before the call. A row that may have been delivered
+  keeps the key, and a retry claims every pending row holding it and repeats
+  the same request under the same key, so the provider drops the duplicate
+  after a crash, an expired lease or a lost response. The threads only talk
+  to the provider; the database is updated from the calling thread;
+* a chunk the provider rejects for its content (``MessageRejected``) is
+  retried one message at a time, so one bad address cannot hold back the
+  rest; any other error fails the whole chunk, so a provider that is down gets
+  one call per chunk;
+* a failed message is retried with exponential backoff and jitter, and marked
+  failed after ``MAX_ATTEMPTS``;
+* a ``CircuitBreaker`` stops calling a provider that keeps failing until its
+  cooldown has passed, then lets a single chunk probe it.
+
+Providers have a ``send_batch(messages, idempotency_key)`` method returning
+one provider id per message, or raising: ``MessageRejected`` when the request
+itself was refused (a 4xx such as a validation error), anything else when the
+provider could not be reached or failed. ``settings.EMAIL_OUTBOX_PROVIDER``
+names the class.
+"""
+import logging
+import random
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Messages per provider call (Resend accepts up to 100 per batch)
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+# Retry delays double from BACKOFF_BASE up to BACKOFF_MAX seconds
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+# How long a claimed message stays invisible to other workers
+LEASE = timedelta(minutes=5)
+
+
+class MessageRejected(Exception):
+    """The provider refused a message or batch because of its content"""
+
+
+def queue_email(to, subject, html, from_email, reply_to=''):
+    """Add an email to the outbox; it is sent once the current transaction commits"""
+    return OutboundEmail.objects.create(
+        to=list(to), subject=subject, html=html, from_email=from_email, reply_to=reply_to or '',
+    )
+
+
+def message_params(email):
+    """Provider payload of an ``OutboundEmail``"""
+    params = {'from': email.from_email, 'to': email.to, 'subject': email.subject, 'html': email.html}
+    if email.reply_to:
+        params['reply_to'] = email.reply_to
+    return params
+
+
+def backoff(attempts):
+    """Delay before retry number ``attempts``, with jitter so retries spread out"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim_due(limit, batch_size=BATCH_SIZE):
+    """
+    Lease up to ``limit`` due messages to this worker, oldest first, as chunks
+    to send with one provider call each. A due message that was part of an
+    earlier request brings the other pending messages of that request; new
+    messages are chunked and given a key, saved before anything is sent.
+    """
+    now = timezone.now()
+    pending = OutboundEmail.objects.select_for_update(skip_locked=True).filter(status=OutboundEmail.PENDING)
+    with transaction.atomic():
+        due = list(
+            pending.filter(next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', 'idempotency_key')[:limit]
+        )
+        ids = {pk for pk, _ in due}
+        keys = {key for _, key in due if key}
+        if keys:
+            ids.update(pending.filter(idempotency_key__in=keys).values_list('id', flat=True))
+        OutboundEmail.objects.filter(id__in=ids).update(attempts=F('attempts') + 1, next_attempt_at=now + LEASE)
+
+        requests, fresh = defaultdict(list), []
+        for email in OutboundEmail.objects.filter(id__in=ids).order_by('id'):
+            if email.idempotency_key:
+                requests[email.idempotency_key].append(email)
+            else:
+                fresh.append(email)
+        chunks = list(requests.values())
+        for start in range(0, len(fresh), batch_size):
+            chunk = fresh[start:start + batch_size]
+            key = f'outbox-{uuid.uuid4().hex}'
+            for email in chunk:
+                email.idempotency_key = key
+            chunks.append(chunk)
+        OutboundEmail.objects.bulk_update(fresh, ['idempotency_key'])
+    return chunks
+
+
+def load_provider():
+    return import_string(settings.EMAIL_OUTBOX_PROVIDER)()
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failed rounds. Once ``cooldown``
+    seconds have passed it is half-open: one probe is let through, and closes
+    it on success or opens it again on failure.
+    """
+
+    def __init__(self, threshold=5, cooldown=60, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def half_open(self):
+        return self.opened_at is not None and self.clock() - self.opened_at >= self.cooldown
+
+    def allow(self):
+        return self.opened_at is None or self.half_open
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.half_open or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning('Mail provider failing, pausing delivery for %ss', self.cooldown)
+            self.opened_at = self.clock()
+
+
+class MailWorker:
+    """Delivers due outbox messages through a provider from a thread pool"""
+
+    def __init__(self, provider=None, threads=4, batch_size=BATCH_SIZE, breaker=None):
+        self.provider = provider or load_provider()
+        self.threads = threads
+        self.batch_size = batch_size
+        self.breaker = breaker or CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='mail')
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def deliver(self, chunk):
+        """
+        [(email, provider id or None, error or None)]; runs in a pool thread.
+        Leaves on each email the key a retry must reuse, or '' if nothing was sent.
+        """
+        key = chunk[0].idempotency_key
+        try:
+            return list(zip(chunk, self.send(chunk, key), [None] * len(chunk)))
+        except MessageRejected as error:
+            if len(chunk) == 1:
+                chunk[0].idempotency_key = ''
+                return [(chunk[0], None, error)]
+        except Exception as error:  # noqa: BLE001 - the provider failed, retry the chunk later
+            return [(email, None, error) for email in chunk]
+        # Find the messages that were rejected, each under a key derived from the chunk's
+        results = []
+        for position, email in enumerate(chunk):
+            email.idempotency_key = f'{key}-{email.id}'
+            try:
+                results.append((email, self.send([email], email.idempotency_key)[0], None))
+            except MessageRejected as error:
+                email.idempotency_key = ''
+                results.append((email, None, error))
+            except Exception as error:  # noqa: BLE001
+                for untried in chunk[position + 1:]:
+                    untried.idempotency_key = ''
+                return results + [(email, None, error) for email in chunk[position:]]
+        return results
+
+    def send(self, emails, idempotency_key):
+        return self.provider.send_batch([message_params(email) for email in emails], idempotency_key)
+
+    def drain_once(self):
+        """Send one round of due messages; returns (sent, failed) counts"""
+        if not self.breaker.allow():
+            return 0, 0
+        chunks = 1 if self.breaker.half_open else self.threads
+        chunks = claim_due(chunks * self.batch_size, self.batch_size)
+        if not chunks:
+            return 0, 0
+
+        futures = [self.executor.submit(self.deliver, chunk) for chunk in chunks]
+        now = timezone.now()
+        delivered, undelivered = [], []
+        # The provider answered, even if only to reject messages
+        reachable = False
+        for future in futures:
+            for email, provider_id, error in future.result():
+                reachable = reachable or error is None or isinstance(error, MessageRejected)
+                if error is None:
+                    email.status, email.provider_id, email.sent_at, email.last_error = (
+                        OutboundEmail.SENT, provider_id or '', now, ''
+                    )
+                    delivered.append(email)
+                else:
+                    email.last_error = f'{type(error).__name__}: {error}'[:2000]
+                    if email.attempts >= MAX_ATTEMPTS:
+                        email.status = OutboundEmail.FAILED
+                        logger.error('Giving up on outbox email %s: %s', email.id, email.last_error)
+                    else:
+                        email.next_attempt_at = now + backoff(email.attempts)
+                    undelivered.append(email)
+        OutboundEmail.objects.bulk_update(
+            delivered + undelivered,
+            ['status', 'provider_id', 'sent_at', 'last_error', 'next_attempt_at', 'idempotency_key'],
+        )
+
+        if reachable:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return len(delivered), len(undelivered)
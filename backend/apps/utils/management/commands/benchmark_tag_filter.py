@@ -0,0 +1,76 @@
+import random
+
+from django.db import connection
+from django.db.models import Count
+
+from apps.forum.cooccurrence import posts_with_all_tags, rebuild_cooccurrence, related_tags
+from apps.forum.models import ForumPost, ForumPostTag, ForumTag
+from apps.utils.benchmark import BenchmarkCommand, time_call
+
+
+def join_per_tag(names):
+    """The previous AND filter: one join per tag, then DISTINCT"""
+    queryset = ForumPost.objects.all()
+    for name in names:
+        queryset = queryset.filter(tags__name=name)
+    return queryset.distinct().order_by('-pinned', '-created_at')
+
+
+def group_by_having(names):
+    return ForumPost.objects.filter(id__in=posts_with_all_tags(names)).order_by('-pinned', '-created_at')
+
+
+def live_related_tags(names, limit):
+    """Related tags computed from the links of the matching posts instead of the matrix"""
+    return list(
+        ForumPostTag.objects.filter(post__in=group_by_having(names).values('id'))
+        .exclude(tag__name__in=names)
+        .values('tag_id', 'tag__name')
+        .annotate(shared=Count('post_id'))
+        .order_by('-shared', 'tag__name')[:limit]
+    )
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark the forum tag AND filter (join per tag vs GROUP BY/HAVING) and related tags'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--posts', type=int, default=100000, help='Synthetic forum posts')
+        parser.add_argument('--tags', type=int, default=500, help='Synthetic tags')
+        parser.add_argument('--queries', type=int, default=50, help='Lookups per strategy and tag count')
+
+    def run_benchmark(self, posts, tags, queries, seed, **options):
+        rng = random.Random(seed)
+        self.stdout.write(f'Seeding {posts} posts over {tags} tags...')
+        tag_rows = ForumTag.objects.bulk_create([ForumTag(name=f'bench-tag-{index}') for index in range(tags)])
+        # Skewed popularity, like real tags: low indexes are used far more often
+        weights = [1 / (rank + 1) for rank in range(tags)]
+        post_rows = ForumPost.objects.bulk_create([
+            ForumPost(title=f'Benchmark post {index}', content='Synthetic forum post body.')
+            for index in range(posts)
+        ], batch_size=5000)
+        links = []
+        for post in post_rows:
+            chosen = set(rng.choices(range(tags), weights=weights, k=rng.randint(2, 5)))
+            links.extend(ForumPostTag(post_id=post.id, tag_id=tag_rows[index].id) for index in chosen)
+        ForumPostTag.objects.bulk_create(links, batch_size=10000)
+        _, pairs = time_call(rebuild_cooccurrence)
+        with connection.cursor() as cursor:
+            for model in (ForumPost, ForumTag, ForumPostTag):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+            cursor.execute('ANALYZE forum_tag_pair')
+        self.stdout.write(f'{len(links)} post/tag links, {pairs} co-occurring tag pairs')
+
+        popular = [tag.name for tag in tag_rows[:20]]
+        for size in (1, 2, 3):
+            sets = [rng.sample(popular, size) for _ in range(queries)]
+            for label, build in (('join per tag', join_per_tag), ('group by/having', group_by_having)):
+                page = [time_call(lambda names=names: list(build(names)[:10]))[0] for names in sets]
+                total = [time_call(lambda names=names: build(names).count())[0] for names in sets]
+                self.report(f'{size} tag(s) {label} page', page)
+                self.report(f'{size} tag(s) {label} count', total)
+            # related_tags reads the matrix for one tag and the links for more
+            for label, fetch in (('live', live_related_tags), ('related_tags', related_tags)):
+                samples = [time_call(fetch, names, 10)[0] for names in sets]
+                self.report(f'{size} tag(s) related {label}', samples)
@@ -0,0 +1,61 @@
+import random
+
+from django.db import connection
+
+from apps.forum.models import ForumTag
+from apps.research.models import Author, Keyword
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names, time_call
+from apps.utils.typeahead import typeahead_search
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark trigram typeahead against icontains on synthetic author, keyword and tag names'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--rows', type=int, default=100000, help='Synthetic names per table')
+        parser.add_argument('--queries', type=int, default=200, help='Lookups per table and strategy')
+
+    def run_benchmark(self, rows, queries, seed, **options):
+        names = list(synthetic_names(rows, seed=seed, words=(1, 2)))
+        self.stdout.write(f'Seeding {rows} names into authors, keywords and forum tags...')
+        Author.objects.bulk_create(
+            [Author(name=name.title(), affiliation='Benchmark') for name in names], batch_size=5000
+        )
+        Keyword.objects.bulk_create([Keyword(name=name) for name in names], batch_size=5000)
+        ForumTag.objects.bulk_create([ForumTag(name=name) for name in names], batch_size=5000)
+        with connection.cursor() as cursor:
+            for table in (Author._meta.db_table, Keyword._meta.db_table, ForumTag._meta.db_table):
+                cursor.execute(f'ANALYZE {table}')
+
+        rng = random.Random(seed)
+        terms = []
+        for _ in range(queries):
+            name = rng.choice(names)
+            if rng.random() < 0.5:
+                # Keystrokes: a 2-6 character prefix
+                terms.append(name[:rng.randint(2, 6)])
+            else:
+                # Typo: drop one character from a whole word
+                word = name.split()[0]
+                cut = rng.randrange(len(word))
+                terms.append(word[:cut] + word[cut + 1:])
+
+        for model in (Author, Keyword, ForumTag):
+            label = model._meta.verbose_name
+            self.report(f'{label} typeahead', self.time_terms(
+                terms, lambda term: typeahead_search(model.objects.all(), term)
+            ))
+            self.report(f'{label} icontains', self.time_terms(terms, self.icontains(model)))
+
+            # Previous behaviour: icontains without any trigram index (rolled back with the rest)
+            with connection.cursor() as cursor:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {index.name}')
+            self.report(f'{label} icontains, no index', self.time_terms(terms, self.icontains(model)))
+
+    def icontains(self, model):
+        return lambda term: model.objects.filter(name__icontains=term).order_by('name')[:10]
+
+    def time_terms(self, terms, lookup):
+        return [time_call(lambda: list(lookup(term)))[0] for term in terms]
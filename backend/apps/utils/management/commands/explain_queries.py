@@ -0,0 +1,152 @@
+import json
+import random
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.forum.models import ForumPost, ForumPostTag, ForumTag
+from apps.forum.views import ForumPostViewSet
+from apps.research.models import Keyword, ResearchPaper
+from apps.research.search import update_search_vectors
+from apps.research.views import ResearchPaperViewSet
+from apps.utils.benchmark import BenchmarkCommand, synthetic_names
+
+METHODOLOGIES = ['Qualitative', 'Quantitative', 'Mixed Methods', 'Experimental', 'Review', 'Case Study']
+JOURNALS = ['Journal of Agroecology', 'Food Policy', 'Soil Biology', 'Field Crops Research',
+            'Agricultural Systems', 'Rural Studies', 'Land Use Policy', 'Water Resources']
+
+
+class Command(BenchmarkCommand):
+    help = 'EXPLAIN the common catalogue and forum list queries on seeded data and fail on sequential scans'
+
+    # Large tables that must never be read with a sequential scan
+    checked_tables = {ResearchPaper._meta.db_table, ForumPost._meta.db_table}
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--papers', type=int, default=50000, help='Synthetic research papers')
+        parser.add_argument('--posts', type=int, default=20000, help='Synthetic forum posts')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full JSON plan of each query')
+
+    def run_benchmark(self, papers, posts, seed, verbose_plans, **options):
+        rng = random.Random(seed)
+        self.seed_papers(papers, rng, seed)
+        self.seed_posts(posts, rng, seed)
+        with connection.cursor() as cursor:
+            for model in (ResearchPaper, Keyword, ForumPost, ForumTag, ForumPostTag,
+                          ResearchPaper.keywords.through):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        keyword = Keyword.objects.order_by('id').values_list('name', flat=True).first()
+        tag = ForumTag.objects.order_by('id').values_list('name', flat=True).first()
+        recent = (timezone.now() - timedelta(days=7)).date().isoformat()
+
+        checks = [
+            ('papers: default list', self.paper_list({})),
+            ('papers: methodology', self.paper_list({'methodology_type': 'Experimental'})),
+            ('papers: methodology + years', self.paper_list(
+                {'methodology_type': 'Review', 'year_from': '2010', 'year_to': '2015'})),
+            ('papers: year range', self.paper_list({'year_from': '2018', 'year_to': '2020'})),
+            ('papers: journal', self.paper_list({'journal': 'agroecology'})),
+            ('papers: full-text', self.paper_list({'q': 'soil'})),
+            ('papers: keyword', self.paper_list({'keyword': keyword})),
+            ('papers: trending', ResearchPaper.objects.filter(
+                citation_trend='increasing').order_by('-citation_count', '-publication_year')[:10]),
+            ('posts: default list', self.post_list({})),
+            ('posts: tag', self.post_list({'tags': tag})),
+            ('posts: recent', self.post_list({'date_from': recent})),
+        ]
+
+        failures = []
+        for label, queryset in checks:
+            plan = json.loads(queryset.explain(format='json'))
+            if verbose_plans:
+                self.stdout.write(json.dumps(plan, indent=2))
+            scans = sorted(self.sequential_scans(plan[0]['Plan']) & self.checked_tables)
+            if scans:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'{label:<32} SEQ SCAN on {", ".join(scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{label:<32} ok (cost {plan[0]['Plan']['Total Cost']:.0f})"
+                ))
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries fall back to a sequential scan: {", ".join(failures)}')
+
+    def seed_papers(self, count, rng, seed):
+        self.stdout.write(f'Seeding {count} papers...')
+        keywords = Keyword.objects.bulk_create(
+            [Keyword(name=f'{name} bench') for name in synthetic_names(500, seed=seed, words=(1, 2))]
+        )
+        titles = list(synthetic_names(count, seed=seed + 1, words=(2, 4)))
+        papers = ResearchPaper.objects.bulk_create([
+            ResearchPaper(
+                title=title,
+                slug=f'bench-{index}',
+                abstract=f'{title} soil water yield',
+                publication_year=str(rng.randint(1990, 2024)),
+                journal=rng.choice(JOURNALS),
+                methodology_type=rng.choice(METHODOLOGIES),
+                citation_count=rng.randint(0, 500),
+                citation_trend=rng.choice(['increasing', 'decreasing', 'stable']),
+            )
+            for index, title in enumerate(titles)
+        ], batch_size=5000)
+        Through = ResearchPaper.keywords.through
+        Through.objects.bulk_create([
+            Through(researchpaper_id=paper.id, keyword_id=keyword.id)
+            for paper in papers
+            for keyword in rng.sample(keywords, 3)
+        ], batch_size=10000)
+        update_search_vectors()
+
+    def seed_posts(self, count, rng, seed):
+        self.stdout.write(f'Seeding {count} forum posts...')
+        tags = ForumTag.objects.bulk_create(
+            [ForumTag(name=f'bench-{index}') for index in range(200)]
+        )
+        posts = ForumPost.objects.bulk_create([
+            ForumPost(
+                title=f'Benchmark post {index}',
+                content='Synthetic forum post body.',
+                pinned=(index % 500 == 0),
+            )
+            for index in range(count)
+        ], batch_size=5000)
+        # auto_now_add ignores explicit values, so spread the timestamps afterwards
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {ForumPost._meta.db_table} '
+                f"SET created_at = created_at - (id %% 1000) * interval '1 day' WHERE id >= %s",
+                [posts[0].pk],
+            )
+        ForumPostTag.objects.bulk_create([
+            ForumPostTag(post_id=post.id, tag_id=tag.id)
+            for post in posts
+            for tag in rng.sample(tags, 2)
+        ], batch_size=10000)
+
+    def paper_list(self, params):
+        view = self.make_view(ResearchPaperViewSet, '/api/research/papers/', params)
+        return view.filter_queryset(view.get_queryset())[:10]
+
+    def post_list(self, params):
+        view = self.make_view(ForumPostViewSet, '/api/forum/posts/', params)
+        return view.filter_queryset(view.get_queryset()).order_by('-pinned', '-created_at')[:10]
+
+    def make_view(self, viewset, path, params):
+        request = Request(APIRequestFactory().get(path, params))
+        return viewset(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+
+    def sequential_scans(self, node):
+        tables = set()
+        if node.get('Node Type') == 'Seq Scan':
+            tables.add(node.get('Relation Name'))
+        for child in node.get('Plans', []):
+            tables |= self.sequential_scans(child)
+        return tables
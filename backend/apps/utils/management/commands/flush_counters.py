@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.utils.counter_buffer import flush_counters
+
+
+class Command(BaseCommand):
+    help = 'Write buffered counter increments (forum likes and views) to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep flushing every --interval seconds')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Seconds between flushes (default: COUNTER_FLUSH_INTERVAL)')
+        parser.add_argument('--all', action='store_true',
+                            help='Also flush the increments of the last few seconds')
+
+    def handle(self, *args, loop=False, interval=None, all=False, **options):
+        interval = interval or settings.COUNTER_FLUSH_INTERVAL
+        if not loop:
+            self.report(flush_counters(include_recent=all))
+            return
+        try:
+            while True:
+                self.report(flush_counters(), quiet=True)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            # Stopping: nothing newer will be flushed by this process
+            self.report(flush_counters(include_recent=True))
+
+    def report(self, written, quiet=False):
+        if written or not quiet:
+            self.stdout.write(f'{written} counters flushed')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.forum.cooccurrence import rebuild_cooccurrence
+from apps.forum.models import Comment, ForumPost, ForumPostTag, ForumTag, Like
+from apps.research.models import Keyword, ResearchPaper
+from apps.utils.counter_buffer import flush_counters
+from apps.utils.counters import counted, reconcile_counter
+
+
+def counters():
+    """(label, model, field, actual count expression) of every maintained counter"""
+    authenticated_likes = Like.objects.filter(user__isnull=False)
+    return [
+        ('research keyword paper_count', Keyword, 'paper_count',
+         counted(ResearchPaper.keywords.through.objects.all(), 'keyword')),
+        ('forum tag usage_count', ForumTag, 'usage_count', counted(ForumPostTag.objects.all(), 'tag')),
+        ('forum post comments_count', ForumPost, 'comments_count', counted(Comment.objects.all(), 'post')),
+        ('forum post likes_count', ForumPost, 'likes_count', counted(authenticated_likes, 'post')),
+        ('forum comment likes_count', Comment, 'likes_count', counted(authenticated_likes, 'comment')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Recount denormalised counters (keyword, tag, post and comment counts) and rebuild tag co-occurrence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows drifted')
+
+    def handle(self, *args, dry_run=False, **options):
+        # Buffered deltas would be counted twice once the recount is flushed over
+        if not dry_run:
+            flush_counters(include_recent=True)
+        total = 0
+        for label, model, field, actual in counters():
+            drifted = reconcile_counter(model, field, actual, dry_run=dry_run)
+            total += drifted
+            self.stdout.write(f'{label:<32} {drifted} drifted')
+        if not dry_run:
+            self.stdout.write(f'{"forum tag co-occurrence":<32} {rebuild_cooccurrence()} pairs rebuilt')
+        verb = 'would be fixed' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{total} rows {verb}'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.utils.mail_outbox import BATCH_SIZE, MailWorker
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued transactional email from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent provider calls')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Emails per provider call')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Send what is due now, then exit')
+
+    def handle(self, *args, threads=4, batch_size=BATCH_SIZE, interval=2.0, once=False, **options):
+        worker = MailWorker(threads=threads, batch_size=batch_size)
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = worker.drain_once()
+                if sent or failed:
+                    self.stdout.write(f'{sent} sent, {failed} failed')
+                    continue
+                if once:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
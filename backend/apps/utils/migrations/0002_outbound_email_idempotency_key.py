@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utils", "0001_outbound_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboundemail",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="outboundemail",
+            index=models.Index(
+                condition=models.Q(
+                    ("status", "pending"),
+                    models.Q(("idempotency_key", ""), _negated=True),
+                ),
+                fields=["idempotency_key"],
+                name="outbound_email_request",
+            ),
+        ),
+    ]
@@ -1 +1,40 @@
-# Utility models can be added here if needed
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """A transactional email in the outbox, delivered by ``manage.py run_mail_worker``"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    to = models.JSONField()
+    from_email = models.CharField(max_length=254)
+    reply_to = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    html = models.TextField()
+    status = models.CharField(max_length=10, default=PENDING,
+                              choices=[(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')])
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When a worker may (re)try it; also pushed forward while a worker holds it
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    provider_id = models.CharField(max_length=100, blank=True)
+    # Idempotency key of the last provider request that may have delivered it;
+    # every pending row with the key is resent together, under the same key
+    idempotency_key = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's "due" scan
+            models.Index(fields=['next_attempt_at'], name='outbound_email_due',
+                         condition=models.Q(status='pending')),
+            # Claiming the rest of a request that is retried
+            models.Index(fields=['idempotency_key'], name='outbound_email_request',
+                         condition=models.Q(status='pending') & ~models.Q(idempotency_key='')),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
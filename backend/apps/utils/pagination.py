@@ -0,0 +1,148 @@
+"""
+Keyset (seek) pagination shared by the forum and research APIs.
+
+Pages are fetched with ``WHERE (ordering columns) > (last row seen)`` instead of
+``OFFSET``, so every page costs one indexed range scan no matter how deep it
+is. The position of the last row is handed to the client as an opaque cursor.
+Totals are opt-in with ``?count=exact`` or ``?count=estimate`` (planner
+estimate, no scan).
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+
+
+def wants_keyset(request):
+    """Cursor pagination is opt-in: ?pagination=cursor, or following a cursor link"""
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or bool(params.get(KeysetPagination.cursor_query_param))
+
+
+def estimated_count(queryset):
+    """Row estimate from the PostgreSQL planner (EXPLAIN), without executing the query"""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering``.
+
+    The last ordering field must be unique (normally the primary key) and none
+    of the ordering fields may be NULL.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(*self.ordering)
+        self.count = self.get_count(queryset, request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        # One extra row tells whether there is a next page without counting
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == COUNT_EXACT:
+            return queryset.count()
+        if mode == COUNT_ESTIMATE:
+            return estimated_count(queryset)
+        return None
+
+    def seek_filter(self, position):
+        """Rows strictly after ``position``: (a, b) > (x, y) expanded for mixed directions"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': position[index]})
+            for previous_index, previous in enumerate(self.ordering[:index]):
+                clause &= Q(**{previous.lstrip('-'): position[previous_index]})
+            condition |= clause
+        return condition
+
+    def position_of(self, row):
+        return [getattr(row, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, row):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self.position_of(row)
+        ]
+        token = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('count', self.count),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'count': {'type': 'integer', 'nullable': True},
+                'results': schema,
+            },
+        }
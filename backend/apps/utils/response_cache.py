@@ -0,0 +1,106 @@
+"""
+Shared cache for anonymous GET responses of public catalogue endpoints.
+
+Entries are keyed by a namespace, the namespace's current generation, the
+full path including the query string and the Accept header. Model signals call
+``invalidate_responses`` to bump the generation, which orphans every entry in
+the namespace at once; orphaned entries simply expire.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Headers that must never be replayed to another client
+_UNCACHED_HEADERS = {'set-cookie'}
+
+
+def _generation_key(namespace):
+    return f'response:{namespace}:generation'
+
+
+def get_generation(namespace):
+    """Current generation of ``namespace``, seeded from the clock if missing"""
+    generation = cache.get(_generation_key(namespace))
+    if generation is None:
+        # A clock seed cannot collide with a generation that was evicted
+        cache.add(_generation_key(namespace), time.time_ns(), None)
+        generation = cache.get(_generation_key(namespace))
+    return generation
+
+
+def _bump(namespace):
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        cache.set(_generation_key(namespace), time.time_ns(), None)
+
+
+def invalidate_responses(*namespaces):
+    """
+    Invalidate every cached response in ``namespaces``.
+
+    The generation is bumped immediately and again once the surrounding
+    transaction commits, so a response rendered from pre-commit data in
+    between is not kept.
+    """
+    for namespace in namespaces:
+        _bump(namespace)
+        transaction.on_commit(lambda namespace=namespace: _bump(namespace))
+
+
+def response_cache_key(namespace, request):
+    digest = hashlib.sha1(
+        f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode()
+    ).hexdigest()
+    return f'response:{namespace}:{get_generation(namespace)}:{digest}'
+
+
+def is_anonymous_get(request):
+    if request.method != 'GET':
+        return False
+    if request.META.get('HTTP_AUTHORIZATION'):
+        return False
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Serve anonymous GET requests of a viewset from the shared cache.
+
+    Set ``response_cache_namespace`` and connect ``invalidate_responses`` for
+    that namespace to the signals of every model the responses are built from.
+    """
+    response_cache_namespace = None
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.response_cache_namespace or not is_anonymous_get(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = response_cache_key(self.response_cache_namespace, request)
+        cached = cache.get(key)
+        if cached is not None:
+            status_code, content, headers = cached
+            response = HttpResponse(content, status=status_code)
+            for header, value in headers:
+                response[header] = value
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        if response.status_code == 200 and not response.streaming:
+            if hasattr(response, 'render'):
+                response.render()
+            headers = [
+                (header, value) for header, value in response.items()
+                if header.lower() not in _UNCACHED_HEADERS
+            ]
+            cache.set(key, (response.status_code, response.content, headers), self.response_cache_timeout)
+        return response
@@ -0,0 +1,61 @@
+"""
+Trigram-backed typeahead lookups shared by the research and forum apps.
+
+Lookups run against ``UPPER(<field>)``. Prefix matches are served by a btree
+``text_pattern_ops`` index and fuzzy matches by a GIN ``gin_trgm_ops`` index,
+both declared with ``typeahead_indexes``.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Index
+from django.db.models.functions import Upper
+
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 25
+# Shorter terms have no complete trigram, so only the prefix phase runs
+FUZZY_MIN_LENGTH = 3
+
+
+def typeahead_indexes(field, prefix):
+    """Prefix (btree) and trigram (GIN) indexes over UPPER(field)"""
+    return [
+        Index(OpClass(Upper(field), name='text_pattern_ops'), name=f'{prefix}_prefix'),
+        GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=f'{prefix}_trgm'),
+    ]
+
+
+def parse_limit(value, default=TYPEAHEAD_DEFAULT_LIMIT, maximum=TYPEAHEAD_MAX_LIMIT):
+    """Clamp a user supplied limit to 1..maximum"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = default
+    return min(max(limit, 1), maximum)
+
+
+def typeahead_search(queryset, term, field='name', limit=TYPEAHEAD_DEFAULT_LIMIT):
+    """
+    Return at most ``limit`` rows whose ``field`` starts with or resembles ``term``.
+
+    Prefix matches come first, then fuzzy matches against any word of the
+    value; each group is ordered by trigram word similarity. Runs at most two
+    indexed queries.
+    """
+    term = (term or '').strip()
+    if not term:
+        return []
+
+    upper_term = term.upper()
+    queryset = queryset.annotate(
+        typeahead_key=Upper(field),
+        similarity=TrigramWordSimilarity(upper_term, Upper(field)),
+    ).order_by('-similarity', field)
+
+    results = list(queryset.filter(typeahead_key__startswith=upper_term)[:limit])
+    if len(results) < limit and len(term) >= FUZZY_MIN_LENGTH:
+        results += list(
+            queryset
+            .filter(typeahead_key__trigram_word_similar=upper_term)
+            .exclude(typeahead_key__startswith=upper_term)[:limit - len(results)]
+        )
+    return results
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 from datetime import timedelta
 import dj_database_url
@@ -41,6 +43,68 @@ if DATABASE_URL:
 else:
     raise Exception("DATABASE_URL environment variable is required for PostgreSQL. No fallback to SQLite.")
 
+# Cache configuration - must be shared by every gunicorn worker, so the
+# per-process locmem default is only used by the test runner.
+# CACHE_BACKEND: redis (default when REDIS_URL is set), file (default), database
+# or locmem. The database backend needs `python manage.py createcachetable`.
+# Only Redis has an atomic incr and keeps entries until they expire; the file and
+# database backends lose concurrent increments and cull when full, which makes
+# IP rate limiting approximate, so use Redis in production.
+REDIS_URL = os.getenv('REDIS_URL')
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if REDIS_URL else 'file')
+if 'test' in sys.argv:
+    CACHE_BACKEND = 'locmem'
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL or 'redis://127.0.0.1:6379/0',
+        }
+    }
+elif CACHE_BACKEND == 'database':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.getenv('CACHE_TABLE', 'django_cache'),
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'harvestforgood_cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+CACHES['default']['KEY_PREFIX'] = 'hfg'
+
+# Write-behind counters (forum likes and views) are buffered in the cache and
+# flushed to the database every COUNTER_FLUSH_INTERVAL seconds by a background
+# thread, or by `python manage.py flush_counters --loop` when that is disabled.
+# Only Redis increments atomically and keeps entries until they expire (run it
+# with maxmemory-policy noeviction); on any other backend counters are updated
+# in the database directly.
+COUNTER_WRITE_BEHIND = CACHE_BACKEND == 'redis' and os.getenv('COUNTER_WRITE_BEHIND', 'true').lower() == 'true'
+COUNTER_FLUSH_INTERVAL = int(os.getenv('COUNTER_FLUSH_INTERVAL', '10'))
+COUNTER_BACKGROUND_FLUSH = os.getenv('COUNTER_BACKGROUND_FLUSH', 'true').lower() == 'true' and 'test' not in sys.argv
+
+# Memory-mapped TF-IDF index behind /api/research/papers/<slug>/similar/, built
+# with `python manage.py build_similarity_index` (needs numpy and scipy). Every
+# worker maps the same files, so use a path shared by all of them.
+SIMILARITY_INDEX_DIR = os.getenv('SIMILARITY_INDEX_DIR', str(BASE_DIR / 'var' / 'similarity'))
+
+# In-process bitmap index answering plain keyword/methodology/year/citation
+# filters of the paper list (apps.research.filter_index, needs numpy). Each
+# worker holds its own copy, loaded at start and rebuilt after catalogue writes.
+PAPER_FILTER_INDEX = os.getenv('PAPER_FILTER_INDEX', 'true').lower() == 'true' and 'test' not in sys.argv
+
 # Allowed hosts configuration
 if IS_RAILWAY:
     # Railway provides RAILWAY_PUBLIC_DOMAIN and RAILWAY_STATIC_URL
@@ -73,6 +137,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -139,6 +204,10 @@ else:
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
     DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Transactional email is queued in the outbox (apps.utils.mail_outbox) and
+# delivered by `python manage.py run_mail_worker` through this provider class.
+EMAIL_OUTBOX_PROVIDER = os.getenv('EMAIL_OUTBOX_PROVIDER', 'apps.utils.email_service.ResendProvider')
+
 # Authentication settings
 ACCOUNT_AUTHENTICATION_METHOD = 'username_email'  # Allow login with username OR email
 ACCOUNT_EMAIL_REQUIRED = True
@@ -287,6 +356,7 @@ REST_FRAMEWORK = {
         'auth_attempts': '20/hour',
         'dj_rest_auth': '20/min',
         'password_reset': '10/hour',  # Add rate limiting for password reset
+        'paper_exports': '30/hour',
     }
 }
 
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Start loading the in-process paper filter index in this worker
+from apps.research.filter_index import warm_filter_index  # noqa: E402
+
+warm_filter_index()
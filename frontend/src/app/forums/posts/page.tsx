@@ -12,7 +12,8 @@ import Pagination from "../../../components/forum/Pagination";
 interface Post {
   id: string;
   title: string;
-  content: string;
+  content?: string;
+  excerpt?: string;
   author:
     | string
     | {
@@ -310,7 +311,7 @@ export default function ForumPage() {
                     key={post.id}
                     id={post.id}
                     title={post.title}
-                    content={post.content}
+                    content={post.excerpt ?? post.content ?? ""}
                     author={authorName}
                     tags={tagNames}
                     createdAt={post.created_at}